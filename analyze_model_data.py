@@ -1,13 +1,16 @@
+import argparse
 import csv
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.svm import SVC
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_curve, auc
 
-data = [
+from model_kernel import svm_classifier
+
+SAMPLE_DATA = [
     {"Date": "2023-01-01", "Location": "New York", "Operator": "Airline A", "Flight Number": "AA123", "Fatalities": 5, "target": 0},
     {"Date": "2023-02-15", "Location": "Los Angeles", "Operator": "Airline B", "Flight Number": "BB456", "Fatalities": 10, "target": 1},
     {"Date": "2023-03-20", "Location": "Chicago", "Operator": "Airline C", "Flight Number": "CC789", "Fatalities": 2, "target": 0},
@@ -41,35 +44,42 @@ data = [
 ]
 
 # Nom du fichier CSV
-csv_file = "airplane_crashes.csv"
+CSV_FILE = "airplane_crashes.csv"
 
 # Champs du CSV
-fields = ["Date", "Location", "Operator", "Flight Number", "Fatalities", "target"]
-
-# Écriture des données dans le fichier CSV
-with open(csv_file, mode='w', newline='') as file:
-    writer = csv.DictWriter(file, fieldnames=fields)
-    writer.writeheader()
-    for row in data:
-        writer.writerow(row)
-
-print(f"Le fichier {csv_file} a été généré avec succès.")
-
-# Lecture du fichier CSV avec pandas
-try:
-    data = pd.read_csv(csv_file)
-    print("Fichier CSV lu avec succès")
-except pd.errors.ParserError as e:
-    print("Erreur lors de la lecture du fichier CSV:", e)
-    data = None
-except FileNotFoundError:
-    print(f"Le fichier '{csv_file}' n'a pas été trouvé.")
-    data = None
-except Exception as e:
-    print("Une erreur s'est produite:", e)
-    data = None
-
-if data is not None:
+FIELDS = ["Date", "Location", "Operator", "Flight Number", "Fatalities", "target"]
+
+
+def write_sample_file(csv_file=CSV_FILE):
+    """Écrit les données d'exemple dans le fichier CSV (un fichier existant est conservé)."""
+    if os.path.exists(csv_file):
+        return
+    with open(csv_file, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in SAMPLE_DATA:
+            writer.writerow(row)
+
+    print(f"Le fichier {csv_file} a été généré avec succès.")
+
+
+def read_data(csv_file=CSV_FILE):
+    """Lecture du fichier CSV avec pandas (None en cas d'erreur)."""
+    try:
+        data = pd.read_csv(csv_file)
+        print("Fichier CSV lu avec succès")
+        return data
+    except pd.errors.ParserError as e:
+        print("Erreur lors de la lecture du fichier CSV:", e)
+    except FileNotFoundError:
+        print(f"Le fichier '{csv_file}' n'a pas été trouvé.")
+    except Exception as e:
+        print("Une erreur s'est produite:", e)
+    return None
+
+
+def compare_models(data):
+    """Entraîne les modèles, affiche leurs scores et trace les courbes ROC."""
     # Preprocess data
     # Drop non-numeric columns
     data = data.drop(columns=["Date", "Location", "Operator", "Flight Number"])
@@ -84,7 +94,8 @@ if data is not None:
         'Logistic Regression': LogisticRegression(),
         'Random Forest': RandomForestClassifier(),
         'Gradient Boosting': GradientBoostingClassifier(),
-        'SVM': SVC(probability=True)
+        # SVC exact jusqu'à SVM_EXACT_MAX_ROWS lignes, noyau approché au-delà
+        'SVM': svm_classifier(len(X_train))
     }
 
     # Train and evaluate models
@@ -121,4 +132,19 @@ if data is not None:
     plt.ylabel('True Positive Rate')
     plt.title('ROC Curve')
     plt.legend(loc='lower right')
-    plt.show()
\ No newline at end of file
+    plt.show()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison rapide de modèles sur airplane_crashes.csv")
+    parser.add_argument("--file", default=CSV_FILE,
+                        help="Fichier CSV à analyser (un jeu synthétique plus grand s'obtient avec "
+                             "python -m benchmarks.synthetic --sample-csv)")
+    args = parser.parse_args()
+
+    if args.file == CSV_FILE:
+        write_sample_file(args.file)
+    data = read_data(args.file)
+    if data is not None:
+        compare_models(data)
@@ -0,0 +1,112 @@
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:  # lxml est optionnel : repli sur BeautifulSoup/html.parser
+    lxml = None
+
+ASN_BASE_URL = "https://aviation-safety.net"
+
+# Backend par défaut : lxml s'il est installé
+DEFAULT_BACKEND = "lxml" if lxml is not None else "bs4"
+
+# Sélection XPath du tableau de liste ASN (classe CSS `statistics`)
+STATISTICS_ROWS_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' statistics ')]//tr"
+
+
+def _row_to_crash(texts, href):
+    """Construit un dictionnaire de crash à partir des cellules d'une ligne de liste ASN."""
+    try:
+        event_date = datetime.strptime(texts[0], '%d-%b-%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        event_date = None
+
+    return {
+        "event_date": event_date,
+        "location": texts[2],
+        "operator": texts[3],
+        "aircraft_type": texts[4],
+        "registration": texts[1],
+        "flight_number": "",  # Non disponible dans cette table
+        "route": "",  # Renseigné par iter_asn_details (improved-data-extraction.py)
+        "fatalities": texts[5],  # "victimes/occupants", converti par normalize.parse_fatalities
+        "description": "",  # Renseigné par iter_asn_details (improved-data-extraction.py)
+        "source_url": ASN_BASE_URL + href if href else "",
+        # Identifiant ASN : dernier segment du lien (wikibase/123456 ou record.php?id=...)
+        "source_event_id": re.split(r"[/=]", href.rstrip('/'))[-1] if href else None
+    }
+
+
+def _parse_lxml(content):
+    tree = lxml.html.fromstring(content)
+    crashes = []
+    for row in tree.xpath(STATISTICS_ROWS_XPATH)[1:]:  # Sauter l'en-tête
+        cells = row.xpath("./td")
+        if len(cells) >= 6:
+            links = cells[0].xpath(".//a/@href")
+            crashes.append(_row_to_crash([cell.text_content().strip() for cell in cells],
+                                         links[0] if links else None))
+    return crashes
+
+
+def _parse_bs4(content):
+    # Seul le tableau `statistics` est construit en mémoire
+    soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer('table', class_='statistics'))
+    crashes = []
+    table = soup.find('table', class_='statistics')
+    if table:
+        for row in table.find_all('tr')[1:]:  # Sauter l'en-tête
+            cells = row.find_all('td', recursive=False)
+            if len(cells) >= 6:
+                link = cells[0].find('a')
+                crashes.append(_row_to_crash([cell.text.strip() for cell in cells],
+                                             link['href'] if link else None))
+    return crashes
+
+
+def parse_asn_html(content, backend=DEFAULT_BACKEND):
+    """Extrait les crashs du tableau `statistics` d'une page de liste ASN.
+
+    `backend` vaut "lxml" (XPath sur l'arbre lxml, le plus rapide) ou "bs4"
+    (BeautifulSoup limité au tableau par un SoupStrainer).
+    """
+    if backend == "lxml":
+        return _parse_lxml(content)
+    return _parse_bs4(content)
+
+
+def parse_asn_detail(content):
+    """Extrait la route et le récit d'une page de détail ASN.
+
+    Renvoie un dictionnaire avec les clés `route` et `description` (vides si
+    absentes de la page). À adapter selon la structure réelle du site.
+    """
+    # Les pages de détail sont limitées par le réseau : BeautifulSoup suffit
+    soup = BeautifulSoup(content, 'lxml' if lxml is not None else 'html.parser')
+
+    fields = {}
+    for caption in soup.find_all('td', class_='caption'):
+        value = caption.find_next_sibling('td')
+        if value:
+            fields[caption.get_text(strip=True).rstrip(':')] = value.get_text(" ", strip=True)
+
+    departure = fields.get("Departure airport", "")
+    destination = fields.get("Destination airport", "")
+    route = f"{departure} to {destination}" if departure or destination else ""
+
+    # Le récit suit la légende "Narrative:" jusqu'à la légende suivante
+    narrative = []
+    title = soup.find('span', class_='caption', string=re.compile(r"^\s*Narrative"))
+    if title:
+        for sibling in title.next_siblings:
+            if getattr(sibling, 'name', None) == 'span' and 'caption' in sibling.get('class', []):
+                break
+            narrative.append(sibling.get_text() if hasattr(sibling, 'get_text') else str(sibling))
+
+    return {
+        "route": route,
+        "description": " ".join("".join(narrative).split())
+    }
@@ -0,0 +1,82 @@
+"""Mesure le débit (enregistrements/s) des backends du parseur de listes ASN.
+
+Usage :
+    python -m benchmarks.bench_asn_parser                       # listes synthétiques
+    python -m benchmarks.bench_asn_parser --files data/raw/asn_*.html
+    python -m benchmarks.bench_asn_parser --from-cache data/raw/cache
+
+Avec --from-cache, toutes les listes ASN (dblist.php) du cache de réponses
+sont utilisées, ce qui couvre les années déjà téléchargées.
+"""
+import argparse
+import glob
+import gzip
+import json
+import random
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from asn_parser import lxml, parse_asn_html
+
+
+def synthetic_listing(year, rows=100, seed=0):
+    """Génère une page de liste ASN synthétique (structure du tableau `statistics`)."""
+    rng = random.Random(seed)
+    lines = ["<html><head><script>var x = 1;</script></head><body>",
+             "<div id='menu'>" + "<a href='/'>menu</a>" * 50 + "</div>",
+             "<table class='hp'><tr><td>bandeau</td></tr></table>",
+             "<table class='statistics'><tr><th>date</th><th>reg.</th><th>location</th>"
+             "<th>operator</th><th>type</th><th>fat.</th><th></th></tr>"]
+    for i in range(rows):
+        day = (date(year, 1, 1) + timedelta(days=rng.randrange(365))).strftime('%d-%b-%Y')
+        lines.append(
+            f"<tr class='list'><td class='list'><a href='/wikibase/{year}{i:04d}'>{day}</a></td>"
+            f"<td class='list'>N{rng.randrange(99999)}</td><td class='list'>City {rng.randrange(900)}</td>"
+            f"<td class='list'>Operator {rng.randrange(300)}</td><td class='list'>Type {rng.randrange(90)}</td>"
+            f"<td class='list'>{rng.randrange(5)}/{rng.randrange(5, 200)}</td>"
+            f"<td class='list'><img src='/flag.gif'></td></tr>"
+        )
+    lines.append("</table><div id='footer'>" + "<p>texte</p>" * 100 + "</div></body></html>")
+    return "\n".join(lines).encode("utf-8")
+
+
+def cached_listings(cache_dir):
+    """Renvoie les listes ASN présentes dans le cache de réponses."""
+    pages = []
+    for index_path in Path(cache_dir, "index").glob("*.json"):
+        entry = json.loads(index_path.read_text(encoding="utf-8"))
+        blob_path = Path(cache_dir, "blobs", f"{entry['digest']}.gz")
+        if "dblist.php" in entry["url"] and blob_path.exists():
+            pages.append(gzip.decompress(blob_path.read_bytes()))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", nargs="*", default=[])
+    parser.add_argument("--from-cache", default=None)
+    parser.add_argument("--years", type=int, default=20, help="Années synthétiques (10 pages chacune)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.files:
+        pages = [Path(path).read_bytes() for pattern in args.files for path in glob.glob(pattern)]
+    elif args.from_cache:
+        pages = cached_listings(args.from_cache)
+    else:
+        pages = [synthetic_listing(1990 + y, seed=y * 10 + p) for y in range(args.years) for p in range(10)]
+    print(f"{len(pages)} pages, {sum(map(len, pages)) / 1e6:.1f} Mo")
+
+    backends = ["bs4"] + (["lxml"] if lxml is not None else [])
+    for backend in backends:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            records = sum(len(parse_asn_html(page, backend=backend)) for page in pages)
+            best = min(best, time.perf_counter() - start)
+        print(f"{backend:<5} {records:>8} enregistrements  {best:7.2f} s  {records / best:10.0f} enr./s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare le chargement ligne par ligne et le chargement par lots (COPY).
+
+Usage :
+    python -m benchmarks.bench_bulk_load --rows 100000 --batch-size 5000
+
+Les tables sont créées dans un schéma temporaire `crash_bench`, supprimé à la fin.
+La connexion utilise les variables d'environnement DB_* habituelles.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from db_load import DEFAULT_BATCH_SIZE, copy_rows, insert_rows
+from db_pool import close_pool, get_pool
+
+BENCH_SCHEMA = "crash_bench"
+
+
+def synthetic_crashes(n, duplicate_ratio=0.1, seed=42):
+    """Génère `n` crashs synthétiques, dont une part de doublons."""
+    rng = random.Random(seed)
+    start = date(1950, 1, 1)
+    unique = [
+        {
+            "event_date": (start + timedelta(days=rng.randrange(27000))).isoformat(),
+            "location": f"City {rng.randrange(500)}, ST, Country {rng.randrange(50)}",
+            "operator": f"Operator {rng.randrange(300)}",
+            "aircraft_type": f"Type {rng.randrange(120)}",
+            "registration": f"N{rng.randrange(100000):05d}",
+            "flight_number": f"FL{rng.randrange(10000)}",
+            "route": "AAA to BBB",
+            "fatalities": rng.randrange(300),
+            "description": "Synthetic narrative\twith tab and\nnewline",
+            "source_url": f"https://example.org/event/{i}",
+        }
+        for i in range(int(n * (1 - duplicate_ratio)))
+    ]
+    return unique + [rng.choice(unique) for _ in range(n - len(unique))]
+
+
+def reset_table(conn):
+    """Recrée le schéma de test à partir de schema.sql."""
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE; CREATE SCHEMA {BENCH_SCHEMA};")
+        cursor.execute(f"SET search_path TO {BENCH_SCHEMA}, public;")
+        with open("schema.sql", encoding="utf-8") as f:
+            cursor.execute(f.read())
+    conn.commit()
+
+
+def run(conn, label, load, crashes):
+    """Charge `crashes` avec `load(cursor, crashes)` et affiche le débit."""
+    reset_table(conn)
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    result = load(cursor, crashes)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    cursor.close()
+    print(f"{label:<14} {len(crashes):>9} lignes  {elapsed:8.2f} s  "
+          f"{len(crashes) / elapsed:10.0f} lignes/s  {result}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    conn = get_pool().getconn()
+    crashes = synthetic_crashes(args.rows)
+    try:
+        row_time = run(conn, "ligne à ligne",
+                       lambda cursor, rows: insert_rows(cursor, rows, "BENCH"), crashes)
+        bulk_time = run(conn, "COPY par lots",
+                        lambda cursor, rows: copy_rows(cursor, rows, "BENCH", batch_size=args.batch_size), crashes)
+        print(f"Accélération : x{row_time / bulk_time:.1f}")
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+        conn.commit()
+        get_pool().putconn(conn)
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
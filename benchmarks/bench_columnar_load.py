@@ -0,0 +1,116 @@
+"""Compare le chargement des données traitées : CSV (pd.read_csv) vs Parquet.
+
+Usage :
+    python -m benchmarks.bench_columnar_load --rows 3000000
+
+Génère un jeu synthétique (schéma de airplane_crashes) dans un répertoire
+temporaire, l'écrit en CSV et en Parquet partitionné (source/année), puis
+mesure dans un processus séparé par scénario le temps de chargement et le pic
+de mémoire résidente.
+"""
+import argparse
+import multiprocessing
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from cli import import_command
+from parquet_store import CRASH_SCHEMA, PARTITION_SCHEMA, load_parquet
+
+# Colonnes du stockage correspondant à ANALYSIS_COLUMNS de improved-model-analysis.py
+# (Fatalities et target sont calculées à partir de `fatalities` à la lecture du Parquet)
+CSV_COLUMNS = ["event_date", "fatalities", "operator", "aircraft_type"]
+
+
+def synthetic_frame(rows, seed=42):
+    """Jeu de crashs synthétique aux colonnes de CRASH_SCHEMA (+ source)."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 365 * 75, rows)
+    cities = rng.integers(0, 5000, rows)
+    frame = pd.DataFrame({
+        "source_event_id": np.char.add("EV", np.arange(rows).astype(str)),
+        "event_date": (np.datetime64("1950-01-01") + days).astype("datetime64[D]"),
+        "location": np.char.add("City ", cities.astype(str)),
+        "city": np.char.add("City ", cities.astype(str)),
+        "state": None,
+        "country": None,
+        "latitude": (cities % 180 - 90).astype("float64"),
+        "longitude": (cities % 360 - 180).astype("float64"),
+        "operator": np.char.add("Operator ", rng.integers(0, 800, rows).astype(str)),
+        "aircraft_type": np.char.add("Type ", rng.integers(0, 300, rows).astype(str)),
+        "registration": np.char.add("N", rng.integers(0, 99999, rows).astype(str)),
+        "flight_number": np.char.add("FL", rng.integers(0, 9999, rows).astype(str)),
+        "route": "AAA to BBB",
+        "fatalities": rng.integers(0, 300, rows).astype("int32"),
+        "description": "Synthetic narrative describing the sequence of events before the accident.",
+        "source_url": "https://example.org/event",
+        "source": rng.choice(["NTSB", "ASN"], rows),
+    })
+    frame["year"] = frame["event_date"].dt.year.astype("int16")
+    return frame
+
+
+def write_fixtures(rows, directory):
+    """Écrit le jeu synthétique en CSV et en Parquet partitionné (source/année)."""
+    frame = synthetic_frame(rows)
+    csv_path = directory / "crashes.csv"
+    frame.drop(columns=["year"]).to_csv(csv_path, index=False)
+    table = pa.Table.from_pandas(frame, schema=CRASH_SCHEMA.append(pa.field("source", pa.string()))
+                                 .append(pa.field("year", pa.int16())), preserve_index=False)
+    parquet_path = directory / "parquet"
+    ds.write_dataset(table, parquet_path, format="parquet",
+                     partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+                     max_rows_per_group=100_000)
+    return csv_path, parquet_path
+
+
+def _measure(scenario, csv_path, parquet_path, results):
+    columns = import_command("train").ANALYSIS_COLUMNS  # Import hors chronométrage
+    start = time.perf_counter()
+    if scenario == "csv complet":
+        frame = pd.read_csv(csv_path, parse_dates=["event_date"])
+    elif scenario == "csv usecols":
+        frame = pd.read_csv(csv_path, usecols=CSV_COLUMNS, parse_dates=["event_date"])
+    elif scenario == "parquet colonnes":
+        frame = load_parquet(parquet_path, columns=columns)
+    else:  # parquet colonnes + 10 dernières années
+        frame = load_parquet(parquet_path, columns=columns, start_date="2015-01-01")
+    elapsed = time.perf_counter() - start
+    results.put((len(frame), elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="crash_bench_"))
+    try:
+        print(f"Génération de {args.rows} lignes...")
+        context = multiprocessing.get_context("spawn")
+        # Génération dans un processus séparé : le pic RSS (hérité par les
+        # processus fils sous Linux) reste celui des imports
+        writer = context.Process(target=write_fixtures, args=(args.rows, directory))
+        writer.start()
+        writer.join()
+        csv_path, parquet_path = directory / "crashes.csv", directory / "parquet"
+        for scenario in ["csv complet", "csv usecols", "parquet colonnes", "parquet colonnes + dates"]:
+            results = context.Queue()
+            process = context.Process(target=_measure, args=(scenario, csv_path, parquet_path, results))
+            process.start()
+            rows, elapsed, peak_mb = results.get()
+            process.join()
+            print(f"{scenario:<26} {rows:>9} lignes  {elapsed:7.2f} s  pic RSS {peak_mb:8.0f} Mo")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Mesure le temps et la qualité du rapprochement NTSB/ASN (entity_resolution.py).
+
+Usage :
+    python -m benchmarks.bench_entity_resolution --records 500000 --overlap 0.3
+
+Un jeu synthétique est généré : une part `overlap` des accidents existe dans
+les deux sources, avec des libellés différents (casse, suffixes d'opérateur,
+format du lieu, immatriculation parfois absente, date décalée d'un jour).
+La précision et le rappel sont calculés par rapport à cette vérité.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from entity_resolution import fuzz, resolve
+
+
+def synthetic_crashes(records, overlap=0.3, seed=0):
+    """Crashs NTSB et ASN synthétiques ; renvoie (crashs, paires vraies NTSB->ASN)."""
+    rng = np.random.default_rng(seed)
+    n_events = records // 2
+    n_shared = int(n_events * overlap)
+
+    days = pd.to_datetime("1960-01-01") + pd.to_timedelta(rng.integers(0, 23000, n_events), unit="D")
+    operators = pd.Series(rng.integers(0, 20000, n_events)).map("Operator {}".format)
+    cities = pd.Series(rng.integers(0, 8000, n_events)).map("City {}".format)
+    registrations = pd.Series(rng.integers(0, 10 ** 7, n_events)).map("N{}".format)
+    fatalities = rng.integers(0, 200, n_events)
+
+    ntsb = pd.DataFrame({
+        "source": "NTSB",
+        "source_event_id": [f"EV{i}" for i in range(n_events)],
+        "event_date": days.strftime("%Y-%m-%d"),
+        "registration": registrations,
+        "operator": operators + " Airlines",
+        "aircraft_type": "Type",
+        "location": cities + ", XX, United States",
+        "fatalities": fatalities,
+    })
+
+    shared = rng.choice(n_events, n_shared, replace=False)
+    shift = rng.integers(-1, 2, n_shared)
+    asn_only = n_events - n_shared
+    asn = pd.DataFrame({
+        "source": "ASN",
+        "source_event_id": [f"{i}" for i in range(n_shared + asn_only)],
+        "event_date": np.concatenate([
+            (days[shared] + pd.to_timedelta(shift, unit="D")).strftime("%Y-%m-%d"),
+            (pd.to_datetime("1960-01-01") + pd.to_timedelta(rng.integers(0, 23000, asn_only), unit="D"))
+            .strftime("%Y-%m-%d")]),
+        "registration": np.concatenate([
+            registrations.to_numpy()[shared].astype(object),
+            pd.Series(rng.integers(0, 10 ** 7, asn_only)).map("G-{}".format).to_numpy()]),
+        "operator": np.concatenate([
+            operators.to_numpy()[shared].astype(object),
+            pd.Series(rng.integers(0, 20000, asn_only)).map("Operator {}".format).to_numpy()]),
+        "aircraft_type": "Type",
+        "location": np.concatenate([
+            cities.to_numpy()[shared].astype(object) + ", USA",
+            pd.Series(rng.integers(0, 8000, asn_only)).map("near City {}".format).to_numpy()]),
+        "fatalities": np.concatenate([fatalities[shared], rng.integers(0, 200, asn_only)]).astype(str),
+    })
+    # Une immatriculation sur cinq manque côté ASN, un opérateur sur dix est mal orthographié
+    asn.loc[rng.random(len(asn)) < 0.2, "registration"] = None
+    typos = rng.random(len(asn)) < 0.1
+    asn.loc[typos, "operator"] = asn.loc[typos, "operator"].str.replace("Operator", "Operatr")
+
+    truth = set(zip(ntsb["source_event_id"].to_numpy()[shared], asn["source_event_id"].to_numpy()[:n_shared]))
+    return pd.concat([ntsb, asn], ignore_index=True), truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=500_000)
+    parser.add_argument("--overlap", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    crashes, truth = synthetic_crashes(args.records, args.overlap)
+    print(f"{len(crashes)} crashs, {len(truth)} accidents communs aux deux sources "
+          f"(comparaison floue : {'rapidfuzz' if fuzz is not None else 'difflib'})")
+
+    start = time.perf_counter()
+    events, links, stats = resolve(crashes, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    linked = links.dropna(subset=["match_score"])
+    found = linked.pivot(index="event_id", columns="source", values="source_event_id")
+    found = set(zip(found["NTSB"], found["ASN"]))
+    true_positives = len(found & truth)
+    print(f"{stats['candidate_pairs']} paires candidates, {stats['matches']} rapprochements, "
+          f"{stats['events']} événements en {elapsed:.1f}s")
+    print(f"précision {true_positives / max(1, len(found)):.3f}, rappel {true_positives / max(1, len(truth)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Compare le géocodage ligne par ligne au géocodage des lieux distincts avec cache (geocode.py).
+
+Usage :
+    python -m benchmarks.bench_geocode --rows 1000000 --places 20000
+
+Un gazetier synthétique de `places` villes est écrit dans un répertoire
+temporaire ; les crashs reprennent ces lieux dans les formats des sources
+(« ville, état, pays » NTSB, « near ville, pays » ASN, casse variable).
+"""
+import argparse
+import re
+import shutil
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from geocode import QUALIFIER_PATTERN, Geocoder, load_gazetteer
+
+
+def write_gazetteer(places, path, seed=0):
+    """Gazetier synthétique : une ville par lieu, réparties sur 50 états et 100 pays."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(places)
+    pd.DataFrame({
+        "city": [f"City {i}" for i in ids],
+        "state": [f"S{i % 50}" for i in ids],
+        "country": [f"Country {i % 100}" for i in ids],
+        "latitude": rng.uniform(-90, 90, places).round(4),
+        "longitude": rng.uniform(-180, 180, places).round(4),
+        "population": rng.integers(100, 10 ** 6, places),
+    }).to_csv(path, index=False)
+
+
+def synthetic_locations(rows, places, seed=0):
+    """Lieux de crashs aux formats NTSB et ASN (environ 3 variantes par ville)."""
+    rng = np.random.default_rng(seed)
+    ids = pd.Series(rng.integers(0, places, rows))
+    city = "City " + ids.astype(str)
+    ntsb = city + ", S" + (ids % 50).astype(str) + ", Country " + (ids % 100).astype(str)
+    asn = "near " + city.str.upper() + ", Country " + (ids % 100).astype(str)
+    short = city + ", Country " + (ids % 100).astype(str)
+    kind = rng.integers(0, 3, rows)
+    return ntsb.where(kind == 0, asn.where(kind == 1, short))
+
+
+def normalize_one(location):
+    """Équivalent Python de geocode.normalize_location pour une seule chaîne."""
+    text = unicodedata.normalize("NFKD", location).encode("ascii", "ignore").decode("ascii").lower()
+    text = re.sub(QUALIFIER_PATTERN, "", re.sub(r"[^a-z0-9,]+", " ", text))
+    return re.sub(r"\s*,[\s,]*", ", ", text).strip(" ,")
+
+
+def geocode_per_row(locations, gazetteer_path):
+    """Approche naïve : normalisation et recherche répétées pour chaque ligne."""
+    gazetteer = load_gazetteer(gazetteer_path)
+    index = {(row.city, row.state, row.country): (row.latitude, row.longitude)
+             for row in gazetteer.itertuples()}
+    by_country = {(row.city, row.country): (row.latitude, row.longitude) for row in gazetteer.itertuples()}
+    coordinates = []
+    for location in locations:
+        key = normalize_one(location)
+        parts = [part.strip() for part in key.split(",")]
+        if len(parts) == 3:
+            coordinates.append(index.get(tuple(parts)))
+        else:
+            coordinates.append(by_country.get((parts[0], parts[-1])))
+    return coordinates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--places", type=int, default=20_000)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="geocode_bench_"))
+    try:
+        gazetteer_path = directory / "gazetteer.csv"
+        write_gazetteer(args.places, gazetteer_path)
+        locations = synthetic_locations(args.rows, args.places)
+        print(f"{args.rows} lignes, {locations.nunique()} lieux distincts, gazetier de {args.places} villes")
+
+        start = time.perf_counter()
+        geocode_per_row(locations, gazetteer_path)
+        elapsed = time.perf_counter() - start
+        print(f"{'ligne par ligne':<20} {elapsed:8.2f} s  {args.rows / elapsed:10.0f} lignes/s")
+
+        cache_path = directory / "geocode_cache.json"
+        for label in ["distincts, à froid", "distincts, en cache"]:
+            geocoder = Geocoder(gazetteer_path=gazetteer_path, cache_path=cache_path)
+            start = time.perf_counter()
+            coordinates = geocoder.geocode(locations)
+            geocoder.save()
+            elapsed = time.perf_counter() - start
+            stats = geocoder.stats
+            print(f"{label:<20} {elapsed:8.2f} s  {args.rows / elapsed:10.0f} lignes/s  "
+                  f"{stats['hits']} en cache, {stats['misses']} recherchés, "
+                  f"{coordinates['latitude'].notna().mean():.1%} géocodés")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
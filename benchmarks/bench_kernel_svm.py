@@ -0,0 +1,110 @@
+"""Compare SVC(probability=True) au SVM à noyau approché (model_kernel.py) selon le nombre de lignes.
+
+Usage :
+    python -m benchmarks.bench_kernel_svm --sizes 1000,5000,20000,100000 --exact-max-rows 20000
+
+Les crashs synthétiques (benchmarks/synthetic.py) passent par le prétraitement
+de improved-model-analysis.py ; le préprocesseur est ajusté une fois hors
+chronométrage. Pour chaque taille d'entraînement sont mesurés la durée
+d'entraînement, la durée de predict_proba sur un ensemble de test fixe,
+l'AUC et la taille du modèle sérialisé (mémoire nécessaire aux prédictions).
+Le SVC exact n'est pas entraîné au-delà de `--exact-max-rows` lignes. Les
+résultats sont écrits au format des rapports d'exécution
+(results/benchmarks/bench_kernel_svm-<horodatage>.json).
+"""
+import argparse
+import math
+import pickle
+import sys
+import time
+from pathlib import Path
+
+from sklearn.metrics import roc_auc_score
+from sklearn.svm import SVC
+
+from benchmarks.bench_suite import previous_report
+from benchmarks.synthetic import crash_frame, processed_frame
+from cli import import_command
+from instrumentation import compare, end_run, load_report, record, start_run
+from model_kernel import ApproximateKernelSVC
+
+MODELS = {
+    "exact": lambda: SVC(probability=True, random_state=0),
+    "nystroem": lambda: ApproximateKernelSVC(approximation="nystroem", random_state=0),
+    "fourier": lambda: ApproximateKernelSVC(approximation="fourier", random_state=0),
+}
+
+
+def features(max_rows, test_rows, seed):
+    """Matrices transformées d'entraînement (au moins `max_rows` lignes) et de test (`test_rows` lignes)."""
+    analysis = import_command("train")
+    # preprocess_data réserve 20 % des lignes au test
+    rows = max(math.ceil(max_rows / 0.8), math.ceil(test_rows / 0.2))
+    data = processed_frame(crash_frame(rows, seed=seed))
+    X_train, X_test, y_train, y_test, preprocessor, _ = analysis.preprocess_data(data)
+    preprocessor.fit(X_train)
+    return (preprocessor.transform(X_train), y_train.to_numpy(),
+            preprocessor.transform(X_test[:test_rows]), y_test.to_numpy()[:test_rows])
+
+
+def measure(model, X_train, y_train, X_test, y_test):
+    """(durée d'entraînement, durée de predict_proba, AUC, taille sérialisée en octets)."""
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    y_prob = model.predict_proba(X_test)[:, 1]
+    predict_seconds = time.perf_counter() - start
+    return fit_seconds, predict_seconds, roc_auc_score(y_test, y_prob), len(pickle.dumps(model))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,5000,20000,100000", help="Lignes d'entraînement")
+    parser.add_argument("--test-rows", type=int, default=10_000)
+    parser.add_argument("--exact-max-rows", type=int, default=20_000,
+                        help="Taille maximale pour le SVC exact (coût au moins quadratique)")
+    parser.add_argument("--models", default=",".join(MODELS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-dir", default="results/benchmarks")
+    parser.add_argument("--compare", default=None, metavar="RAPPORT",
+                        help="Rapport de référence (`latest` : le dernier de --results-dir)")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    models = [name for name in args.models.split(",") if name]
+    baseline = previous_report(args.results_dir, "bench_kernel_svm") if args.compare == "latest" else args.compare
+
+    X_train, y_train, X_test, y_test = features(max(sizes), args.test_rows, args.seed)
+    run = start_run("bench_kernel_svm")
+    quality = {}
+    print(f"{'modèle':<10} {'lignes':>8} {'fit (s)':>9} {'predict (s)':>12} {'AUC':>7} {'modèle (Mo)':>12}")
+    for size in sizes:
+        for name in models:
+            if name == "exact" and size > args.exact_max_rows:
+                print(f"{name:<10} {size:>8}  ignoré (> --exact-max-rows)")
+                continue
+            fit_seconds, predict_seconds, auc, model_bytes = measure(
+                MODELS[name](), X_train[:size], y_train[:size], X_test, y_test)
+            record(f"{name}_fit@{size}", fit_seconds, rows=size)
+            record(f"{name}_predict@{size}", predict_seconds, rows=len(y_test), bytes=model_bytes)
+            quality[f"{name}@{size}"] = {"auc": auc, "model_bytes": model_bytes}
+            print(f"{name:<10} {size:>8} {fit_seconds:>9.2f} {predict_seconds:>12.3f} {auc:>7.4f} "
+                  f"{model_bytes / 2**20:>12.2f}")
+
+    path = end_run(Path(args.results_dir) / f"{run.run_id}.json", sizes=sizes, test_rows=args.test_rows,
+                   quality=quality)
+    print(f"Résultats: {path}")
+
+    if baseline:
+        lines, regressions = compare(load_report(baseline), load_report(path), args.threshold)
+        print(f"\nComparaison avec {baseline}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"Régressions : {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
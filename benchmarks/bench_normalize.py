@@ -0,0 +1,67 @@
+"""Compare la normalisation ligne par ligne à la normalisation vectorisée (normalize.py).
+
+Usage :
+    python -m benchmarks.bench_normalize --rows 3000000
+
+Le jeu synthétique mélange les formats des sources : dates ISO horodatées
+(NTSB), dates ASN (01-Jan-2023), victimes "x/y", lieux à 1, 2 ou 3 éléments.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from normalize import normalize_crashes
+
+
+def synthetic_frame(rows, seed=0):
+    """DataFrame de crashs bruts au format des extracteurs."""
+    rng = np.random.default_rng(seed)
+    days = pd.to_datetime("1950-01-01") + pd.to_timedelta(rng.integers(0, 27000, rows), unit="D")
+    iso = pd.Series(days.strftime("%Y-%m-%dT00:00:00Z"))
+    asn = pd.Series(days.strftime("%d-%b-%Y"))
+    ntsb = rng.random(rows) < 0.6
+    fatalities = rng.integers(0, 300, rows).astype(str)
+    occupants = rng.integers(0, 400, rows).astype(str)
+    cities = pd.Series(rng.integers(0, 5000, rows)).map("City {}".format)
+    countries = pd.Series(rng.integers(0, 200, rows)).map("Country {}".format)
+    return pd.DataFrame({
+        "event_date": iso.where(ntsb, asn),
+        "fatalities": pd.Series(fatalities).where(ntsb, pd.Series(fatalities) + "/" + pd.Series(occupants)),
+        "location": (cities + ", ST, " + countries).where(ntsb, cities + ", " + countries),
+        "operator": pd.Series(rng.integers(0, 3000, rows)).map("Operator {}".format),
+        "aircraft_type": pd.Series(rng.integers(0, 400, rows)).map("Type {}".format),
+    })
+
+
+def normalize_per_row(frame):
+    """Ancienne approche : inférence du format de date et conversions Python ligne par ligne."""
+    out = frame.copy()
+    out["event_date"] = pd.to_datetime(frame["event_date"], format="mixed", errors="coerce", utc=True)
+    out["fatalities"] = frame["fatalities"].map(lambda v: int(n) if (n := str(v).split('/')[0]).isdigit() else 0)
+    parts = frame["location"].map(lambda v: [p.strip() for p in str(v).split(',')])
+    out["city"] = parts.map(lambda p: p[0])
+    out["state"] = parts.map(lambda p: p[1] if len(p) == 3 else None)
+    out["country"] = parts.map(lambda p: p[-1] if len(p) > 1 else None)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows)
+    print(f"{args.rows} lignes, {frame.memory_usage(deep=True).sum() / 1e6:.0f} Mo")
+
+    for name, function in [("ligne par ligne", normalize_per_row), ("vectorisée", normalize_crashes)]:
+        start = time.perf_counter()
+        result = function(frame)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {elapsed:7.2f} s  {args.rows / elapsed:10.0f} lignes/s  "
+              f"{result.memory_usage(deep=True).sum() / 1e6:6.0f} Mo")
+
+
+if __name__ == "__main__":
+    main()
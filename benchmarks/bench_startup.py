@@ -0,0 +1,115 @@
+"""Coût de démarrage de chaque sous-commande de cli.py (`python -X importtime`).
+
+Usage :
+    python -m benchmarks.bench_startup --repeat 5 --compare latest
+
+Pour chaque sous-commande, mesure dans un processus neuf :
+- `help` : durée de `python cli.py <commande> --help` ;
+- `import` : temps d'import cumulé des modules de la commande
+  (cli.import_command), relevé par `-X importtime`, et ses modules les plus lents.
+Le meilleur de `--repeat` essais est retenu. Les processus tournent dans un
+répertoire temporaire qui doit rester vide (aucun effet de bord à l'import).
+Les résultats sont écrits au format des rapports d'exécution
+(results/benchmarks/bench_startup-<horodatage>.json).
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_suite import previous_report
+from cli import COMMAND_MODULES
+from instrumentation import compare, end_run, load_report, record, start_run
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_python(arguments, workdir):
+    """Lance `python <arguments>` ; renvoie (durée, sortie d'erreur)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, *arguments], cwd=workdir, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return elapsed, completed.stderr
+
+
+def parse_importtime(stderr):
+    """Modules importés au premier niveau et leur temps cumulé (µs), depuis la sortie de -X importtime."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Les imports imbriqués sont indentés d'au moins deux espaces supplémentaires
+        if not name.startswith("  "):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure(command, workdir, repeat):
+    """Meilleure durée de `--help` et meilleur temps d'import (s) de `command`, avec le détail des modules."""
+    help_seconds = min(run_python([str(REPO_ROOT / "cli.py"), command, "--help"], workdir)[0]
+                       for _ in range(repeat))
+    best = None
+    for _ in range(repeat):
+        _, stderr = run_python(["-X", "importtime", "-c", f"import cli; cli.import_command({command!r})"], workdir)
+        modules = parse_importtime(stderr)
+        if best is None or sum(modules.values()) < sum(best.values()):
+            best = modules
+    return help_seconds, sum(best.values()) / 1e6, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", default=",".join(dict.fromkeys(COMMAND_MODULES)))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Modules les plus lents affichés par commande")
+    parser.add_argument("--results-dir", default="results/benchmarks")
+    parser.add_argument("--compare", default=None, metavar="RAPPORT",
+                        help="Rapport de référence (`latest` : le dernier de --results-dir)")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    commands = [command for command in args.commands.split(",") if command]
+    baseline = previous_report(args.results_dir, "bench_startup") if args.compare == "latest" else args.compare
+
+    run = start_run("bench_startup")
+    modules = {}
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        print(f"{'commande':<10} {'--help (s)':>11} {'imports (s)':>12}  modules les plus lents")
+        for command in commands:
+            help_seconds, import_seconds, detail = measure(command, workdir, args.repeat)
+            record(f"{command}_help", help_seconds)
+            record(f"{command}_import", import_seconds)
+            slowest = sorted(detail.items(), key=lambda item: -item[1])[:args.top]
+            modules[command] = dict(slowest)
+            print(f"{command:<10} {help_seconds:>11.3f} {import_seconds:>12.3f}  "
+                  + ", ".join(f"{name} {us / 1e6:.2f}" for name, us in slowest))
+        leftovers = sorted(os.listdir(workdir))
+        if leftovers:
+            print(f"Attention : fichiers créés à l'import : {', '.join(leftovers)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    path = end_run(Path(args.results_dir) / f"{run.run_id}.json", commands=commands, slowest_modules=modules,
+                   import_side_effects=leftovers)
+    print(f"Résultats: {path}")
+
+    if baseline:
+        lines, regressions = compare(load_report(baseline), load_report(path), args.threshold)
+        print(f"\nComparaison avec {baseline}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"Régressions : {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
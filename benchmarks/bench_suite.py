@@ -0,0 +1,242 @@
+"""Débit et mémoire des étapes d'extraction, de chargement et de modélisation selon la taille des données.
+
+Usage :
+    python -m benchmarks.bench_suite --sizes 1000,10000,100000 --compare latest
+
+Pour chaque taille, les fichiers synthétiques (benchmarks/synthetic.py) sont
+générés une fois dans `--fixtures` puis réutilisés. Chaque étape mesurée
+tourne dans un processus neuf, dans un répertoire de travail temporaire :
+ses entrées sont préparées hors chronométrage, puis l'appel est mesuré
+(durée, lignes/s, pic de mémoire résidente et hausse de ce pic).
+
+Les résultats sont écrits au format des rapports d'exécution
+(results/benchmarks/bench_suite-<horodatage>.json, une étape par
+`cible@taille`) : `python instrumentation.py compare` les compare aussi.
+save_to_database écrit dans le schéma temporaire crash_bench_suite
+(variables DB_* habituelles).
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import read_ntsb_pages, write_fixtures
+from instrumentation import compare, end_run, load_report, peak_rss_bytes, record, start_run
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BENCH_SCHEMA = "crash_bench_suite"
+
+# Cible -> formats de fichiers synthétiques nécessaires
+TARGETS = {
+    "parse_ntsb": ["ntsb"],
+    "parse_asn": ["asn"],
+    "save_to_csv": ["ntsb"],
+    "save_to_database": ["ntsb"],
+    "load_data": ["csv"],
+    "preprocess_data": ["csv"],
+    "train_and_evaluate_models": ["csv"],
+}
+
+# SVC (probability=True) est quadratique : au-delà, l'entraînement est ignoré
+DEFAULT_MAX_TRAIN_ROWS = 20_000
+
+
+def load_script(name, filename):
+    """Charge un script du projet dont le nom contient des tirets."""
+    spec = importlib.util.spec_from_file_location(name, REPO_ROOT / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def reset_schema(pool):
+    """Recrée le schéma de test à partir de schema.sql."""
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE; CREATE SCHEMA {BENCH_SCHEMA};")
+            cursor.execute(f"SET search_path TO {BENCH_SCHEMA}, public;")
+            cursor.execute((REPO_ROOT / "schema.sql").read_text(encoding="utf-8"))
+        conn.commit()
+
+
+def drop_schema(pool):
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+        conn.commit()
+
+
+def prepare(target, fixtures, stack):
+    """Entrées de `target` (non chronométrées) ; renvoie (fonction à mesurer, lignes, octets d'entrée)."""
+    if target in ("parse_ntsb", "save_to_csv", "save_to_database"):
+        extraction = load_script("extraction", "improved-data-extraction.py")
+        pages = list(read_ntsb_pages(fixtures))
+        size = sum(path.stat().st_size for path in (fixtures / "ntsb").glob("page_*.json"))
+        rows = sum(len(page) for page in pages)
+        if target == "parse_ntsb":
+            return lambda: [extraction.parse_ntsb_items(page) for page in pages], rows, size
+        crashes = [crash for page in pages for crash in extraction.parse_ntsb_items(page)]
+        del pages
+        if target == "save_to_csv":
+            os.makedirs("data/processed", exist_ok=True)
+            return lambda: extraction.save_to_csv(crashes, "NTSB"), rows, size
+
+        # Lignes normalisées et géocodées comme dans le pipeline d'extraction
+        crashes = extraction.normalize_batch(crashes)
+        os.environ["PGOPTIONS"] = f"-c search_path={BENCH_SCHEMA},public"
+        from db_pool import close_pool, get_pool
+        pool = get_pool()
+        reset_schema(pool)
+        stack.callback(close_pool)
+        stack.callback(drop_schema, pool)
+
+        def save():
+            if not extraction.save_to_database(crashes, "NTSB", bulk=True):
+                raise RuntimeError("échec de l'enregistrement en base")
+        return save, rows, size
+
+    if target == "parse_asn":
+        from asn_parser import parse_asn_html
+        pages = [path.read_bytes() for path in sorted((fixtures / "asn").glob("*.html"))]
+        # Lignes comptées à la préparation (une ligne <tr class='list'> par crash)
+        rows = sum(page.count(b"<tr class='list'>") for page in pages)
+        return lambda: [parse_asn_html(page) for page in pages], rows, sum(len(page) for page in pages)
+
+    analysis = load_script("analysis", "improved-model-analysis.py")
+    csv_path = fixtures / "airplane_crashes.csv"
+    size = csv_path.stat().st_size
+    if target == "load_data":
+        def load():
+            if analysis.load_data(csv_path, columns=analysis.ANALYSIS_COLUMNS) is None:
+                raise RuntimeError("échec du chargement")
+        return load, None, size
+    data = analysis.load_data(csv_path, columns=analysis.ANALYSIS_COLUMNS)
+    rows = len(data)
+    if target == "preprocess_data":
+        return lambda: analysis.preprocess_data(data), rows, size
+    X_train, X_test, y_train, y_test, preprocessor, _ = analysis.preprocess_data(data)
+    analysis.prepare_directories()
+    return (lambda: analysis.train_and_evaluate_models(X_train, X_test, y_train, y_test, preprocessor),
+            rows, size)
+
+
+def run_target(target, fixtures, workdir, queue):
+    """Processus fils : prépare puis mesure une cible, et renvoie la mesure par `queue`."""
+    sys.path.insert(0, str(REPO_ROOT))
+    os.chdir(workdir)
+    try:
+        with contextlib.ExitStack() as stack:
+            # Les messages des scripts (rapports de classification...) ne sont pas affichés
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            function, rows, size = prepare(target, Path(fixtures), stack)
+            baseline = peak_rss_bytes()
+            start = time.perf_counter()
+            function()
+            seconds = time.perf_counter() - start
+            peak = peak_rss_bytes()
+        if rows is None:
+            with open(Path(fixtures) / "manifest.json", encoding="utf-8") as f:
+                rows = json.load(f)["rows"]
+        queue.put({"seconds": seconds, "rows": rows, "bytes": size,
+                   "peak_rss_bytes": peak, "peak_rss_increase_bytes": peak - baseline})
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def measure(target, fixtures):
+    """Lance `run_target` dans un processus neuf (répertoire de travail temporaire)."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        process = context.Process(target=run_target, args=(target, str(fixtures), workdir, queue))
+        process.start()
+        process.join()
+        if queue.empty():
+            # Processus tué (mémoire insuffisante...) avant d'avoir répondu
+            return {"error": f"processus terminé avec le code {process.exitcode}"}
+        return queue.get()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def previous_report(results_dir, name="bench_suite"):
+    """Dernier rapport `name` dans `results_dir`, ou None."""
+    reports = sorted(Path(results_dir).glob(f"{name}-*.json"))
+    return reports[-1] if reports else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Nombres de lignes, séparés par des virgules (ex. 1000,1000000,10000000)")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"Parmi {', '.join(TARGETS)}")
+    parser.add_argument("--fixtures", default="data/synthetic",
+                        help="Répertoire des fichiers synthétiques (un sous-répertoire par taille)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-train-rows", type=int, default=DEFAULT_MAX_TRAIN_ROWS,
+                        help="Taille maximale pour train_and_evaluate_models")
+    parser.add_argument("--no-db", action="store_true", help="Ignorer save_to_database")
+    parser.add_argument("--results-dir", default="results/benchmarks")
+    parser.add_argument("--compare", default=None, metavar="RAPPORT",
+                        help="Rapport de référence (`latest` : le dernier de --results-dir)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Hausse du coût par ligne tolérée avec --compare (0.2 = +20 %%)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    targets = [target for target in args.targets.split(",") if target]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"Cibles inconnues: {', '.join(sorted(unknown))}")
+    if args.no_db and "save_to_database" in targets:
+        targets.remove("save_to_database")
+    baseline = previous_report(args.results_dir) if args.compare == "latest" else args.compare
+
+    run = start_run("bench_suite")
+    memory = {}
+    errors = {}
+    print(f"{'cible':<26} {'lignes':>10} {'secondes':>9} {'lignes/s':>11} {'pic Mo':>8} {'hausse Mo':>10}")
+    for size in sizes:
+        fixtures = Path(args.fixtures) / str(size)
+        formats = sorted({name for target in targets for name in TARGETS[target]})
+        write_fixtures(fixtures, size, formats=formats, seed=args.seed)
+        for target in targets:
+            stage = f"{target}@{size}"
+            if target == "train_and_evaluate_models" and size > args.max_train_rows:
+                print(f"{target:<26} {size:>10}  ignoré (> --max-train-rows)")
+                continue
+            result = measure(target, fixtures.resolve())
+            if "error" in result:
+                errors[stage] = result["error"]
+                print(f"{target:<26} {size:>10}  erreur: {result['error']}")
+                continue
+            record(stage, result["seconds"], rows=result["rows"], bytes=result["bytes"])
+            memory[stage] = {"peak_rss_bytes": result["peak_rss_bytes"],
+                             "peak_rss_increase_bytes": result["peak_rss_increase_bytes"]}
+            print(f"{target:<26} {result['rows']:>10} {result['seconds']:>9.3f} "
+                  f"{result['rows'] / result['seconds']:>11.0f} {result['peak_rss_bytes'] / 2**20:>8.0f} "
+                  f"{result['peak_rss_increase_bytes'] / 2**20:>10.0f}")
+
+    path = end_run(Path(args.results_dir) / f"{run.run_id}.json", sizes=sizes, targets=targets,
+                   memory=memory, errors=errors)
+    print(f"Résultats: {path}")
+
+    if baseline:
+        lines, regressions = compare(load_report(baseline), load_report(path), args.threshold)
+        print(f"\nComparaison avec {baseline}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"Régressions : {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
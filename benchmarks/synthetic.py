@@ -0,0 +1,291 @@
+"""Générateur de données de crashs synthétiques aux formats des sources et du projet.
+
+Usage :
+    python -m benchmarks.synthetic --rows 1000000 --output data/synthetic --formats ntsb,asn,csv
+    python -m benchmarks.synthetic --rows 10000 --sample-csv airplane_crashes.csv
+
+Produit, pour `rows` accidents :
+- ntsb/page_000001.json... : réponses de l'API CAROL ({"results": [...]}, lues par parse_ntsb_item) ;
+- asn/1990_001.html... : listes annuelles ASN (tableau `statistics`, 100 lignes par page) ;
+- airplane_crashes.csv : fichier traité lu par improved-model-analysis.py.
+
+Avec `--sample-csv`, seul le fichier d'exemple de analyze_model_data.py est écrit.
+
+Les lignes sont générées par blocs (`chunk_rows`) : la mémoire reste bornée
+jusqu'à 10 M de lignes. Le même `seed` donne les mêmes fichiers.
+"""
+import argparse
+import html
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Version du générateur : enregistrée dans manifest.json pour réutiliser des fichiers compatibles
+GENERATOR_VERSION = 1
+
+DEFAULT_CHUNK_ROWS = 250_000
+NTSB_PAGE_SIZE = 1000
+ASN_PAGE_SIZE = 100
+
+FORMATS = ("ntsb", "asn", "csv")
+
+# Colonnes du fichier traité (celles de ANALYSIS_COLUMNS, plus les catégorielles)
+PROCESSED_COLUMNS = ["event_date", "location", "operator", "aircraft_type", "flight_number", "Fatalities", "target"]
+
+# Colonnes du fichier traité -> colonnes du fichier d'exemple de analyze_model_data.py
+SAMPLE_COLUMNS = {"event_date": "Date", "location": "Location", "operator": "Operator",
+                  "flight_number": "Flight Number", "Fatalities": "Fatalities", "target": "target"}
+
+US_PLACES = [
+    ("Anchorage", "AK"), ("Phoenix", "AZ"), ("Los Angeles", "CA"), ("San Diego", "CA"), ("Denver", "CO"),
+    ("Miami", "FL"), ("Orlando", "FL"), ("Atlanta", "GA"), ("Honolulu", "HI"), ("Chicago", "IL"),
+    ("Wichita", "KS"), ("Boston", "MA"), ("Detroit", "MI"), ("Minneapolis", "MN"), ("Las Vegas", "NV"),
+    ("New York", "NY"), ("Charlotte", "NC"), ("Columbus", "OH"), ("Portland", "OR"), ("Philadelphia", "PA"),
+    ("Nashville", "TN"), ("Dallas", "TX"), ("Houston", "TX"), ("Salt Lake City", "UT"), ("Seattle", "WA"),
+]
+
+WORLD_PLACES = [
+    ("Paris", "France"), ("Lyon", "France"), ("London", "United Kingdom"), ("Madrid", "Spain"),
+    ("Frankfurt", "Germany"), ("Moscow", "Russia"), ("Lagos", "Nigeria"), ("Nairobi", "Kenya"),
+    ("Cairo", "Egypt"), ("Mumbai", "India"), ("Jakarta", "Indonesia"), ("Manila", "Philippines"),
+    ("Tokyo", "Japan"), ("Sydney", "Australia"), ("São Paulo", "Brazil"), ("Bogotá", "Colombia"),
+    ("Lima", "Peru"), ("Mexico City", "Mexico"), ("Toronto", "Canada"), ("Kinshasa", "DR Congo"),
+]
+
+# (nom, part des accidents, avion de ligne)
+OPERATORS = [
+    ("Private", 0.45, False), ("Flight school", 0.12, False), ("Air taxi", 0.08, False),
+    ("Delta Air Lines", 0.03, True), ("American Airlines", 0.03, True), ("United Airlines", 0.03, True),
+    ("Air France", 0.02, True), ("Lufthansa", 0.02, True), ("Aeroflot", 0.03, True),
+    ("Garuda Indonesia", 0.02, True), ("Ethiopian Airlines", 0.02, True), ("LATAM Airlines", 0.02, True),
+    ("US Air Force", 0.05, False), ("Crop dusting", 0.08, False), ("Cargo charter", 0.06, True),
+]
+
+LIGHT_AIRCRAFT = ["Cessna 172", "Cessna 182", "Piper PA-28", "Beechcraft Bonanza", "Cirrus SR22",
+                  "Robinson R44", "Bell 206", "de Havilland DHC-6 Twin Otter"]
+AIRLINER_AIRCRAFT = ["Boeing 737-800", "Airbus A320", "Boeing 747-400", "Embraer ERJ-145", "ATR 72",
+                     "McDonnell Douglas MD-82", "Antonov An-26", "Boeing 777-200"]
+
+AIRPORTS = ["ATL", "LAX", "ORD", "DFW", "DEN", "JFK", "SEA", "MIA", "CDG", "LHR", "FRA", "SVO", "NRT", "GRU"]
+
+PHASES = ["takeoff", "initial climb", "cruise", "approach", "landing", "taxi", "maneuvering"]
+CAUSES = ["loss of engine power", "loss of control", "controlled flight into terrain",
+          "fuel exhaustion", "runway excursion", "structural failure", "icing", "bird strike"]
+
+
+def crash_frame(rows, seed=0, first_id=0):
+    """DataFrame de `rows` accidents synthétiques (champs communs aux deux sources)."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(first_id, first_id + rows)
+
+    days = rng.integers(0, 365 * 75, rows)
+    event_date = np.datetime64("1950-01-01") + days.astype("timedelta64[D]")
+
+    # Trois accidents sur cinq aux États-Unis (NTSB), les autres dans le monde
+    us = rng.random(rows) < 0.6
+    us_place = rng.integers(0, len(US_PLACES), rows)
+    world_place = rng.integers(0, len(WORLD_PLACES), rows)
+    us_cities = np.array([city for city, _ in US_PLACES], dtype=object)
+    us_states = np.array([state for _, state in US_PLACES], dtype=object)
+    world_cities = np.array([city for city, _ in WORLD_PLACES], dtype=object)
+    world_countries = np.array([country for _, country in WORLD_PLACES], dtype=object)
+
+    names = np.array([name for name, _, _ in OPERATORS], dtype=object)
+    weights = np.array([weight for _, weight, _ in OPERATORS])
+    operator = rng.choice(len(OPERATORS), rows, p=weights / weights.sum())
+    airliner = np.array([liner for _, _, liner in OPERATORS])[operator]
+
+    aircraft_type = np.where(airliner,
+                             np.array(AIRLINER_AIRCRAFT, dtype=object)[rng.integers(0, len(AIRLINER_AIRCRAFT), rows)],
+                             np.array(LIGHT_AIRCRAFT, dtype=object)[rng.integers(0, len(LIGHT_AIRCRAFT), rows)])
+    occupants = np.where(airliner, rng.integers(20, 350, rows), rng.integers(1, 7, rows))
+    # La plupart des accidents ne font aucune victime ; quelques-uns sont des accidents totaux
+    fatal = rng.random(rows) < np.where(airliner, 0.25, 0.2)
+    fatalities = np.where(fatal, np.ceil(occupants * rng.beta(0.8, 0.6, rows)), 0).astype(np.int32)
+
+    phase = np.array(PHASES, dtype=object)[rng.integers(0, len(PHASES), rows)]
+    cause = np.array(CAUSES, dtype=object)[rng.integers(0, len(CAUSES), rows)]
+    airports = np.array(AIRPORTS, dtype=object)
+
+    frame = pd.DataFrame({
+        "event_id": pd.Series(ids).map("SYN{:09d}".format).to_numpy(),
+        "event_date": event_date,
+        "city": np.where(us, us_cities[us_place], world_cities[world_place]),
+        "state": np.where(us, us_states[us_place], None),
+        "country": np.where(us, "United States", world_countries[world_place]),
+        "operator": names[operator],
+        "aircraft_type": aircraft_type,
+        "registration": np.where(us, "N", "G-") + pd.Series(rng.integers(1000, 99999, rows)).astype(str).to_numpy(),
+        "flight_number": np.where(airliner, "FL" + pd.Series(rng.integers(1, 9999, rows)).astype(str).to_numpy(), ""),
+        "departure": airports[rng.integers(0, len(airports), rows)],
+        "destination": airports[rng.integers(0, len(airports), rows)],
+        "occupants": occupants.astype(np.int32),
+        "fatalities": fatalities,
+        "narrative": ("The aircraft experienced " + cause + " during " + phase
+                      + " and was " + np.where(fatal, "destroyed", "substantially damaged") + "."),
+    })
+    frame["source"] = np.where(us, "NTSB", "ASN")
+    # Accident grave : plus probable avec les victimes, les avions de ligne et les décennies anciennes
+    score = 0.04 * fatalities + 1.2 * airliner - 0.02 * (days / 365) + rng.normal(0, 1, rows)
+    frame["target"] = (score > 0.4).astype(np.int8)
+    return frame
+
+
+def iter_crash_frames(rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Produit les accidents par blocs de `chunk_rows` (graine dérivée par bloc)."""
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        yield crash_frame(min(chunk_rows, rows - start), seed=seed * 100_003 + index, first_id=start)
+
+
+def ntsb_items(frame):
+    """Résultats au format de l'API NTSB CAROL (voir parse_ntsb_item)."""
+    dates = pd.Series(frame["event_date"]).dt.strftime("%Y-%m-%dT00:00:00Z")
+    return [{
+        "eventId": event_id,
+        "eventDate": event_date,
+        "city": city,
+        "state": state or "",
+        "country": country,
+        "operator": operator,
+        "aircraftType": aircraft_type,
+        "registration": registration,
+        "flightNumber": flight_number,
+        "departureAirport": departure,
+        "destinationAirport": destination,
+        "totalFatalities": int(fatalities),
+        "narrative": narrative,
+    } for event_id, event_date, city, state, country, operator, aircraft_type, registration, flight_number,
+        departure, destination, fatalities, narrative in zip(
+            frame["event_id"], dates, frame["city"], frame["state"], frame["country"], frame["operator"],
+            frame["aircraft_type"], frame["registration"], frame["flight_number"], frame["departure"],
+            frame["destination"], frame["fatalities"], frame["narrative"])]
+
+
+def asn_listing(frame):
+    """Page de liste ASN (tableau `statistics`) pour les lignes de `frame`."""
+    dates = pd.Series(frame["event_date"]).dt.strftime("%d-%b-%Y")
+    location = frame["city"] + np.where(frame["state"].notna(), ", " + frame["state"].fillna(""), "") \
+        + ", " + frame["country"]
+    lines = ["<html><head><title>ASN Aviation Safety Database</title></head><body>",
+             "<table class='statistics'><tr><th>date</th><th>type</th><th>reg.</th>"
+             "<th>operator</th><th>fat.</th><th>location</th><th></th></tr>"]
+    for event_id, day, registration, place, operator, aircraft_type, fatalities, occupants in zip(
+            frame["event_id"], dates, frame["registration"], location, frame["operator"],
+            frame["aircraft_type"], frame["fatalities"], frame["occupants"]):
+        # Ordre des cellules lu par asn_parser._row_to_crash : date, immatriculation, lieu, opérateur, type, victimes
+        lines.append(
+            f"<tr class='list'><td class='list'><a href='/wikibase/{event_id[3:].lstrip('0') or '0'}'>{day}</a></td>"
+            f"<td class='list'>{html.escape(registration)}</td><td class='list'>{html.escape(place)}</td>"
+            f"<td class='list'>{html.escape(operator)}</td><td class='list'>{html.escape(aircraft_type)}</td>"
+            f"<td class='list'>{fatalities}/{occupants}</td><td class='list'><img src='/flag.gif'></td></tr>")
+    lines.append("</table></body></html>")
+    return "\n".join(lines).encode("utf-8")
+
+
+def processed_frame(frame):
+    """Lignes du fichier traité lu par improved-model-analysis.py (colonnes PROCESSED_COLUMNS)."""
+    location = frame["city"] + np.where(frame["state"].notna(), ", " + frame["state"].fillna(""), "") \
+        + ", " + frame["country"]
+    return pd.DataFrame({
+        "event_date": pd.Series(frame["event_date"]).dt.strftime("%Y-%m-%d"),
+        "location": location,
+        "operator": frame["operator"],
+        "aircraft_type": frame["aircraft_type"],
+        "flight_number": frame["flight_number"],
+        "Fatalities": frame["fatalities"],
+        "target": frame["target"],
+    })
+
+
+def write_fixtures(directory, rows, formats=FORMATS, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS,
+                   ntsb_page_size=NTSB_PAGE_SIZE):
+    """Écrit les fichiers synthétiques de `rows` accidents dans `directory`.
+
+    Les fichiers existants sont réutilisés s'ils ont été produits avec les
+    mêmes paramètres (manifest.json). Renvoie le manifeste.
+    """
+    directory = Path(directory)
+    manifest = {"rows": rows, "seed": seed, "formats": sorted(formats), "ntsb_page_size": ntsb_page_size,
+                "generator_version": GENERATOR_VERSION}
+    manifest_path = directory / "manifest.json"
+    try:
+        if json.loads(manifest_path.read_text(encoding="utf-8")) == manifest:
+            return manifest
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path.unlink(missing_ok=True)
+    if "ntsb" in formats:
+        (directory / "ntsb").mkdir(exist_ok=True)
+    if "asn" in formats:
+        (directory / "asn").mkdir(exist_ok=True)
+    csv_path = directory / "airplane_crashes.csv"
+
+    ntsb_page = 0
+    asn_pages = {}
+    for index, frame in enumerate(iter_crash_frames(rows, seed=seed, chunk_rows=chunk_rows)):
+        if "ntsb" in formats:
+            items = ntsb_items(frame)
+            for start in range(0, len(items), ntsb_page_size):
+                ntsb_page += 1
+                with open(directory / "ntsb" / f"page_{ntsb_page:06d}.json", "w", encoding="utf-8") as f:
+                    json.dump({"results": items[start:start + ntsb_page_size]}, f)
+        if "asn" in formats:
+            # Une liste par année, paginée par ASN_PAGE_SIZE comme sur le site
+            years = pd.Series(frame["event_date"]).dt.year
+            for year, group in frame.groupby(years.to_numpy(), sort=True):
+                for start in range(0, len(group), ASN_PAGE_SIZE):
+                    asn_pages[year] = asn_pages.get(year, 0) + 1
+                    (directory / "asn" / f"{year}_{asn_pages[year]:05d}.html").write_bytes(
+                        asn_listing(group.iloc[start:start + ASN_PAGE_SIZE]))
+        if "csv" in formats:
+            processed_frame(frame).to_csv(csv_path, mode="w" if index == 0 else "a", header=index == 0,
+                                          index=False)
+
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return manifest
+
+
+def write_sample_csv(path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Écrit `rows` crashs synthétiques aux colonnes du fichier d'exemple de analyze_model_data.py."""
+    for index, frame in enumerate(iter_crash_frames(rows, seed=seed, chunk_rows=chunk_rows)):
+        sample = processed_frame(frame).rename(columns=SAMPLE_COLUMNS)[list(SAMPLE_COLUMNS.values())]
+        sample.to_csv(path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+
+
+def read_ntsb_pages(directory):
+    """Produit les résultats des pages NTSB synthétiques, page par page."""
+    for path in sorted(Path(directory, "ntsb").glob("page_*.json")):
+        with open(path, encoding="utf-8") as f:
+            yield json.load(f)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--output", default="data/synthetic")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Parmi ntsb, asn, csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--sample-csv", default=None, metavar="FICHIER",
+                        help="Écrire seulement le fichier d'exemple de analyze_model_data.py")
+    args = parser.parse_args()
+
+    if args.sample_csv:
+        write_sample_csv(args.sample_csv, args.rows, seed=args.seed, chunk_rows=args.chunk_rows)
+        print(f"Le fichier {args.sample_csv} a été généré avec {args.rows} crashs synthétiques.")
+        return
+
+    formats = [name for name in args.formats.split(",") if name]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"Formats inconnus: {', '.join(sorted(unknown))}")
+    write_fixtures(args.output, args.rows, formats=formats, seed=args.seed, chunk_rows=args.chunk_rows)
+    print(f"{args.rows} crashs synthétiques ({', '.join(formats)}) dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import json
+import os
+from pathlib import Path
+
+# Fichier des points de reprise par source (data/state/checkpoints.json)
+CHECKPOINT_FILE = Path(os.environ.get("CHECKPOINT_FILE", "data/state/checkpoints.json"))
+
+
+def load_checkpoints(path=CHECKPOINT_FILE):
+    """Charge tous les points de reprise ({source: {...}})."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def load_checkpoint(source, path=CHECKPOINT_FILE):
+    """Renvoie le point de reprise d'une source (dictionnaire vide si aucun)."""
+    return load_checkpoints(path).get(source, {})
+
+
+def save_checkpoint(source, checkpoint, path=CHECKPOINT_FILE):
+    """Enregistre le point de reprise d'une source de façon atomique."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoints = load_checkpoints(path)
+    checkpoints[source] = checkpoint
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoints, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,223 @@
+"""Point d'entrée unique : extraction, chargement, entraînement, prédiction et rapports.
+
+Usage :
+    python cli.py extract --incremental
+    python cli.py load data/synthetic/10000/ntsb/*.json --source NTSB --bulk
+    python cli.py train --parallel
+    python cli.py predict --input crashes.csv --output predictions.csv
+    python cli.py report compare results/runs/a.json results/runs/b.json
+
+Au démarrage, seuls argparse et la bibliothèque standard sont importés :
+chaque sous-commande importe son module (pandas, scikit-learn, psycopg2...)
+au moment de s'exécuter, et `--help` reste instantané. Les répertoires sont
+créés par les commandes qui écrivent dedans, jamais à l'import.
+"""
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Sous-commande -> (nom du module, script à tirets ou None pour un module importable)
+COMMAND_MODULES = {
+    "extract": ("improved_data_extraction", "improved-data-extraction.py"),
+    "load": ("improved_data_extraction", "improved-data-extraction.py"),
+    "train": ("improved_model_analysis", "improved-model-analysis.py"),
+    "predict": ("predict_model", None),
+    "report": ("instrumentation", None),
+}
+
+PROFILERS = ["cprofile", "sampling"]
+
+# Choix du modèle SVM de `train` (voir model_kernel.SVM_MODES, non importé : scikit-learn est lent à importer)
+SVM_MODES = ["auto", "exact", "approx"]
+
+
+def import_command(command):
+    """Importe (une seule fois par processus) le module qui implémente `command`."""
+    name, filename = COMMAND_MODULES[command]
+    if name in sys.modules:
+        return sys.modules[name]
+    if filename is None:
+        return importlib.import_module(name)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _stages(value):
+    return [stage for stage in value.split(",") if stage]
+
+
+def _batch_options(args):
+    """Options de lots renseignées (les valeurs par défaut sont celles des modules)."""
+    options = {}
+    if args.batch_size is not None:
+        options["batch_size"] = args.batch_size
+    if args.max_memory_mb is not None:
+        options["max_memory_bytes"] = args.max_memory_mb * 1024 * 1024
+    return options
+
+
+def run_extract(args):
+    extraction = import_command("extract")
+    extraction.main(backfill=args.backfill, max_pages=args.max_pages, concurrency=args.concurrency,
+                    bulk=args.bulk, incremental=args.incremental, offline=args.offline,
+                    asn_details=args.asn_details, profile=_stages(args.profile), profiler=args.profiler,
+                    report_path=args.report, **_batch_options(args))
+
+
+def run_load(args):
+    extraction = import_command("load")
+    extraction.load_files(args.files, args.source, csv_name=args.csv_name, bulk=args.bulk, append=args.append,
+                          profile=_stages(args.profile), profiler=args.profiler, report_path=args.report,
+                          **_batch_options(args))
+
+
+def run_train(args):
+    analysis = import_command("train")
+    if args.streaming or args.update:
+        if args.source == analysis.DB_SOURCE:
+            print("Le mode --streaming lit un fichier CSV ou Parquet, pas la base (--source db).")
+            return 2
+        analysis.train_streaming(args.source or analysis.default_data_file(), update_file=args.update,
+                                 epochs=args.epochs,
+                                 max_memory_bytes=args.max_memory_mb * 1024 * 1024 if args.max_memory_mb else None)
+    else:
+        analysis.main(parallel=args.parallel, n_jobs=args.n_jobs, tune=args.tune,
+                      profile=_stages(args.profile), profiler=args.profiler, report_path=args.report,
+                      source=args.source, start_date=args.start_date, end_date=args.end_date,
+                      importance_repeats=args.importance_repeats, importance_rows=args.importance_rows,
+                      svm=args.svm)
+
+
+def run_predict(args):
+    predict_model = import_command("predict")
+    if args.input:
+        predict_model.predict_file(args.input, args.output)
+    else:
+        predict_model.serve(args.host, args.port, watch_interval=args.watch,
+                            max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1000)
+
+
+def run_report(args):
+    instrumentation = import_command("report")
+    if args.command == "show":
+        print(instrumentation.summary(instrumentation.load_report(args.report)))
+        return 0
+    lines, regressions = instrumentation.compare(instrumentation.load_report(args.baseline),
+                                                 instrumentation.load_report(args.current), args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"Régressions : {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def _add_run_options(parser, example):
+    parser.add_argument("--profile", default="", metavar="ÉTAPES",
+                        help=f"Étapes à profiler, séparées par des virgules (ex. {example})")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    parser.add_argument("--report", default=None, help="Chemin du rapport d'exécution JSON")
+
+
+def _add_batch_options(parser):
+    parser.add_argument("--bulk", action="store_true", help="Charger la base par lots via COPY")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Nombre de crashs par lot enregistré (défaut : 5000)")
+    parser.add_argument("--max-memory-mb", type=int, default=None,
+                        help="Plafond mémoire des lots en attente d'écriture (défaut : PIPELINE_MAX_MEMORY_MB ou 256)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Base de données et analyse des crashs aériens")
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
+
+    extract = subparsers.add_parser("extract", help="Extraire les sources (NTSB, ASN) et les charger")
+    extract.add_argument("--backfill", action="store_true", help="Extraire toutes les pages NTSB en parallèle")
+    extract.add_argument("--incremental", action="store_true",
+                         help="N'extraire que les événements postérieurs aux points de reprise")
+    extract.add_argument("--offline", action="store_true",
+                         help="Rejouer les réponses depuis le cache local, sans accès réseau")
+    extract.add_argument("--asn-details", action="store_true",
+                         help="Suivre les liens ASN pour renseigner la route et le récit")
+    extract.add_argument("--max-pages", type=int, default=None, help="Nombre maximal de pages NTSB")
+    extract.add_argument("--concurrency", type=int, default=8, help="Nombre de requêtes NTSB simultanées")
+    _add_batch_options(extract)
+    _add_run_options(extract, "parse,normalize")
+    extract.set_defaults(handler=run_extract)
+
+    load = subparsers.add_parser("load", help="Charger des fichiers locaux (pages NTSB .json ou CSV)")
+    load.add_argument("files", nargs="+")
+    load.add_argument("--source", choices=["NTSB", "ASN"], required=True)
+    load.add_argument("--csv-name", default=None,
+                      help="Nom du CSV dans data/processed (défaut : source en minuscules)")
+    load.add_argument("--append", action="store_true",
+                      help="Ajouter au stockage Parquet au lieu de remplacer la partition de la source")
+    _add_batch_options(load)
+    _add_run_options(load, "normalize,db_write")
+    load.set_defaults(handler=run_load)
+
+    train = subparsers.add_parser("train", help="Entraîner et évaluer les modèles")
+    train.add_argument("--parallel", action="store_true", help="Entraîner les modèles en parallèle")
+    train.add_argument("--n-jobs", type=int, default=None,
+                       help="Nombre de processus en mode --parallel ou --tune et pour l'importance des "
+                            "caractéristiques (défaut : tous les cœurs)")
+    train.add_argument("--tune", action="store_true",
+                       help="Optimiser les hyperparamètres avant l'entraînement (reprend les évaluations déjà faites)")
+    train.add_argument("--source", default=None, metavar="FICHIER|db",
+                       help="Données d'entraînement : fichier CSV / Parquet, ou `db` pour lire la table "
+                            "airplane_crashes (défaut : data/processed)")
+    train.add_argument("--start-date", default=None, help="Premier jour chargé (Parquet ou base)")
+    train.add_argument("--end-date", default=None, help="Dernier jour chargé (Parquet ou base)")
+    train.add_argument("--svm", choices=SVM_MODES, default="auto",
+                       help="Modèle SVM : SVC exact, approximation du noyau (Nyström + SVM linéaire calibré), "
+                            "ou auto selon le nombre de lignes (SVM_EXACT_MAX_ROWS, défaut 10000)")
+    train.add_argument("--importance-repeats", type=int, default=5,
+                       help="Permutations par caractéristique pour l'importance des caractéristiques")
+    train.add_argument("--importance-rows", type=int, default=10000,
+                       help="Lignes de test (tirées au hasard au-delà) pour l'importance des caractéristiques")
+    train.add_argument("--streaming", action="store_true", help="Entraînement hors mémoire par blocs (partial_fit)")
+    train.add_argument("--update", metavar="FICHIER", default=None,
+                       help="Mettre à jour le modèle incrémental avec de nouvelles lignes (implique --streaming)")
+    train.add_argument("--max-memory-mb", type=int, default=None, help="Plafond mémoire des blocs en mode --streaming")
+    train.add_argument("--epochs", type=int, default=1, help="Passes sur les données en mode --streaming")
+    _add_run_options(train, "preprocess,fit")
+    train.set_defaults(handler=run_train)
+
+    predict = subparsers.add_parser("predict", help="Prédictions avec le dernier meilleur modèle sauvegardé")
+    predict.add_argument("--input", default=None, help="Fichier CSV à scorer (sinon : service HTTP)")
+    predict.add_argument("--output", default="predictions.csv", help="Fichier de sortie pour --input")
+    predict.add_argument("--host", default="127.0.0.1")
+    predict.add_argument("--port", type=int, default=8000)
+    predict.add_argument("--max-batch-size", type=int, default=512, help="Lignes maximum par lot")
+    predict.add_argument("--max-wait-ms", type=float, default=5.0, help="Attente maximum pour compléter un lot")
+    predict.add_argument("--watch", type=float, default=None, metavar="SECONDES",
+                         help="Charger automatiquement les nouveaux modèles de models/")
+    predict.set_defaults(handler=run_predict)
+
+    report = subparsers.add_parser("report", help="Rapports d'exécution : résumé et comparaison")
+    commands = report.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="Résumé d'un rapport")
+    show.add_argument("report")
+    diff = commands.add_parser("compare", help="Comparer deux rapports (code de sortie 1 si régression)")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.2,
+                      help="Hausse du coût par ligne tolérée (0.2 = +20 %%)")
+    report.set_defaults(handler=run_report)
+    return parser
+
+
+def main(argv=None):
+    """Exécute la sous-commande de `argv` ; renvoie le code de sortie."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import base64
+import json
+from decimal import Decimal
+
+from db_pool import get_pool
+
+# Configuration de recherche plein texte (identique au trigger de schema.sql)
+TEXT_SEARCH_CONFIG = "english"
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+RESULT_COLUMNS = ["id", "source", "event_date", "location", "operator", "aircraft_type",
+                  "registration", "fatalities", "source_url"]
+
+# Le rang est arrondi pour être comparé exactement d'une page à l'autre
+RANK_SQL = "round(ts_rank_cd(search_vector, query, 32)::numeric, 6)"
+
+
+def encode_cursor(values):
+    """Curseur opaque de pagination à partir des valeurs de tri de la dernière ligne."""
+    return base64.urlsafe_b64encode(json.dumps([str(value) for value in values]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+
+
+def search_crashes(query, operator=None, aircraft_type=None, start_date=None, end_date=None,
+                   order="rank", limit=DEFAULT_LIMIT, after=None):
+    """Recherche plein texte dans les crashs (récit, opérateur, appareil, lieu, route).
+
+    `query` utilise la syntaxe de recherche web ("engine failure" -icing).
+    Les résultats sont triés par pertinence (`order="rank"`) ou par date
+    (`order="date"`) et paginés par clé : `after` est le curseur renvoyé
+    avec la page précédente, ce qui évite de relire les pages sautées
+    comme le ferait OFFSET. Renvoie (résultats, curseur de la page suivante
+    ou None).
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    conditions = ["search_vector @@ query"]
+    params = [TEXT_SEARCH_CONFIG, query]
+
+    # Filtres (index sur event_date, operator et aircraft_type)
+    if operator:
+        conditions.append("operator = %s")
+        params.append(operator)
+    if aircraft_type:
+        conditions.append("aircraft_type = %s")
+        params.append(aircraft_type)
+    if start_date:
+        conditions.append("event_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("event_date <= %s")
+        params.append(end_date)
+
+    if order == "rank":
+        sort_columns = [RANK_SQL, "event_date", "id"]
+    elif order == "date":
+        sort_columns = ["event_date", "id"]
+    else:
+        raise ValueError(f"Tri inconnu: {order}")
+
+    if after:
+        # Tuple (rang, date, id) strictement après la dernière ligne de la page précédente
+        values = decode_cursor(after)
+        placeholders = ", ".join(["%s::numeric"] * (order == "rank") + ["%s::date", "%s::bigint"])
+        conditions.append(f"({', '.join(sort_columns)}) < ({placeholders})")
+        params.extend(values)
+
+    sql = f"""
+        SELECT {', '.join(RESULT_COLUMNS)}, {RANK_SQL} AS rank,
+               ts_headline(%s, coalesce(description, ''), query, 'MaxFragments=2, MaxWords=25') AS excerpt
+        FROM airplane_crashes, websearch_to_tsquery(%s, %s) AS query
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {', '.join(f'{column} DESC' for column in sort_columns)}
+        LIMIT %s
+    """
+    # Paramètres dans l'ordre du texte SQL : ts_headline, websearch_to_tsquery, filtres, limite
+    params = [TEXT_SEARCH_CONFIG] + params + [limit + 1]
+
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            names = [description[0] for description in cursor.description]
+            rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        conn.rollback()
+
+    for row in rows:
+        if isinstance(row["rank"], Decimal):
+            row["rank"] = float(row["rank"])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        keys = ([Decimal(str(last["rank"]))] if order == "rank" else []) + [last["event_date"], last["id"]]
+        next_cursor = encode_cursor(keys)
+    return rows, next_cursor
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_pool import close_pool
+    parser = argparse.ArgumentParser(description="Recherche plein texte dans les crashs aériens")
+    parser.add_argument("query")
+    parser.add_argument("--operator", default=None)
+    parser.add_argument("--aircraft-type", default=None)
+    parser.add_argument("--start-date", default=None)
+    parser.add_argument("--end-date", default=None)
+    parser.add_argument("--order", choices=["rank", "date"], default="rank")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--after", default=None, help="Curseur de la page suivante")
+    args = parser.parse_args()
+
+    try:
+        results, next_cursor = search_crashes(args.query, operator=args.operator, aircraft_type=args.aircraft_type,
+                                              start_date=args.start_date, end_date=args.end_date,
+                                              order=args.order, limit=args.limit, after=args.after)
+    finally:
+        close_pool()
+    for result in results:
+        print(f"{result['event_date']}  {result['rank']:.4f}  {result['operator'] or ''} "
+              f"{result['aircraft_type'] or ''} - {result['location'] or ''}")
+        print(f"    {result['excerpt']}")
+    if next_cursor:
+        print(f"\nPage suivante : --after {next_cursor}")
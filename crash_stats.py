@@ -0,0 +1,117 @@
+import pandas as pd
+
+from db_pool import get_pool
+
+# Dimensions disponibles : table d'agrégats et colonne de regroupement (voir schema.sql)
+ROLLUPS = {
+    "operator": ("crash_rollup_operator", "operator"),
+    "aircraft_type": ("crash_rollup_aircraft_type", "aircraft_type"),
+    "country": ("crash_rollup_country", "country"),
+}
+
+METRICS = ("crashes", "fatal_crashes", "fatalities")
+
+
+def _query(sql, params=()):
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+        conn.rollback()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _year_conditions(start_year, end_year):
+    conditions, params = [], []
+    if start_year is not None:
+        conditions.append("year >= %s")
+        params.append(start_year)
+    if end_year is not None:
+        conditions.append("year <= %s")
+        params.append(end_year)
+    return conditions, params
+
+
+def refresh_rollups(full=False):
+    """Recalcule les agrégats des années modifiées depuis le dernier rafraîchissement.
+
+    Avec `full`, toutes les années sont recalculées. Renvoie le nombre d'années traitées.
+    """
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT refresh_crash_rollups(%s);", (full,))
+            years = cursor.fetchone()[0]
+        conn.commit()
+    return years
+
+
+def crashes_per_year(source=None, start_year=None, end_year=None):
+    """Crashs, crashs mortels et victimes par année (toutes sources ou une seule)."""
+    conditions, params = _year_conditions(start_year, end_year)
+    if source:
+        conditions.append("source = %s")
+        params.append(source)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return _query(f"""
+        SELECT year, sum(crashes)::bigint AS crashes, sum(fatal_crashes)::bigint AS fatal_crashes,
+               sum(fatalities)::bigint AS fatalities
+        FROM crash_rollup_year {where}
+        GROUP BY year ORDER BY year
+    """, params)
+
+
+def top(dimension, start_year=None, end_year=None, metric="crashes", limit=10):
+    """Valeurs de `dimension` (operator, aircraft_type, country) les plus touchées sur la période."""
+    if dimension not in ROLLUPS:
+        raise ValueError(f"Dimension inconnue: {dimension}")
+    if metric not in METRICS:
+        raise ValueError(f"Mesure inconnue: {metric}")
+    table, column = ROLLUPS[dimension]
+    conditions, params = _year_conditions(start_year, end_year)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return _query(f"""
+        SELECT {column}, sum(crashes)::bigint AS crashes, sum(fatal_crashes)::bigint AS fatal_crashes,
+               sum(fatalities)::bigint AS fatalities
+        FROM {table} {where}
+        GROUP BY {column} ORDER BY {metric} DESC, {column} LIMIT %s
+    """, params + [limit])
+
+
+def trend(dimension, value, start_year=None, end_year=None):
+    """Série annuelle d'un opérateur, type d'appareil ou pays."""
+    if dimension not in ROLLUPS:
+        raise ValueError(f"Dimension inconnue: {dimension}")
+    table, column = ROLLUPS[dimension]
+    conditions, params = _year_conditions(start_year, end_year)
+    conditions.append(f"{column} = %s")
+    params.append(value)
+    return _query(f"""
+        SELECT year, crashes, fatal_crashes, fatalities FROM {table}
+        WHERE {' AND '.join(conditions)} ORDER BY year
+    """, params)
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_pool import close_pool
+    parser = argparse.ArgumentParser(description="Statistiques agrégées des crashs aériens")
+    parser.add_argument("--refresh", action="store_true", help="Rafraîchir les agrégats avant la requête")
+    parser.add_argument("--full", action="store_true", help="Avec --refresh, recalculer toutes les années")
+    parser.add_argument("--by", choices=sorted(ROLLUPS), default=None,
+                        help="Classement par dimension (sinon : série annuelle)")
+    parser.add_argument("--metric", choices=METRICS, default="crashes")
+    parser.add_argument("--start-year", type=int, default=None)
+    parser.add_argument("--end-year", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        if args.refresh:
+            print(f"{refresh_rollups(full=args.full)} années recalculées")
+        if args.by:
+            print(top(args.by, args.start_year, args.end_year, args.metric, args.limit).to_string(index=False))
+        else:
+            print(crashes_per_year(start_year=args.start_year, end_year=args.end_year).to_string(index=False))
+    finally:
+        close_pool()
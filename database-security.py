@@ -5,18 +5,13 @@ DB_PASSWORD=mypassword
 DB_HOST=localhost
 DB_PORT=5432
 
-# Pour utiliser ces variables dans vos scripts
-import os
-from dotenv import load_dotenv
+DB_POOL_MAX_SIZE=10
 
-# Charger les variables d'environnement
-load_dotenv()
+# Pour utiliser ces variables dans vos scripts
+# db_pool charge le fichier .env et lit les variables DB_* à la création du pool
+from db_pool import get_pool
 
-# Connexion à la base de données
-conn = psycopg2.connect(
-    dbname=os.environ.get("DB_NAME"),
-    user=os.environ.get("DB_USER"),
-    password=os.environ.get("DB_PASSWORD"),
-    host=os.environ.get("DB_HOST"),
-    port=os.environ.get("DB_PORT", 5432)
-)
+# Connexion à la base de données (empruntée au pool partagé, rendue en fin de bloc)
+with get_pool().connection() as conn:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1;")
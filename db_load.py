@@ -0,0 +1,141 @@
+import hashlib
+import io
+import re
+
+import pandas as pd
+
+from normalize import parse_fatalities
+
+# Colonnes de la table airplane_crashes alimentées par les extracteurs
+CRASH_COLUMNS = [
+    "source", "source_event_id", "dedup_key", "event_date", "location", "latitude", "longitude",
+    "operator", "aircraft_type",
+    "registration", "flight_number", "route", "fatalities",
+    "description", "source_url"
+]
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def dedup_key(crash, source):
+    """Calcule la clé de dédoublonnage d'un crash.
+
+    Utilise l'identifiant de l'événement chez la source s'il existe, sinon la
+    date et l'immatriculation normalisée. Doit rester identique au calcul SQL
+    de migrations/001_dedup_key_and_partitions.py.
+    """
+    source_event_id = crash.get("source_event_id")
+    if source_event_id:
+        basis = f"{source.lower()}|{source_event_id}"
+    else:
+        registration = re.sub(r"[^A-Za-z0-9]", "", crash.get("registration") or "").upper()
+        basis = f"{source.lower()}|{str(crash.get('event_date') or '')[:10]}|{registration}"
+    return hashlib.md5(basis.encode("utf-8")).hexdigest()
+
+
+def crash_row(crash, source, fatalities):
+    """Renvoie le tuple de valeurs d'un crash dans l'ordre de CRASH_COLUMNS
+    (`fatalities` : nombre de victimes déjà converti, voir crash_rows)."""
+    values = dict(crash)
+    values["source"] = source
+    values["source_event_id"] = crash.get("source_event_id") or None
+    values["dedup_key"] = dedup_key(crash, source)
+    values["fatalities"] = fatalities
+    values["event_date"] = crash.get("event_date") or None
+    return tuple(values.get(column) for column in CRASH_COLUMNS)
+
+
+def crash_rows(crashes, source):
+    """Tuples de valeurs d'un lot de crashs ; le nombre de victimes est converti
+    en une seule passe par normalize.parse_fatalities (format ASN "x/y" compris)."""
+    fatalities = parse_fatalities(pd.Series([crash.get("fatalities") for crash in crashes], dtype=object))
+    return [crash_row(crash, source, int(count)) for crash, count in zip(crashes, fatalities)]
+
+
+def insert_rows(cursor, crashes, source, batch_size=DEFAULT_BATCH_SIZE):
+    """Insère les crashs un par un (une requête par ligne).
+
+    Comme copy_rows, les lignes sans date sont ignorées et comptées comme
+    rejetées. Renvoie un dictionnaire {inserted, duplicates, rejected}.
+    """
+    columns = ", ".join(CRASH_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(CRASH_COLUMNS))
+    counts = {"inserted": 0, "duplicates": 0, "rejected": 0}
+    for batch in _batches(crashes, batch_size):
+        dated = [crash for crash in batch if crash.get("event_date")]
+        counts["rejected"] += len(batch) - len(dated)
+        for row in crash_rows(dated, source):
+            cursor.execute(f"""
+                INSERT INTO airplane_crashes ({columns})
+                VALUES ({placeholders})
+                ON CONFLICT (dedup_key, event_date) DO NOTHING;  -- Évite les doublons
+            """, row)
+            counts["inserted"] += cursor.rowcount
+            counts["duplicates"] += 1 - cursor.rowcount
+    return counts
+
+
+def _copy_value(value):
+    """Formate une valeur pour COPY au format texte."""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _copy_buffer(rows):
+    """Construit un tampon COPY (format texte) à partir de tuples de valeurs."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _batches(crashes, batch_size):
+    """Découpe un itérable de crashs en lots de taille `batch_size`."""
+    batch = []
+    for crash in crashes:
+        batch.append(crash)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def copy_rows(cursor, crashes, source, batch_size=DEFAULT_BATCH_SIZE):
+    """Charge les crashs par lots via COPY dans une table temporaire puis fusionne.
+
+    Chaque lot est copié dans `crash_staging` puis inséré dans
+    `airplane_crashes` en une seule requête ensembliste. Les lignes sans date
+    sont ignorées. Renvoie un dictionnaire {inserted, duplicates, rejected}.
+    """
+    columns = ", ".join(CRASH_COLUMNS)
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS crash_staging AS
+        SELECT {columns} FROM airplane_crashes WITH NO DATA;
+    """)
+    counts = {"inserted": 0, "duplicates": 0, "rejected": 0}
+
+    for batch in _batches(crashes, batch_size):
+        cursor.execute("TRUNCATE crash_staging;")
+        cursor.copy_expert(
+            f"COPY crash_staging ({columns}) FROM STDIN",
+            _copy_buffer(crash_rows(batch, source))
+        )
+        cursor.execute(f"""
+            INSERT INTO airplane_crashes ({columns})
+            SELECT {columns} FROM crash_staging
+            WHERE event_date IS NOT NULL
+            ON CONFLICT (dedup_key, event_date) DO NOTHING;
+        """)
+        inserted = cursor.rowcount
+        rejected = sum(1 for crash in batch if not crash.get("event_date"))
+        counts["inserted"] += inserted
+        counts["rejected"] += rejected
+        counts["duplicates"] += len(batch) - rejected - inserted
+
+    cursor.execute("TRUNCATE crash_staging;")
+    return counts
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool
+from dotenv import load_dotenv
+
+# Taille maximale du pool par défaut (DB_POOL_MAX_SIZE dans .env)
+DEFAULT_MAX_SIZE = 10
+
+# Une connexion inactive depuis plus longtemps est vérifiée avant réutilisation
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+def db_config():
+    """Paramètres de connexion depuis les variables d'environnement DB_* (et le fichier .env).
+
+    Lus à la création du pool, pas à l'import du module.
+    """
+    load_dotenv()
+    return {
+        "dbname": os.environ.get("DB_NAME"),
+        "user": os.environ.get("DB_USER"),
+        "password": os.environ.get("DB_PASSWORD"),
+        "host": os.environ.get("DB_HOST"),
+        "port": os.environ.get("DB_PORT", 5432)
+    }
+
+
+class PoolTimeout(Exception):
+    """Aucune connexion libre dans le délai imparti."""
+
+
+class ConnectionPool:
+    """Pool de connexions PostgreSQL partagé entre threads.
+
+    Bloque (avec délai maximal) quand les `max_size` connexions sont prises,
+    vérifie les connexions restées inactives avant de les rendre, et compte
+    les emprunts et le temps d'attente.
+    """
+
+    def __init__(self, config=None, min_size=1, max_size=None, timeout=30.0):
+        config = config or db_config()
+        if max_size is None:
+            max_size = int(os.environ.get("DB_POOL_MAX_SIZE", DEFAULT_MAX_SIZE))
+        self.timeout = timeout
+        self._pool = pool.ThreadedConnectionPool(min_size, max_size, **config)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # Dernier retour au pool de chaque connexion (clé : la connexion elle-même,
+        # un id() pouvant être réattribué à une nouvelle connexion)
+        self._last_used = {}
+        self.stats = {
+            "checkouts": 0,
+            "wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "health_check_failures": 0,
+        }
+
+    def _is_healthy(self, conn):
+        """Vérifie qu'une connexion inactive répond encore."""
+        if conn.closed:
+            return False
+        if time.monotonic() - self._last_used.get(conn, time.monotonic()) < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Emprunte une connexion, en attendant qu'une place se libère si besoin."""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"Aucune connexion disponible après {self.timeout} s")
+        try:
+            conn = self._pool.getconn()
+            while not self._is_healthy(conn):
+                with self._lock:
+                    self.stats["health_check_failures"] += 1
+                self._discard(conn)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.stats["checkouts"] += 1
+            self.stats["wait_time"] += waited
+            self.stats["max_wait_time"] = max(self.stats["max_wait_time"], waited)
+        return conn
+
+    def _discard(self, conn):
+        """Ferme une connexion et oublie sa date de dernière utilisation."""
+        self._last_used.pop(conn, None)
+        self._pool.putconn(conn, close=True)
+
+    def putconn(self, conn, close=False):
+        """Rend une connexion au pool (toute transaction ouverte est annulée)."""
+        try:
+            if conn.closed or close:
+                self._discard(conn)
+            else:
+                conn.rollback()
+                self._last_used[conn] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Emprunte une connexion le temps d'un bloc `with`.
+
+        Le code appelant valide lui-même sa transaction ; en cas d'exception
+        la transaction est annulée avant de rendre la connexion.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        """Ferme toutes les connexions du pool."""
+        self._pool.closeall()
+        self._last_used.clear()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Renvoie le pool partagé, créé à la première utilisation depuis db_config()."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+def close_pool():
+    """Ferme le pool partagé et affiche ses compteurs."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            stats = _pool.stats
+            print(f"Pool de connexions: {stats['checkouts']} emprunts, "
+                  f"attente totale {stats['wait_time']:.3f} s (max {stats['max_wait_time']:.3f} s)")
+            _pool.closeall()
+            _pool = None
@@ -0,0 +1,259 @@
+import difflib
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from normalize import parse_dates, parse_fatalities
+from parquet_store import PARQUET_DIR, load_parquet
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # rapidfuzz est optionnel : repli sur difflib (plus lent)
+    fuzz = None
+
+# Sources rapprochées : la première est prioritaire pour les champs de l'événement canonique
+SOURCES = ("NTSB", "ASN")
+CANONICAL_DIR = Path("data/processed/canonical")
+
+RESOLUTION_COLUMNS = ["source", "source_event_id", "event_date", "registration", "operator",
+                      "aircraft_type", "location", "fatalities"]
+
+# Poids des critères du score de rapprochement (somme = 1)
+WEIGHTS = {"registration": 0.35, "date": 0.2, "operator": 0.25, "location": 0.1, "fatalities": 0.1}
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_WINDOW_DAYS = 2
+CHUNK_PAIRS = 50_000
+
+# Mots sans valeur discriminante dans les noms d'opérateurs
+OPERATOR_STOPWORDS = r"\b(?:airlines?|airways|air lines|aviation|inc|corp|co|ltd|llc|sa|plc)\b"
+
+
+def normalize_registration(series):
+    """Immatriculation en majuscules alphanumériques (comme db_load.dedup_key), NA si vide."""
+    registration = series.astype("string").str.upper().str.replace(r"[^A-Z0-9]", "", regex=True)
+    return registration.mask(registration == "")
+
+
+def normalize_operator(series):
+    """Nom d'opérateur simplifié pour le blocage (minuscules, sans ponctuation ni suffixes)."""
+    operator = (series.astype("string").str.lower()
+                .str.replace(r"[^\w\s]", " ", regex=True)
+                .str.replace(OPERATOR_STOPWORDS, " ", regex=True)
+                .str.replace(r"\s+", " ", regex=True).str.strip())
+    return operator.mask(operator == "")
+
+
+def prepare(frame):
+    """Clés de blocage et de comparaison d'un DataFrame de crashs (même index)."""
+    dates = parse_dates(frame["event_date"])
+    return pd.DataFrame({
+        "day": (dates - pd.Timestamp("1970-01-01")).dt.days,
+        "reg": normalize_registration(frame["registration"]),
+        "op": normalize_operator(frame["operator"]),
+        "loc": frame["location"].astype("string").str.lower().fillna(""),
+        "fatalities": parse_fatalities(frame["fatalities"]),
+    }, index=frame.index)
+
+
+def candidate_pairs(left, right, window_days=DEFAULT_WINDOW_DAYS):
+    """Paires candidates (indices gauche/droite) issues des index de blocage.
+
+    Bloc 1 : même immatriculation et dates à `window_days` jours près.
+    Bloc 2 : même opérateur normalisé et dates à `window_days` jours près.
+    Seules ces paires sont comparées, jamais le produit cartésien.
+    """
+    lhs = left.reset_index(names="lid")
+    rhs = right.reset_index(names="rid")
+
+    by_registration = lhs.dropna(subset=["reg"])[["lid", "reg", "day"]].merge(
+        rhs.dropna(subset=["reg"])[["rid", "reg", "day"]], on="reg", suffixes=("_l", "_r"))
+    by_registration = by_registration[(by_registration["day_l"] - by_registration["day_r"]).abs() <= window_days]
+
+    # Fenêtre de dates : le côté droit est dupliqué pour chaque décalage
+    shifted = pd.concat([rhs.dropna(subset=["op"])[["rid", "op", "day"]].assign(day=lambda f, d=d: f["day"] + d)
+                         for d in range(-window_days, window_days + 1)])
+    by_operator = lhs.dropna(subset=["op"])[["lid", "op", "day"]].merge(shifted, on=["op", "day"])
+
+    return (pd.concat([by_registration[["lid", "rid"]], by_operator[["lid", "rid"]]])
+              .drop_duplicates(ignore_index=True))
+
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    if fuzz is not None:
+        return fuzz.token_set_ratio(a, b) / 100
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def _fuzzy_scores(operators_left, operators_right, locations_left, locations_right):
+    """Similarités opérateur et lieu d'un lot de paires (exécuté dans un processus)."""
+    return (np.array([_similarity(a, b) for a, b in zip(operators_left, operators_right)]),
+            np.array([_similarity(a, b) for a, b in zip(locations_left, locations_right)]))
+
+
+def score_pairs(left, right, pairs, window_days=DEFAULT_WINDOW_DAYS, workers=None):
+    """Score de rapprochement (0 à 1) de chaque paire candidate.
+
+    Les critères numériques sont vectorisés ; les comparaisons de chaînes sont
+    réparties par lots de CHUNK_PAIRS paires sur `workers` processus.
+    """
+    l = left.loc[pairs["lid"]].reset_index(drop=True)
+    r = right.loc[pairs["rid"]].reset_index(drop=True)
+
+    registration = np.where(l["reg"].isna() | r["reg"].isna(), 0.5,
+                            (l["reg"] == r["reg"]).fillna(False).astype(float))
+    date = 1 - (l["day"] - r["day"]).abs().to_numpy(dtype=float) / (window_days + 1)
+    fatalities_l, fatalities_r = l["fatalities"].to_numpy(), r["fatalities"].to_numpy()
+    fatalities = 1 - np.abs(fatalities_l - fatalities_r) / np.maximum(np.maximum(fatalities_l, fatalities_r), 1)
+
+    operators_l, operators_r = l["op"].fillna("").tolist(), r["op"].fillna("").tolist()
+    locations_l, locations_r = l["loc"].tolist(), r["loc"].tolist()
+    chunks = range(0, len(pairs), CHUNK_PAIRS)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_fuzzy_scores,
+                                    *zip(*[(operators_l[i:i + CHUNK_PAIRS], operators_r[i:i + CHUNK_PAIRS],
+                                            locations_l[i:i + CHUNK_PAIRS], locations_r[i:i + CHUNK_PAIRS])
+                                           for i in chunks]))) if len(pairs) else []
+    operator = np.concatenate([o for o, _ in results]) if results else np.array([])
+    location = np.concatenate([c for _, c in results]) if results else np.array([])
+
+    return (WEIGHTS["registration"] * registration + WEIGHTS["date"] * date
+            + WEIGHTS["operator"] * operator + WEIGHTS["location"] * location
+            + WEIGHTS["fatalities"] * fatalities)
+
+
+def match(pairs, scores, threshold=DEFAULT_THRESHOLD):
+    """Rapprochements un pour un : meilleures paires au-dessus du seuil, chaque crash au plus une fois."""
+    matches = pairs.assign(score=scores)
+    matches = matches[matches["score"] >= threshold].sort_values("score", ascending=False, kind="stable")
+    return matches.drop_duplicates("lid").drop_duplicates("rid").reset_index(drop=True)
+
+
+def _dedup_keys(frame):
+    """Clés de dédoublonnage (identiques à db_load.dedup_key) des crashs de `frame`."""
+    event_ids = frame["source_event_id"].astype("string").fillna("")
+    registrations = frame["registration"].astype("string").str.replace(r"[^A-Za-z0-9]", "", regex=True).str.upper()
+    dates = frame["event_date"].astype("string").str.slice(0, 10).fillna("")
+    sources = frame["source"].astype("string").str.lower()
+    bases = (sources + "|" + event_ids).where(event_ids != "",
+                                              sources + "|" + dates + "|" + registrations.fillna(""))
+    return [hashlib.md5(basis.encode("utf-8")).hexdigest() for basis in bases]
+
+
+def canonical_events(primary, secondary, matches):
+    """Table canonique (un événement par accident) et liens vers les crashs de chaque source.
+
+    L'identifiant d'un événement est la clé de dédoublonnage de son crash de
+    la source prioritaire (ou du crash seul s'il n'a pas été rapproché).
+    """
+    columns = ["event_date", "location", "operator", "aircraft_type", "registration", "fatalities"]
+    matched_primary = primary.loc[matches["lid"]].reset_index(drop=True)
+    matched_secondary = secondary.loc[matches["rid"]].reset_index(drop=True)
+    merged = matched_primary[columns].astype(object).where(matched_primary[columns].notna(),
+                                                           matched_secondary[columns].astype(object))
+    merged["event_id"] = matched_primary["dedup_key"]
+    merged["source_count"] = 2
+
+    alone_primary = primary.drop(index=matches["lid"])
+    alone_secondary = secondary.drop(index=matches["rid"])
+    singles = pd.concat([alone_primary, alone_secondary])
+    singles = singles[columns].assign(event_id=singles["dedup_key"], source_count=1)
+    events = pd.concat([merged, singles], ignore_index=True)[["event_id", "source_count"] + columns]
+    events["event_date"] = parse_dates(events["event_date"]).dt.date
+    events["fatalities"] = parse_fatalities(events["fatalities"])
+
+    def links(frame, event_ids, scores):
+        return pd.DataFrame({"event_id": event_ids, "source": frame["source"].to_numpy(),
+                             "dedup_key": frame["dedup_key"].to_numpy(),
+                             "source_event_id": frame["source_event_id"].to_numpy(),
+                             "event_date": frame["event_date"].to_numpy(), "match_score": scores})
+
+    event_links = pd.concat([
+        links(matched_primary, matched_primary["dedup_key"], matches["score"].to_numpy()),
+        links(matched_secondary, matched_primary["dedup_key"], matches["score"].to_numpy()),
+        links(alone_primary, alone_primary["dedup_key"], np.nan),
+        links(alone_secondary, alone_secondary["dedup_key"], np.nan),
+    ], ignore_index=True)
+    event_links["event_date"] = parse_dates(event_links["event_date"]).dt.date
+    return events, event_links
+
+
+def _source_crashes(crashes, source):
+    """Crashs datés d'une source, un seul par clé de dédoublonnage (le stockage Parquet
+    peut contenir plusieurs versions d'un crash après des extractions incrémentales)."""
+    frame = crashes[crashes["source"] == source]
+    frame = frame[parse_dates(frame["event_date"]).notna()]
+    frame = frame.assign(dedup_key=_dedup_keys(frame))
+    return frame.drop_duplicates("dedup_key", keep="last").reset_index(drop=True)
+
+
+def resolve(crashes, sources=SOURCES, window_days=DEFAULT_WINDOW_DAYS, threshold=DEFAULT_THRESHOLD, workers=None):
+    """Rapproche les crashs de deux sources et renvoie (événements, liens, statistiques)."""
+    primary = _source_crashes(crashes, sources[0])
+    secondary = _source_crashes(crashes, sources[1])
+    left, right = prepare(primary), prepare(secondary)
+
+    pairs = candidate_pairs(left, right, window_days)
+    scores = score_pairs(left, right, pairs, window_days, workers)
+    matches = match(pairs, scores, threshold)
+    events, links = canonical_events(primary, secondary, matches)
+    stats = {"records": len(crashes), "candidate_pairs": len(pairs), "matches": len(matches),
+             "events": len(events)}
+    return events, links, stats
+
+
+def save_events(events, links, output_dir=CANONICAL_DIR):
+    """Enregistre les événements canoniques et leurs liens en Parquet."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    events.to_parquet(output_dir / "crash_events.parquet", index=False)
+    links.to_parquet(output_dir / "crash_event_links.parquet", index=False)
+
+
+def _copy_frame(cursor, table, frame):
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def save_events_to_database(events, links):
+    """Remplace le contenu de crash_events et crash_event_links (voir schema.sql)."""
+    from db_pool import get_pool
+
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("TRUNCATE crash_events, crash_event_links")
+            _copy_frame(cursor, "crash_events", events)
+            _copy_frame(cursor, "crash_event_links", links.drop(columns=["source_event_id"]))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Rapprochement des crashs NTSB et ASN")
+    parser.add_argument("--input", default=str(PARQUET_DIR), help="Jeu Parquet des données traitées")
+    parser.add_argument("--output", default=str(CANONICAL_DIR))
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--workers", type=int, default=None, help="Processus pour la comparaison floue")
+    parser.add_argument("--database", action="store_true", help="Enregistrer aussi les tables en base")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    crashes = load_parquet(args.input, columns=RESOLUTION_COLUMNS, sources=SOURCES)
+    events, links, stats = resolve(crashes, window_days=args.window_days, threshold=args.threshold,
+                                   workers=args.workers or os.cpu_count())
+    save_events(events, links, args.output)
+    if args.database:
+        save_events_to_database(events, links)
+    print(f"{stats['records']} crashs, {stats['candidate_pairs']} paires candidates, "
+          f"{stats['matches']} rapprochements, {stats['events']} événements "
+          f"en {time.perf_counter() - start:.1f}s -> {args.output}")
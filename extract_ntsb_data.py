@@ -1,37 +1,29 @@
 import psycopg2
 
-# Remplacez les valeurs suivantes par les informations valides de votre base de données
-dbname = "mydatabase"
-user = "myuser"
-password = "mypassword"
-host = "localhost"
-port = 5432  # Assurez-vous que le port est un entier
+from db_pool import close_pool, get_pool
+
+# Les informations de connexion sont lues depuis le fichier .env (DB_NAME, DB_USER, ...)
 
 try:
-    # Connexion à la base de données PostgreSQL
-    conn = psycopg2.connect(
-        dbname=dbname,
-        user=user,
-        password=password,
-        host=host,
-        port=port
-    )
-    print("Connexion réussie à la base de données")
-    
-    # Créez un curseur pour exécuter des requêtes SQL
-    cursor = conn.cursor()
-    
-    # Exemple de requête pour vérifier la connexion
-    cursor.execute("SELECT * FROM your_table LIMIT 5;")
-    rows = cursor.fetchall()
-    for row in rows:
-        print(row)
-    
-    # Fermez le curseur et la connexion
-    cursor.close()
-    conn.close()
+    # Connexion à la base de données PostgreSQL via le pool partagé
+    with get_pool().connection() as conn:
+        print("Connexion réussie à la base de données")
+        
+        # Créez un curseur pour exécuter des requêtes SQL
+        cursor = conn.cursor()
+        
+        # Exemple de requête pour vérifier la connexion
+        cursor.execute("SELECT * FROM airplane_crashes LIMIT 5;")
+        rows = cursor.fetchall()
+        for row in rows:
+            print(row)
+        
+        # Fermez le curseur (la connexion est rendue au pool)
+        cursor.close()
     
 except psycopg2.OperationalError as e:
     print(f"Erreur de connexion à la base de données : {e}")
 except Exception as e:
-    print(f"Une erreur s'est produite : {e}")
\ No newline at end of file
+    print(f"Une erreur s'est produite : {e}")
+finally:
+    close_pool()
\ No newline at end of file
@@ -0,0 +1,267 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from normalize import split_location
+
+# Gazetier local (GAZETTEER_FILE dans .env) : CSV city,state,country,latitude,longitude[,population].
+# Une ligne sans ville donne le centre d'un état ou d'un pays.
+GAZETTEER_FILE = Path(os.environ.get("GAZETTEER_FILE", "data/reference/gazetteer.csv"))
+
+# Cache persistant des lieux déjà résolus (GEOCODE_CACHE_FILE dans .env)
+GEOCODE_CACHE_FILE = Path(os.environ.get("GEOCODE_CACHE_FILE", "data/state/geocode_cache.json"))
+
+GEO_COLUMNS = ['latitude', 'longitude']
+
+# Variantes courantes des noms de pays dans les sources
+COUNTRY_ALIASES = {
+    'usa': 'united states',
+    'us': 'united states',
+    'u s a': 'united states',
+    'united states of america': 'united states',
+    'uk': 'united kingdom',
+    'great britain': 'united kingdom',
+    'england': 'united kingdom',
+    'russian federation': 'russia',
+    'ussr': 'russia',
+    'republic of korea': 'south korea',
+    'korea': 'south korea',
+}
+
+# Qualificatifs ASN retirés avant la recherche (« near X », « 12 km NE of X », « off X »)
+QUALIFIER_PATTERN = (r'^(?:(?:about|approx|approximately|ca)\s+)?'
+                     r'(?:\d+(?:\s\d+)?\s*(?:km|mi|miles?|nm)\s+)?'
+                     r'(?:(?:n|s|e|w|ne|nw|se|sw|nne|ene|ese|sse|ssw|wsw|wnw|nnw)\s+)?(?:of|from)\s+'
+                     r'|^(?:near|nr|off|over|outside)\s+')
+
+# Niveaux de recherche, du plus précis au plus large :
+# (précision, colonnes du lieu, colonnes du gazetier)
+RESOLUTION_LEVELS = [
+    ('city', ['city', 'state', 'country'], ['city', 'state', 'country']),
+    ('city', ['city', 'country'], ['city', 'country']),
+    # « Anchorage, AK » : le second élément est un état
+    ('city', ['city', 'country'], ['city', 'state']),
+    ('state', ['state', 'country'], ['state', 'country']),
+    ('state', ['country'], ['state']),
+    ('country', ['country'], ['country']),
+    # Lieu à un seul élément : pays ou mer d'abord, sinon la ville la plus peuplée de ce nom
+    ('country', ['city'], ['country']),
+    ('city', ['city'], ['city']),
+]
+
+
+def normalize_location(series):
+    """Forme canonique d'un lieu : minuscules sans accents ni ponctuation, qualificatifs retirés.
+
+    Les virgules sont conservées pour séparer ville, état et pays.
+    """
+    text = (series.astype('string').str.normalize('NFKD')
+            .str.encode('ascii', errors='ignore').str.decode('ascii')
+            .str.lower()
+            .str.replace(r'[^a-z0-9,]+', ' ', regex=True)
+            .str.replace(QUALIFIER_PATTERN, '', regex=True)
+            .str.replace(r'\s*,[\s,]*', ', ', regex=True)
+            .str.strip(' ,'))
+    return text.mask(text == '')
+
+
+def _location_parts(keys):
+    """Découpe des lieux normalisés en city/state/country (pays ramenés à leur nom usuel)."""
+    parts = split_location(keys).astype(object)
+    parts = parts.where(parts.notna(), None)
+    parts['country'] = parts['country'].map(lambda value: COUNTRY_ALIASES.get(value, value))
+    # Un lieu à un seul élément qui est une variante de pays (« USA »)
+    single = parts['state'].isna() & parts['country'].isna()
+    parts.loc[single, 'city'] = parts.loc[single, 'city'].map(lambda value: COUNTRY_ALIASES.get(value, value))
+    return parts
+
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """Charge le gazetier et normalise ses noms comme les lieux à résoudre."""
+    gazetteer = pd.read_csv(path, dtype={'city': 'string', 'state': 'string', 'country': 'string'},
+                            keep_default_na=False, na_values=[''])
+    if 'population' not in gazetteer.columns:
+        gazetteer['population'] = 0
+    gazetteer['population'] = pd.to_numeric(gazetteer['population'], errors='coerce').fillna(0)
+    for column in ['city', 'state', 'country']:
+        gazetteer[column] = normalize_location(gazetteer[column].str.replace(',', ' ', regex=False))
+    gazetteer['country'] = gazetteer['country'].map(lambda value: COUNTRY_ALIASES.get(value, value),
+                                                    na_action='ignore')
+    gazetteer = gazetteer.astype({column: object for column in ['city', 'state', 'country']})
+    gazetteer = gazetteer.where(gazetteer.notna(), None)
+    return (gazetteer.dropna(subset=GEO_COLUMNS)
+                     .sort_values('population', ascending=False, kind='stable')
+                     .reset_index(drop=True))
+
+
+class Geocoder:
+    """Géocodage hors ligne des lieux des crashs, mémoïsé sur disque.
+
+    Chaque lot est réduit à ses lieux distincts, normalisés (casse, accents,
+    qualificatifs « near », « 10 km N of »...) : seules les formes absentes
+    du cache sont recherchées dans le gazetier, en une série de jointures
+    (ville/état/pays, puis ville/pays, état, pays). Le cache est invalidé si
+    le gazetier change. Les lieux inconnus sont aussi mémorisés, pour ne pas
+    être recherchés à chaque passage.
+    """
+
+    def __init__(self, gazetteer_path=GAZETTEER_FILE, cache_path=GEOCODE_CACHE_FILE):
+        self.gazetteer_path = Path(gazetteer_path)
+        self.cache_path = Path(cache_path)
+        self._gazetteer = None
+        self._tables = {}
+        self._cache = None
+        self._dirty = False
+        self.stats = {"rows": 0, "distinct": 0, "hits": 0, "misses": 0, "resolved": 0, "unresolved": 0}
+
+    @property
+    def available(self):
+        return self.gazetteer_path.exists()
+
+    def _fingerprint(self):
+        stat = self.gazetteer_path.stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    def _load_cache(self):
+        if self._cache is not None:
+            return self._cache
+        self._cache = {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if self.available and stored.get("gazetteer") == self._fingerprint():
+                self._cache = stored["locations"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        return self._cache
+
+    def save(self):
+        """Enregistre le cache de façon atomique s'il a été modifié."""
+        if not self._dirty or not self.available:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"gazetteer": self._fingerprint(), "locations": self._cache}, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def _table(self, columns):
+        """Index du gazetier sur `columns` (une ligne par clé, la plus peuplée)."""
+        key = tuple(columns)
+        if key not in self._tables:
+            if self._gazetteer is None:
+                self._gazetteer = load_gazetteer(self.gazetteer_path)
+            gazetteer = self._gazetteer
+            # Chaque niveau n'utilise que les entrées de sa précision (ville, état ou pays)
+            if 'city' in columns:
+                gazetteer = gazetteer[gazetteer['city'].notna()]
+            elif 'state' in columns:
+                gazetteer = gazetteer[gazetteer['city'].isna() & gazetteer['state'].notna()]
+            else:
+                gazetteer = gazetteer[gazetteer['city'].isna() & gazetteer['state'].isna()]
+            self._tables[key] = (gazetteer.dropna(subset=columns)
+                                 .drop_duplicates(subset=columns)[columns + GEO_COLUMNS])
+        return self._tables[key]
+
+    def resolve(self, keys):
+        """Recherche des lieux normalisés dans le gazetier ; renvoie {lieu: [lat, lon, précision] ou None}."""
+        pending = _location_parts(pd.Series(keys, dtype='string'))
+        pending['key'] = list(keys)
+        # Nombre d'éléments du lieu : les niveaux à un élément ne s'appliquent qu'aux lieux simples
+        single = pending['state'].isna() & pending['country'].isna()
+        found = {}
+        for precision, columns, gazetteer_columns in RESOLUTION_LEVELS:
+            candidates = pending[single] if columns == ['city'] else pending[~single]
+            candidates = candidates.dropna(subset=columns)
+            if candidates.empty:
+                continue
+            table = self._table(gazetteer_columns).rename(columns=dict(zip(gazetteer_columns, columns)))
+            matched = candidates[['key'] + columns].merge(table, on=columns, how='inner')
+            for key, latitude, longitude in zip(matched['key'], matched['latitude'], matched['longitude']):
+                found[key] = [round(float(latitude), 6), round(float(longitude), 6), precision]
+            pending = pending[~pending['key'].isin(matched['key'])]
+            single = single[pending.index]
+            if pending.empty:
+                break
+        return {key: found.get(key) for key in keys}
+
+    def geocode(self, locations):
+        """Coordonnées (latitude, longitude) d'une série de lieux, NaN si inconnus.
+
+        Seuls les lieux distincts sont normalisés et recherchés.
+        """
+        result = pd.DataFrame(np.nan, index=locations.index, columns=GEO_COLUMNS)
+        self.stats["rows"] += len(locations)
+        if not self.available or locations.empty:
+            return result
+
+        codes, uniques = pd.factorize(locations.astype('string'))
+        keys = normalize_location(pd.Series(uniques, dtype='string'))
+        distinct = keys.dropna().unique()
+        cache = self._load_cache()
+        missing = [key for key in distinct if key not in cache]
+        self.stats["distinct"] += len(distinct)
+        self.stats["hits"] += len(distinct) - len(missing)
+        self.stats["misses"] += len(missing)
+        if missing:
+            resolved = self.resolve(missing)
+            cache.update(resolved)
+            self._dirty = True
+            hits = sum(1 for value in resolved.values() if value)
+            self.stats["resolved"] += hits
+            self.stats["unresolved"] += len(missing) - hits
+
+        # Coordonnées par lieu distinct, puis diffusées aux lignes par leur code
+        coordinates = np.full((len(uniques) + 1, 2), np.nan)
+        for i, key in enumerate(keys):
+            entry = cache.get(key) if isinstance(key, str) else None
+            if entry:
+                coordinates[i] = entry[:2]
+        rows = coordinates[codes]  # code -1 (lieu absent) -> dernière ligne, NaN
+        result['latitude'] = rows[:, 0]
+        result['longitude'] = rows[:, 1]
+        return result
+
+    def geocode_frame(self, frame, column='location'):
+        """Ajoute les colonnes latitude/longitude à `frame` à partir de `column`."""
+        frame = frame.copy()
+        if column in frame.columns:
+            frame[GEO_COLUMNS] = self.geocode(frame[column])
+        else:
+            frame[GEO_COLUMNS] = np.nan
+        return frame
+
+    def geocode_records(self, records):
+        """Ajoute latitude/longitude à un lot de crashs (dictionnaires) ; None si inconnues."""
+        if not records:
+            return records
+        coordinates = self.geocode(pd.Series([record.get('location') for record in records], dtype=object))
+        for record, latitude, longitude in zip(records, coordinates['latitude'], coordinates['longitude']):
+            record['latitude'] = None if np.isnan(latitude) else float(latitude)
+            record['longitude'] = None if np.isnan(longitude) else float(longitude)
+        return records
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Géocodage hors ligne des lieux d'un fichier de crashs")
+    parser.add_argument("input", help="CSV de crashs (colonne location)")
+    parser.add_argument("--output", default=None, help="CSV de sortie (par défaut : remplace l'entrée)")
+    parser.add_argument("--gazetteer", default=str(GAZETTEER_FILE))
+    args = parser.parse_args()
+
+    geocoder = Geocoder(gazetteer_path=args.gazetteer)
+    if not geocoder.available:
+        raise SystemExit(f"Gazetier introuvable: {args.gazetteer}")
+    crashes = pd.read_csv(args.input, dtype={'location': 'string'}, low_memory=False)
+    crashes = geocoder.geocode_frame(crashes)
+    crashes.to_csv(args.output or args.input, index=False)
+    geocoder.save()
+    stats = geocoder.stats
+    print(f"{stats['rows']} lignes, {stats['distinct']} lieux distincts : {stats['hits']} en cache, "
+          f"{stats['resolved']} résolus, {stats['unresolved']} inconnus "
+          f"({crashes['latitude'].notna().mean():.1%} des lignes géocodées)")
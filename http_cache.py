@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Taille maximale du cache (RAW_CACHE_MAX_BYTES dans .env), 1 Gio par défaut
+DEFAULT_MAX_BYTES = int(os.environ.get("RAW_CACHE_MAX_BYTES", 1024 ** 3))
+
+
+class CacheMiss(Exception):
+    """Réponse absente du cache en mode hors ligne."""
+
+
+class ResponseCache:
+    """Cache disque des réponses HTTP brutes.
+
+    Les corps de réponse sont compressés (gzip) et stockés par empreinte de
+    contenu dans `blobs/` ; `index/` associe chaque URL + paramètres à une
+    empreinte ainsi qu'aux en-têtes ETag / Last-Modified utilisés pour les
+    requêtes conditionnelles. Au-delà de `max_bytes`, les contenus les moins
+    récemment lus sont supprimés. En mode `offline`, aucune requête réseau
+    n'est émise et les réponses sont rejouées depuis le cache.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0}
+
+    @staticmethod
+    def key(url, params=None):
+        """Clé de cache d'une requête (URL + paramètres triés)."""
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+    def _index_path(self, key):
+        return self.directory / "index" / f"{key}.json"
+
+    def _blob_path(self, digest):
+        return self.directory / "blobs" / f"{digest}.gz"
+
+    def lookup(self, url, params=None):
+        """Renvoie (entrée d'index, contenu) ou (None, None) si absent."""
+        try:
+            with open(self._index_path(self.key(url, params)), encoding="utf-8") as f:
+                entry = json.load(f)
+            blob_path = self._blob_path(entry["digest"])
+            with gzip.open(blob_path, "rb") as f:
+                content = f.read()
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None, None
+        # La date de modification sert d'horodatage LRU
+        os.utime(blob_path)
+        return entry, content
+
+    def store(self, url, params, content, headers):
+        """Enregistre une réponse et ses en-têtes de validation."""
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        if not blob_path.exists():
+            tmp_path = blob_path.with_suffix(f".{threading.get_ident()}.tmp")
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, blob_path)
+            self._add_bytes(blob_path.stat().st_size)
+
+        entry = {
+            "url": url,
+            "params": params or {},
+            "digest": digest,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        index_path = self._index_path(self.key(url, params))
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, index_path)
+
+    def _add_bytes(self, size):
+        """Met à jour la taille totale et déclenche l'éviction si nécessaire."""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry.stat().st_size for entry in self._blobs())
+            else:
+                self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _blobs(self):
+        blob_dir = self.directory / "blobs"
+        if not blob_dir.exists():
+            return []
+        return [entry for entry in os.scandir(blob_dir) if entry.name.endswith(".gz")]
+
+    def _evict(self):
+        """Supprime les contenus les moins récemment lus jusqu'à 90 % de la limite."""
+        target = self.max_bytes * 0.9
+        for entry in sorted(self._blobs(), key=lambda e: e.stat().st_mtime):
+            if self._total_bytes <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+            self.stats["evicted"] += 1
+
+    def get(self, session, url, params=None, timeout=30):
+        """Renvoie le contenu d'une URL, depuis le cache si possible.
+
+        Renvoie la réponse `requests` (statut, en-têtes) et le contenu ; la
+        réponse vaut None lorsque le contenu provient du cache sans requête.
+        """
+        entry, content = self.lookup(url, params)
+        if self.offline:
+            if content is None:
+                raise CacheMiss(f"Absent du cache : {url} {params or ''}")
+            self.stats["hits"] += 1
+            return None, content
+
+        headers = {}
+        if content is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and content is not None:
+            self.stats["revalidated"] += 1
+            return response, content
+        if response.status_code == 200:
+            self.stats["misses"] += 1
+            self.store(url, params, response.content, response.headers)
+        return response, response.content
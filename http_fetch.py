@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import span
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; CrashDatabaseResearch/1.0; +http://yourdomain.com/contact)"
+}
+
+# Codes HTTP pour lesquels une nouvelle tentative a du sens
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """Limite le nombre de requêtes par seconde pour chaque hôte."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        """Bloque jusqu'à ce qu'une requête vers l'hôte de `url` soit autorisée."""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def create_session(pool_size=10, headers=None):
+    """Crée une session HTTP partagée qui réutilise les connexions keep-alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers or DEFAULT_HEADERS)
+    return session
+
+
+def fetch_content(session, url, params=None, limiter=None, retries=5, backoff=0.5, timeout=30,
+                  cache=None):
+    """Récupère le contenu brut d'une URL avec nouvelles tentatives et attente exponentielle.
+
+    Avec un `cache` (http_cache.ResponseCache), la requête est conditionnelle
+    et le contenu en cache est renvoyé si la ressource n'a pas changé.
+    """
+    with span("fetch") as measure:
+        content = _fetch(session, url, params, limiter, retries, backoff, timeout, cache)
+        measure.add(bytes=len(content or b""))
+    return content
+
+
+def _fetch(session, url, params, limiter, retries, backoff, timeout, cache):
+    if cache is not None and cache.offline:
+        return cache.get(session, url, params=params)[1]
+    for attempt in range(retries + 1):
+        if limiter:
+            limiter.wait(url)
+        try:
+            if cache is not None:
+                response, content = cache.get(session, url, params=params, timeout=timeout)
+            else:
+                response = session.get(url, params=params, timeout=timeout)
+                content = response.content
+            if response.status_code in (200, 304):
+                return content
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                response.raise_for_status()
+                raise requests.HTTPError(f"Statut HTTP inattendu: {response.status_code}", response=response)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(backoff * (2 ** attempt))
+
+
+def fetch_json(session, url, params=None, **kwargs):
+    """Récupère une réponse JSON (voir fetch_content)."""
+    content = fetch_content(session, url, params=params, **kwargs)
+    with span("parse", bytes=len(content)):
+        return json.loads(content)
+
+
+def iter_pages(fetch_page, concurrency=8, max_pages=None, first_page=1):
+    """Récupère des pages en parallèle et les produit (page, éléments) dès leur arrivée.
+
+    `fetch_page(page)` renvoie la liste des éléments de la page. La pagination
+    s'arrête dès qu'une page vide est reçue ou que `max_pages` est atteint.
+    Aucune nouvelle page n'est demandée tant que le consommateur n'a pas repris
+    la main : au plus `concurrency` pages sont en attente.
+    """
+    last_page = first_page + max_pages - 1 if max_pages else None
+    next_page = first_page
+    end_page = None  # Première page vide rencontrée
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = {}
+
+        def submit_more():
+            nonlocal next_page
+            while len(in_flight) < concurrency:
+                if last_page is not None and next_page > last_page:
+                    break
+                if end_page is not None and next_page >= end_page:
+                    break
+                in_flight[executor.submit(fetch_page, next_page)] = next_page
+                next_page += 1
+
+        submit_more()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = in_flight.pop(future)
+                items = future.result()
+                if items:
+                    yield page, items
+                elif end_page is None or page < end_page:
+                    end_page = page
+            submit_more()
+
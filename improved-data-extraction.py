@@ -1,44 +1,71 @@
-import requests
-import psycopg2
-import pandas as pd
 import csv
-import os
 import json
-from bs4 import BeautifulSoup
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dotenv import load_dotenv
 from pathlib import Path
 
-# Charger les variables d'environnement
-load_dotenv()
-
-# Paramètres de la base de données depuis variables d'environnement
-DB_CONFIG = {
-    "dbname": os.environ.get("DB_NAME"),
-    "user": os.environ.get("DB_USER"),
-    "password": os.environ.get("DB_PASSWORD"),
-    "host": os.environ.get("DB_HOST"),
-    "port": os.environ.get("DB_PORT", 5432)
-}
+from asn_parser import parse_asn_detail, parse_asn_html
+from checkpoints import load_checkpoint, save_checkpoint
+from crash_stats import refresh_rollups
+from db_pool import close_pool, get_pool
+from db_load import DEFAULT_BATCH_SIZE, copy_rows, insert_rows
+from geocode import Geocoder
+from http_cache import ResponseCache
+from http_fetch import HostRateLimiter, create_session, fetch_content, fetch_json, iter_pages
+from instrumentation import end_run, load_report, span, start_run, summary
+from normalize import normalize_records
+from parquet_store import ParquetSink
+from pipeline import DEFAULT_MAX_MEMORY_BYTES, CsvSink, Pipeline, PipelineError
 
-# Créer un dossier pour les données brutes si non existant
+# Données brutes (les dossiers sont créés à la première écriture, pas à l'import)
 raw_data_dir = Path("data/raw")
-raw_data_dir.mkdir(parents=True, exist_ok=True)
 
-def connect_to_database():
-    """Établit une connexion à la base de données."""
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
-    except Exception as e:
-        print(f"Erreur de connexion à la base de données: {e}")
-        return None
+# Cache des réponses brutes (compressées, rejouables hors ligne)
+response_cache = ResponseCache(raw_data_dir / "cache")
+
+# Géocodage hors ligne des lieux (gazetier local, cache data/state/geocode_cache.json)
+geocoder = Geocoder()
+
+# URL de l'API NTSB
+NTSB_API_URL = "https://data.ntsb.gov/carol-main-public/api/Query/GetResultsByPage"
+
+# Colonnes des fichiers CSV de data/processed
+CSV_FIELDNAMES = ["event_date", "location", "city", "state", "country", "latitude", "longitude",
+                  "operator", "aircraft_type", "registration", "flight_number", "route", "fatalities",
+                  "description", "source_url"]
+
+# Liste annuelle ASN (100 événements par page)
+ASN_LIST_URL = "https://aviation-safety.net/database/dblist.php"
+ASN_PAGE_SIZE = 100
+
+def parse_ntsb_item(item):
+    """Convertit un résultat de l'API NTSB en dictionnaire de crash."""
+    # Traitement des données (à adapter selon la structure réelle des données)
+    return {
+        "event_date": item.get("eventDate"),
+        "location": f"{item.get('city', '')}, {item.get('state', '')}, {item.get('country', '')}",
+        "operator": item.get("operator"),
+        "aircraft_type": item.get("aircraftType"),
+        "registration": item.get("registration"),
+        "flight_number": item.get("flightNumber"),
+        "route": item.get("departureAirport", "") + " to " + item.get("destinationAirport", ""),
+        "fatalities": item.get("totalFatalities", 0),
+        "description": item.get("narrative", ""),
+        "source_url": f"https://data.ntsb.gov/carol-main-public/basic-search/result?eventId={item.get('eventId')}",
+        "source_event_id": item.get("eventId")
+    }
+
+def parse_ntsb_items(items):
+    """Convertit une page de résultats NTSB (étape « parse » du rapport d'exécution)."""
+    with span("parse", rows=len(items)):
+        return [parse_ntsb_item(item) for item in items]
 
 def extract_ntsb_data():
     """Extrait les données du NTSB via leur API."""
     print("Extraction des données du NTSB...")
     # URL de l'API NTSB - Utilisez l'URL appropriée
-    url = "https://data.ntsb.gov/carol-main-public/api/Query/GetResultsByPage"
+    url = NTSB_API_URL
     
     # Paramètres pour la requête API (ajustez selon l'API réelle)
     params = {
@@ -49,135 +76,228 @@ def extract_ntsb_data():
         "sortDirection": "DESC"
     }
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; CrashDatabaseResearch/1.0; +http://yourdomain.com/contact)"
-    }
-    
+    session = create_session(pool_size=1)
     try:
-        response = requests.get(url, params=params, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            # Sauvegarde des données brutes
-            with open(raw_data_dir / "ntsb_data.json", "w") as f:
-                json.dump(data, f)
-            
-            # Traitement des données (à adapter selon la structure réelle des données)
-            crashes = []
-            for item in data.get("results", []):
-                crash = {
-                    "event_date": item.get("eventDate"),
-                    "location": f"{item.get('city', '')}, {item.get('state', '')}, {item.get('country', '')}",
-                    "operator": item.get("operator"),
-                    "aircraft_type": item.get("aircraftType"),
-                    "registration": item.get("registration"),
-                    "flight_number": item.get("flightNumber"),
-                    "route": item.get("departureAirport", "") + " to " + item.get("destinationAirport", ""),
-                    "fatalities": item.get("totalFatalities", 0),
-                    "description": item.get("narrative", ""),
-                    "source_url": f"https://data.ntsb.gov/carol-main-public/basic-search/result?eventId={item.get('eventId')}"
-                }
-                crashes.append(crash)
-            
-            return crashes
-        else:
-            print(f"Erreur lors de la requête API: {response.status_code}")
-            return []
+        # Les données brutes sont conservées dans le cache des réponses
+        data = fetch_json(session, url, params=params, retries=0, cache=response_cache)
+        return parse_ntsb_items(data.get("results", []))
     except Exception as e:
         print(f"Erreur lors de l'extraction des données NTSB: {e}")
         return []
+    finally:
+        session.close()
+
+def iter_ntsb_pages(max_pages=None, page_size=100, concurrency=8, requests_per_second=5,
+                    retries=5, url=NTSB_API_URL, item_filter=None):
+    """Produit les pages de l'API NTSB (page, crashs) au fur et à mesure de leur arrivée.
+
+    Les pages sont récupérées en parallèle, au plus `concurrency` à la fois.
+    Si `item_filter` est fourni, seuls les résultats acceptés sont gardés et la
+    pagination s'arrête à la première page qui n'en contient aucun.
+    """
+    session = create_session(pool_size=concurrency)
+    limiter = HostRateLimiter(requests_per_second)
+
+    def fetch_page(page):
+        params = {
+            "page": page,
+            "pageSize": page_size,
+            "eventType": "Aviation",
+            "sortColumn": "EventDate",
+            "sortDirection": "DESC"
+        }
+        # Les données brutes de la page sont conservées dans le cache des réponses
+        data = fetch_json(session, url, params=params, limiter=limiter, retries=retries,
+                          cache=response_cache)
+        items = data.get("results", [])
+        if item_filter:
+            items = [item for item in items if item_filter(item)]
+        return items
+
+    try:
+        for page, items in iter_pages(fetch_page, concurrency=concurrency, max_pages=max_pages):
+            yield page, parse_ntsb_items(items)
+    finally:
+        session.close()
 
-def extract_aviation_safety_network_data():
+def iter_ntsb_data_incremental(checkpoint, progress, concurrency=2, **kwargs):
+    """Produit uniquement les crashs NTSB postérieurs au point de reprise.
+
+    Les résultats sont triés par date décroissante : la pagination s'arrête dès
+    qu'une page ne contient plus que des événements déjà vus. Le point de
+    reprise contient la dernière date vue et les identifiants vus à cette date ;
+    `progress` est mis à jour avec le nouveau point de reprise après chaque page.
+    """
+    last_date = checkpoint.get("last_event_date") or ""
+    seen_ids = set(checkpoint.get("last_event_ids", []))
+    newest = {"last_event_date": last_date, "last_event_ids": set(seen_ids)}
+
+    def is_new(item):
+        event_date = str(item.get("eventDate") or "")[:10]
+        return event_date > last_date or (event_date == last_date and item.get("eventId") not in seen_ids)
+
+    print(f"Extraction incrémentale NTSB depuis le {last_date or 'début'}...")
+    for page, crashes in iter_ntsb_pages(concurrency=concurrency, item_filter=is_new, **kwargs):
+        for crash in crashes:
+            event_date = str(crash["event_date"] or "")[:10]
+            if event_date > newest["last_event_date"]:
+                newest["last_event_date"] = event_date
+                newest["last_event_ids"] = set()
+            if event_date == newest["last_event_date"]:
+                newest["last_event_ids"].add(crash["source_event_id"])
+        yield from crashes
+        progress.update({
+            "last_event_date": newest["last_event_date"],
+            "last_event_ids": sorted(newest["last_event_ids"])
+        })
+
+def fetch_asn_page(year, page):
+    """Télécharge (ou relit dans le cache) et analyse une page de la liste ASN ; les erreurs sont propagées."""
+    session = create_session(pool_size=1)
+    try:
+        # Le HTML brut est conservé dans le cache des réponses
+        content = fetch_content(session, ASN_LIST_URL, params={"Year": year, "page": page}, retries=0,
+                                cache=response_cache)
+        with span("parse", bytes=len(content)) as measure:
+            crashes = parse_asn_html(content)
+            measure.add(rows=len(crashes))
+        return crashes
+    finally:
+        session.close()
+
+def extract_aviation_safety_network_data(year=2023, page=1):
     """Extrait les données de l'Aviation Safety Network."""
     print("Extraction des données de l'Aviation Safety Network...")
-    # URL de recherche ASN
-    url = "https://aviation-safety.net/database/dblist.php?Year=2023"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; CrashDatabaseResearch/1.0; +http://yourdomain.com/contact)"
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            # Sauvegarde du HTML brut
-            with open(raw_data_dir / "asn_data.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            crashes = []
-            
-            # Exemple d'extraction - à adapter selon la structure réelle du site
-            table = soup.find('table', class_='statistics')
-            if table:
-                for row in table.find_all('tr')[1:]:  # Sauter l'en-tête
-                    cells = row.find_all('td')
-                    if len(cells) >= 6:
-                        date_str = cells[0].text.strip()
-                        try:
-                            event_date = datetime.strptime(date_str, '%d-%b-%Y').strftime('%Y-%m-%d')
-                        except:
-                            event_date = None
-                            
-                        crash = {
-                            "event_date": event_date,
-                            "location": cells[2].text.strip(),
-                            "operator": cells[3].text.strip(),
-                            "aircraft_type": cells[4].text.strip(),
-                            "registration": cells[1].text.strip(),
-                            "flight_number": "",  # Non disponible dans cette table
-                            "route": "",  # Non disponible dans cette table
-                            "fatalities": cells[5].text.strip().split('/')[0] if '/' in cells[5].text else 0,
-                            "description": "",  # Nécessiterait de suivre le lien pour obtenir les détails
-                            "source_url": "https://aviation-safety.net" + cells[0].find('a')['href'] if cells[0].find('a') else ""
-                        }
-                        crashes.append(crash)
-            
-            return crashes
-        else:
-            print(f"Erreur lors de la requête ASN: {response.status_code}")
-            return []
+        return fetch_asn_page(year, page)
     except Exception as e:
         print(f"Erreur lors de l'extraction des données ASN: {e}")
         return []
 
-def save_to_database(crashes, source):
-    """Sauvegarde les données des crashs dans la base de données."""
-    conn = connect_to_database()
-    if not conn:
-        return False
-    
-    cursor = conn.cursor()
-    successful_inserts = 0
-    
+def iter_asn_details(crashes, concurrency=4, requests_per_second=2):
+    """Complète `route` et `description` des crashs ASN depuis leurs pages de détail.
+
+    Les crashs sont lus par paquets ; les pages de détail d'un paquet sont
+    récupérées en parallèle (au plus `concurrency` à la fois) via le cache des
+    réponses, puis les crashs complétés sont produits.
+    """
+    session = create_session(pool_size=concurrency)
+    limiter = HostRateLimiter(requests_per_second)
+    filled = 0
+
+    def fill(crash):
+        if not crash.get("source_url"):
+            return False
+        try:
+            content = fetch_content(session, crash["source_url"], limiter=limiter, cache=response_cache)
+            with span("parse", rows=1, bytes=len(content)):
+                details = parse_asn_detail(content)
+        except Exception as e:
+            print(f"Erreur lors de la récupération du détail {crash['source_url']}: {e}")
+            return False
+        crash["route"] = details["route"] or crash["route"]
+        crash["description"] = details["description"] or crash["description"]
+        return True
+
     try:
-        for crash in crashes:
-            # Conversion des types si nécessaire
-            fatalities = int(crash["fatalities"]) if crash["fatalities"] and str(crash["fatalities"]).isdigit() else 0
-            
-            cursor.execute("""
-                INSERT INTO airplane_crashes (
-                    event_date, location, operator, aircraft_type, 
-                    registration, flight_number, route, fatalities, 
-                    description, source_url
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT DO NOTHING;  -- Évite les doublons
-            """, (
-                crash["event_date"], crash["location"], crash["operator"], 
-                crash["aircraft_type"], crash["registration"], crash["flight_number"], 
-                crash["route"], fatalities, crash["description"], crash["source_url"]
-            ))
-            successful_inserts += cursor.rowcount
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            chunk = []
+            for crash in crashes:
+                chunk.append(crash)
+                if len(chunk) >= concurrency * 4:
+                    filled += sum(executor.map(fill, chunk))
+                    yield from chunk
+                    chunk = []
+            filled += sum(executor.map(fill, chunk))
+            yield from chunk
+    finally:
+        session.close()
+        print(f"{filled} pages de détail ASN traitées.")
+
+def iter_asn_data_incremental(checkpoint, progress, start_year=2023, end_year=None):
+    """Produit les crashs ASN postérieurs au point de reprise (année, page, dernier id).
+
+    Les listes ASN sont triées par date croissante : la page du point de reprise
+    est relue pour y trouver les nouveaux événements, puis les pages et années
+    suivantes jusqu'à l'année en cours. `progress` est mis à jour avec le
+    nouveau point de reprise après chaque page produite. Si une page ne peut
+    pas être récupérée (erreur réseau, absente du cache hors ligne),
+    l'extraction s'arrête là : le point de reprise reste sur la dernière page
+    produite et la page en échec sera relue au prochain passage.
+    """
+    end_year = end_year or datetime.now().year
+    year = checkpoint.get("year", start_year)
+    page = checkpoint.get("page", 1)
+    last_event_id = checkpoint.get("last_event_id")
+    print(f"Extraction incrémentale ASN depuis {year}, page {page}...")
+    
+    while year <= end_year:
+        try:
+            page_crashes = fetch_asn_page(year, page)
+        except Exception as e:
+            # Une page en échec n'est pas une dernière page : l'année n'est pas sautée
+            print(f"Extraction incrémentale ASN interrompue ({year}, page {page}): {e}")
+            return
+        full_page = len(page_crashes) >= ASN_PAGE_SIZE
+        if last_event_id:
+            ids = [crash["source_event_id"] for crash in page_crashes]
+            if last_event_id in ids:
+                page_crashes = page_crashes[ids.index(last_event_id) + 1:]
+            last_event_id = None
         
-        conn.commit()
-        print(f"Données de {source} sauvegardées avec succès. {successful_inserts} nouvelles entrées.")
-        return True
+        if page_crashes:
+            yield from page_crashes
+            progress.update({"year": year, "page": page,
+                             "last_event_id": page_crashes[-1]["source_event_id"]})
+        
+        # Une page ASN complète annonce une page suivante
+        if full_page:
+            page += 1
+        elif year < end_year:
+            year, page = year + 1, 1
+        else:
+            break
+
+def normalize_batch(crashes):
+    """Normalise un lot de crashs puis ajoute les coordonnées de leurs lieux distincts."""
+    with span("normalize", rows=len(crashes)):
+        crashes = normalize_records(crashes)
+    with span("geocode", rows=len(crashes)):
+        return geocoder.geocode_records(crashes)
+
+def save_to_database(crashes, source, bulk=False, batch_size=DEFAULT_BATCH_SIZE):
+    """Sauvegarde les données des crashs dans la base de données.
+
+    En mode `bulk`, les lignes sont chargées par lots via COPY puis fusionnées
+    en une seule requête par lot, au lieu d'un INSERT par ligne.
+    """
+    try:
+        db_pool = get_pool()
     except Exception as e:
-        conn.rollback()
-        print(f"Erreur lors de la sauvegarde des données de {source}: {e}")
+        print(f"Erreur de connexion à la base de données: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
+    
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            with span("db_write") as measure:
+                if bulk:
+                    counts = copy_rows(cursor, crashes, source, batch_size=batch_size)
+                else:
+                    counts = insert_rows(cursor, crashes, source)
+                
+                conn.commit()
+                measure.add(rows=sum(counts.values()))
+            print(f"Données de {source} sauvegardées avec succès. {counts['inserted']} nouvelles entrées, "
+                  f"{counts['duplicates']} doublons ignorés, {counts['rejected']} lignes rejetées.")
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Erreur lors de la sauvegarde des données de {source}: {e}")
+            return False
+        finally:
+            cursor.close()
 
 def save_to_csv(crashes, source):
     """Sauvegarde les données des crashs dans un fichier CSV."""
@@ -186,38 +306,189 @@ def save_to_csv(crashes, source):
         return
     
     filename = f"data/processed/{source}_crashes.csv"
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
-    fieldnames = ["event_date", "location", "operator", "aircraft_type", 
-                 "registration", "flight_number", "route", "fatalities", 
-                 "description", "source_url"]
-    
+    sink = CsvSink(filename, CSV_FIELDNAMES)
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for crash in crashes:
-                writer.writerow({k: crash.get(k, '') for k in fieldnames})
+        sink(normalize_batch(crashes))
         print(f"Données de {source} sauvegardées dans {filename}")
     except Exception as e:
         print(f"Erreur lors de la sauvegarde des données en CSV: {e}")
+    finally:
+        sink.close()
+
+def load_crashes(crashes, source, csv_name, bulk=False, batch_size=DEFAULT_BATCH_SIZE,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES, append=False):
+    """Enregistre un flux de crashs en base, en CSV et en Parquet, lot par lot.
+
+    Chaque lot est normalisé (dates, victimes, lieu, coordonnées) une seule
+    fois, de façon vectorisée, puis validé en base dès qu'il est complet : si l'extraction
+    échoue, les lots précédents restent enregistrés. Si la base (ou un fichier)
+    échoue, les autres destinations vont jusqu'au bout et l'échec est signalé
+    ensuite. Avec `append`, les lots s'ajoutent au stockage Parquet au lieu de
+    remplacer la partition de la source. Renvoie True si tout le flux a été
+    enregistré dans toutes les destinations.
+    """
+    def database_sink(batch):
+        if not save_to_database(batch, source, bulk=bulk, batch_size=batch_size):
+            raise RuntimeError(f"échec de l'enregistrement en base des données de {source}")
+    
+    filename = f"data/processed/{csv_name}_crashes.csv"
+    csv_sink = CsvSink(filename, CSV_FIELDNAMES)
+    # Les lots reçus sont déjà normalisés par normalize_batch
+    parquet_sink = ParquetSink(source, append=append, normalized=True)
+    pipeline = Pipeline({"database": database_sink, "csv": csv_sink, "parquet": parquet_sink},
+                        batch_size=batch_size, max_memory_bytes=max_memory_bytes,
+                        transform=normalize_batch)
+    saved = True
+    try:
+        with pipeline:
+            pipeline.run(crashes)
+    except PipelineError as e:
+        for name, error in e.errors.items():
+            print(f"Erreur de la destination {name} pour les données de {source}: {error}")
+        saved = False
+    except Exception as e:
+        print(f"Traitement des données de {source} interrompu: {e}")
+        return False
+    finally:
+        stats = pipeline.stats
+        print(f"{source}: {stats['records']} crashs en {stats['batches']} lots, "
+              f"pic mémoire des lots {stats['peak_memory_bytes'] / 1e6:.1f} Mo")
+    
+    written = [str(path) for name, path in [("csv", filename), ("parquet", parquet_sink.root)]
+               if name not in pipeline.errors]
+    if not stats['records']:
+        print(f"Aucune donnée à sauvegarder pour {source}")
+    elif written:
+        print(f"Données de {source} sauvegardées dans {' et '.join(written)}")
+    return saved
+
+def iter_file_crashes(paths):
+    """Crashs lus dans des fichiers locaux : pages de l'API NTSB (.json) ou CSV au format de data/processed."""
+    for path in paths:
+        if str(path).endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                yield from parse_ntsb_items(json.load(f)["results"])
+        else:
+            with open(path, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+
+def load_files(paths, source, csv_name=None, bulk=False, batch_size=DEFAULT_BATCH_SIZE, append=False,
+               max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES, profile=(), profiler="cprofile", report_path=None):
+    """Charge des fichiers déjà téléchargés (sans accès réseau) en base, en CSV et en Parquet.
 
-def main():
-    """Fonction principale pour l'extraction des données."""
+    Les lots passent par le même pipeline que l'extraction ; le rapport
+    d'exécution est nommé « load ».
+    """
+    start_run("load", profile=profile, profiler=profiler)
+    try:
+        os.makedirs("data/processed", exist_ok=True)
+        load_crashes(iter_file_crashes(paths), source, csv_name or source.lower(), bulk=bulk,
+                     batch_size=batch_size, max_memory_bytes=max_memory_bytes, append=append)
+        finish_run()
+    finally:
+        report = end_run(report_path, options={"files": [str(path) for path in paths], "source": source,
+                                                "bulk": bulk, "batch_size": batch_size, "append": append})
+        print(summary(load_report(report)))
+        print(f"Rapport d'exécution: {report}")
+
+def main(backfill=False, max_pages=None, concurrency=8, bulk=False, batch_size=DEFAULT_BATCH_SIZE,
+         incremental=False, offline=False, asn_details=False, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES,
+         profile=(), profiler="cprofile", report_path=None):
+    """Fonction principale pour l'extraction des données.
+
+    Les durées, lignes et octets de chaque étape (fetch, parse, normalize,
+    geocode, db_write, csv_write, parquet_write) sont enregistrés dans un
+    rapport JSON (results/runs par défaut) ; les étapes de `profile` sont
+    en plus profilées avec `profiler` ("cprofile" ou "sampling").
+    """
+    start_run("extraction", profile=profile, profiler=profiler)
+    try:
+        extract_and_load(backfill=backfill, max_pages=max_pages, concurrency=concurrency, bulk=bulk,
+                         batch_size=batch_size, incremental=incremental, offline=offline,
+                         asn_details=asn_details, max_memory_bytes=max_memory_bytes)
+    finally:
+        report = end_run(report_path, options={"backfill": backfill, "incremental": incremental, "bulk": bulk,
+                                                "batch_size": batch_size, "asn_details": asn_details})
+        print(summary(load_report(report)))
+        print(f"Rapport d'exécution: {report}")
+
+def extract_and_load(backfill=False, max_pages=None, concurrency=8, bulk=False, batch_size=DEFAULT_BATCH_SIZE,
+                     incremental=False, offline=False, asn_details=False,
+                     max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES):
+    """Extraction des sources et chargement en base, CSV et Parquet."""
     # Création des dossiers de données si non existants
     os.makedirs("data/processed", exist_ok=True)
     
+    # Hors ligne : les réponses sont rejouées depuis le cache, sans accès réseau
+    response_cache.offline = offline
+    options = {"bulk": bulk, "batch_size": batch_size, "max_memory_bytes": max_memory_bytes}
+    
+    if incremental:
+        main_incremental(asn_details=asn_details, **options)
+        finish_run()
+        return
+    
     # Extraction des données du NTSB
-    ntsb_crashes = extract_ntsb_data()
-    if ntsb_crashes:
-        save_to_database(ntsb_crashes, "NTSB")
-        save_to_csv(ntsb_crashes, "ntsb")
+    if backfill:
+        # Chaque page est transmise au pipeline dès son arrivée
+        print(f"Extraction paginée des données du NTSB ({concurrency} requêtes en parallèle)...")
+        ntsb_crashes = (crash for _, crashes in iter_ntsb_pages(max_pages=max_pages, concurrency=concurrency)
+                        for crash in crashes)
+    else:
+        ntsb_crashes = extract_ntsb_data()
+    load_crashes(ntsb_crashes, "NTSB", "ntsb", **options)
     
     # Extraction des données de l'Aviation Safety Network
     asn_crashes = extract_aviation_safety_network_data()
-    if asn_crashes:
-        save_to_database(asn_crashes, "ASN")
-        save_to_csv(asn_crashes, "asn")
+    if asn_details:
+        asn_crashes = iter_asn_details(asn_crashes)
+    load_crashes(asn_crashes, "ASN", "asn", **options)
+    
+    finish_run()
+
+def finish_run():
+    """Rafraîchit les agrégats, ferme le pool de connexions et affiche les compteurs des caches."""
+    try:
+        # Seules les années touchées par ce chargement sont recalculées
+        print(f"Agrégats analytiques: {refresh_rollups()} années recalculées")
+    except Exception as e:
+        print(f"Erreur lors du rafraîchissement des agrégats: {e}")
+    close_pool()
+    stats = response_cache.stats
+    print(f"Cache HTTP: {stats['hits']} réponses rejouées, {stats['revalidated']} inchangées (304), "
+          f"{stats['misses']} téléchargées, {stats['evicted']} contenus évincés")
+    if geocoder.available:
+        geocoder.save()
+        stats = geocoder.stats
+        print(f"Géocodage: {stats['distinct']} lieux distincts, {stats['hits']} en cache, "
+              f"{stats['resolved']} résolus, {stats['unresolved']} inconnus")
+    else:
+        print(f"Géocodage ignoré: gazetier introuvable ({geocoder.gazetteer_path})")
+
+def main_incremental(asn_details=False, **options):
+    """Extrait uniquement les nouveaux événements depuis les derniers points de reprise.
+
+    Un point de reprise n'avance que si toutes les données extraites ont été
+    enregistrées en base.
+    """
+    # NTSB : chaque page est transmise au pipeline dès son arrivée
+    checkpoint = load_checkpoint("NTSB")
+    progress = dict(checkpoint)
+    if load_crashes(iter_ntsb_data_incremental(checkpoint, progress), "NTSB", "ntsb", append=True, **options):
+        save_checkpoint("NTSB", progress)
+    
+    # ASN
+    checkpoint = load_checkpoint("ASN")
+    progress = dict(checkpoint)
+    asn_crashes = iter_asn_data_incremental(checkpoint, progress)
+    if asn_details:
+        asn_crashes = iter_asn_details(asn_crashes)
+    if load_crashes(asn_crashes, "ASN", "asn", append=True, **options):
+        save_checkpoint("ASN", progress)
 
 if __name__ == "__main__":
-    main()
+    # Options de la sous-commande `extract` de cli.py
+    import sys
+    from cli import main as cli_main
+    sys.modules.setdefault("improved_data_extraction", sys.modules[__name__])
+    sys.exit(cli_main(["extract", *sys.argv[1:]]))
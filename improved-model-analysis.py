@@ -1,35 +1,189 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.impute import SimpleImputer
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_curve, auc, confusion_matrix, classification_report
+from sklearn.metrics import classification_report
 import joblib
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
+from instrumentation import end_run, load_report, record, span, start_run, summary, timed_call
+from model_training import default_workers, fit_and_score, plot_executor, render_model_plots
+from model_kernel import svm_classifier
+from model_importance import DEFAULT_MAX_ROWS, DEFAULT_REPEATS, permutation_importances, render_importance_plot
+from model_tuning import tune_models
+from model_streaming import StreamingModel, chunk_rows
+from normalize import CATEGORY_COLUMNS, encode_categories, parse_dates
+from parquet_store import PARQUET_DIR, load_parquet, parquet_columns
+
 # Configuration
 DATA_DIR = "data/processed"
 MODELS_DIR = "models"
 RESULTS_DIR = "results"
+TUNING_DIR = f"{RESULTS_DIR}/tuning"
+STREAMING_MODEL_PATH = f"{MODELS_DIR}/streaming_model.pkl"
 RANDOM_STATE = 42
 
-# Création des répertoires nécessaires
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(MODELS_DIR, exist_ok=True)
-os.makedirs(RESULTS_DIR, exist_ok=True)
+# Colonnes lues par l'analyse (les autres ne sont pas chargées) ; les colonnes
+# catégorielles (CATEGORY_COLUMNS) sont facultatives : ignorées si la source ne les a pas
+ANALYSIS_COLUMNS = ['event_date', 'Fatalities', 'target', *CATEGORY_COLUMNS]
+
+# Source « base de données » de load_data : table airplane_crashes au lieu d'un fichier
+DB_SOURCE = "db"
+
+# La table n'a pas de colonne cible : expression SQL configurable (par défaut, accident mortel)
+DB_TARGET_SQL = os.environ.get("DB_TARGET_SQL", "(coalesce(fatalities, 0) > 0)::int")
+
+# Colonnes de l'analyse -> (expression SQL, type Arrow des lots lus)
+DB_COLUMNS = {
+    'event_date': ("event_date", pa.date32()),
+    'Fatalities': ("fatalities", pa.int32()),
+    'target': (DB_TARGET_SQL, pa.int8()),
+    'operator': ("operator", pa.dictionary(pa.int32(), pa.string())),
+    'aircraft_type': ("aircraft_type", pa.dictionary(pa.int32(), pa.string())),
+    'source': ("source", pa.dictionary(pa.int32(), pa.string())),
+    'location': ("location", pa.string()),
+    'latitude': ("latitude", pa.float64()),
+    'longitude': ("longitude", pa.float64()),
+}
+
+# Taille des blocs CSV décodés à la lecture de COPY (mémoire de lecture bornée)
+DB_BLOCK_BYTES = 16 * 1024 * 1024
+
+def prepare_directories():
+    """Crée les répertoires de données, de modèles et de résultats (appelé au lancement, pas à l'import)."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+
+def default_data_file():
+    """Jeu de données traité : stockage Parquet partitionné (parquet_store.PARQUET_DIR,
+    écrit par l'extraction) s'il existe, sinon CSV."""
+    if os.path.isdir(PARQUET_DIR):
+        return str(PARQUET_DIR)
+    return f"{DATA_DIR}/airplane_crashes.csv"
+
+def _db_query(columns, start_date=None, end_date=None):
+    """Requête de lecture : colonnes `columns` seulement, intervalle de dates dans le WHERE."""
+    unknown = [column for column in columns if column not in DB_COLUMNS]
+    if unknown:
+        raise ValueError(f"Colonnes absentes de la base: {', '.join(unknown)}")
+    select = ", ".join(f'{DB_COLUMNS[column][0]} AS "{column}"' for column in columns)
+    conditions, params = [], []
+    # Intervalle sur la clé de partitionnement : seules les partitions concernées sont lues
+    if start_date is not None:
+        conditions.append("event_date >= %s::date")
+        params.append(str(start_date)[:10])
+    if end_date is not None:
+        conditions.append("event_date <= %s::date")
+        params.append(str(end_date)[:10])
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {select} FROM airplane_crashes{where}", params
+
+def iter_db_batches(columns=None, start_date=None, end_date=None, block_bytes=DB_BLOCK_BYTES):
+    """Lit la table airplane_crashes par lots Arrow typés (pyarrow.RecordBatch).
+
+    La requête (colonnes `columns`, dates entre `start_date` et `end_date`)
+    est exportée par `COPY ... TO STDOUT` dans un tube, décodé au fil de
+    l'eau par le lecteur CSV d'Arrow : la mémoire utilisée ne dépend que de
+    `block_bytes`, pas du nombre de lignes de la table.
+    """
+    from db_pool import get_pool
+
+    columns = list(columns or ANALYSIS_COLUMNS)
+    query, params = _db_query(columns, start_date, end_date)
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def export():
+        try:
+            with os.fdopen(write_fd, "wb") as pipe, get_pool().connection() as conn:
+                with conn.cursor() as cursor:
+                    copy = cursor.mogrify(query, params).decode("utf-8")
+                    cursor.copy_expert(f"COPY ({copy}) TO STDOUT WITH (FORMAT csv, HEADER)", pipe)
+                conn.rollback()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=export, daemon=True)
+    thread.start()
+    completed = False
+    try:
+        with os.fdopen(read_fd, "rb") as source:
+            try:
+                reader = pa_csv.open_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(block_size=block_bytes, use_threads=False),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types={column: DB_COLUMNS[column][1] for column in columns},
+                        strings_can_be_null=True))
+                for batch in reader:
+                    yield batch
+            except pa.ArrowInvalid:
+                # Requête en échec : le tube a été fermé sans données ou tronqué
+                thread.join()
+                if errors:
+                    raise errors[0]
+                raise
+        completed = True
+    finally:
+        # Lecture interrompue par l'appelant : COPY échoue sur le tube fermé, l'erreur est ignorée
+        thread.join()
+    if completed and errors:
+        raise errors[0]
+
+def load_db(columns=None, start_date=None, end_date=None):
+    """Charge les lignes de la base dans un DataFrame (voir iter_db_batches).
 
-def load_data(file_path):
-    """Charge les données depuis un fichier CSV."""
+    Les lots Arrow sont assemblés sans copie intermédiaire en objets Python ;
+    opérateurs et types d'appareil arrivent directement en `category`.
+    """
+    columns = list(columns or ANALYSIS_COLUMNS)
+    schema = pa.schema([(column, DB_COLUMNS[column][1]) for column in columns])
+    table = pa.Table.from_batches(list(iter_db_batches(columns, start_date, end_date)), schema=schema)
+    return table.unify_dictionaries().to_pandas(date_as_object=False)
+
+def _is_parquet(file_path):
+    return os.path.isdir(file_path) or str(file_path).endswith(".parquet")
+
+def _available_columns(file_path, columns):
+    """`columns` sans les colonnes catégorielles absentes du fichier (les autres restent exigées)."""
+    if columns is None or file_path == DB_SOURCE:
+        return columns
+    if _is_parquet(file_path):
+        names = set(parquet_columns(file_path))
+    else:
+        names = set(pd.read_csv(file_path, nrows=0).columns)
+    return [column for column in columns if column in names or column not in CATEGORY_COLUMNS]
+
+def load_data(file_path, columns=None, start_date=None, end_date=None):
+    """Charge les données depuis un fichier CSV, un jeu Parquet ou la base.
+
+    Pour le Parquet (fichier ou répertoire partitionné), seules les colonnes
+    `columns` et les partitions / groupes de lignes compris entre `start_date`
+    et `end_date` sont lus. Avec `file_path` égal à DB_SOURCE, la projection
+    et l'intervalle de dates sont appliqués dans la requête SQL. Les colonnes
+    catégorielles demandées mais absentes du fichier ne sont pas lues.
+    """
     try:
-        return pd.read_csv(file_path)
+        with span("load") as measure:
+            columns = _available_columns(file_path, columns)
+            if file_path == DB_SOURCE:
+                data = load_db(columns=columns, start_date=start_date, end_date=end_date)
+            elif _is_parquet(file_path):
+                data = load_parquet(file_path, columns=columns, start_date=start_date, end_date=end_date)
+            else:
+                data = pd.read_csv(file_path, usecols=columns)
+            # Opérateurs et types d'appareil en `category` : une copie de chaque libellé
+            data = encode_categories(data)
+            measure.add(rows=len(data), bytes=int(data.memory_usage(deep=True).sum()))
+        return data
     except Exception as e:
         print(f"Erreur lors du chargement des données: {e}")
         return None
@@ -39,8 +193,13 @@ def preprocess_data(data):
     if data is None:
         return None, None, None, None
     
-    # Conversion de la date en caractéristiques temporelles
-    data['event_date'] = pd.to_datetime(data['event_date'])
+    with span("preprocess", rows=len(data)):
+        return _preprocess(data)
+
+def _preprocess(data):
+    """Caractéristiques, préprocesseur et découpage entraînement / test (voir preprocess_data)."""
+    # Conversion de la date en caractéristiques temporelles (formats explicites, voir normalize.py)
+    data['event_date'] = parse_dates(data['event_date'])
     data['year'] = data['event_date'].dt.year
     data['month'] = data['event_date'].dt.month
     data['day'] = data['event_date'].dt.day
@@ -50,17 +209,17 @@ def preprocess_data(data):
     # Utilisation de 'Fatalities' comme seule caractéristique numérique pour cet exemple
     # Dans un cas réel, vous auriez plus de caractéristiques numériques et catégorielles
     numeric_features = ['Fatalities', 'year', 'month', 'day']
-    categorical_features = []  # Par exemple: 'Operator', 'Location' catégorisée, etc.
+    # Opérateur et type d'appareil, s'ils ont été chargés (voir ANALYSIS_COLUMNS)
+    categorical_features = [column for column in CATEGORY_COLUMNS if column in data.columns]
     
     # Préprocesseur pour les données
-    preprocessor = ColumnTransformer([
-        ('num', StandardScaler(), numeric_features),
-        # Si vous avez des caractéristiques catégorielles, décommentez la ligne suivante
-        # ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-    ])
+    transformers = [('num', StandardScaler(), numeric_features)]
+    if categorical_features:
+        transformers.append(('cat', OneHotEncoder(handle_unknown='ignore', min_frequency=10), categorical_features))
+    preprocessor = ColumnTransformer(transformers)
     
     # Préparation des données
-    X = data[numeric_features]  # + categorical_features si vous en avez
+    X = data[numeric_features + categorical_features]
     y = data['target']
     
     # Division en ensembles d'entraînement et de test
@@ -68,85 +227,105 @@ def preprocess_data(data):
     
     return X_train, X_test, y_train, y_test, preprocessor, numeric_features
 
-def train_and_evaluate_models(X_train, X_test, y_train, y_test, preprocessor):
-    """Entraîne et évalue différents modèles."""
-    if X_train is None:
-        return None
-    
-    # Définition des modèles
-    models = {
+def build_models(n_rows=0, svm="auto"):
+    """Définition des modèles candidats.
+
+    'SVM' : SVC exact, ou approximation du noyau au-delà de SVM_EXACT_MAX_ROWS
+    lignes d'entraînement (`svm` : auto, exact ou approx, voir model_kernel.py).
+    """
+    return {
         'Logistic Regression': LogisticRegression(random_state=RANDOM_STATE),
         'Random Forest': RandomForestClassifier(random_state=RANDOM_STATE),
         'Gradient Boosting': GradientBoostingClassifier(random_state=RANDOM_STATE),
-        'SVM': SVC(probability=True, random_state=RANDOM_STATE)
+        'SVM': svm_classifier(n_rows, svm, random_state=RANDOM_STATE)
     }
+
+def tune_hyperparameters(X_train, y_train, preprocessor, n_jobs=-1, svm="auto"):
+    """Recherche des meilleurs hyperparamètres par divisions successives.
+
+    Les évaluations sont journalisées dans results/tuning : une recherche
+    interrompue reprend là où elle s'était arrêtée.
+    """
+    if X_train is None:
+        return None
+    print("\nOptimisation des hyperparamètres (divisions successives)...")
+    with span("tune", rows=len(X_train)):
+        return tune_models(build_models(len(X_train), svm), preprocessor, X_train, y_train, TUNING_DIR,
+                           n_jobs=n_jobs, random_state=RANDOM_STATE)
+
+def train_and_evaluate_models(X_train, X_test, y_train, y_test, preprocessor, parallel=False, n_jobs=None,
+                              tuned_params=None, svm="auto"):
+    """Entraîne et évalue différents modèles.
+
+    Avec `parallel`, les modèles sont entraînés simultanément dans un pool de
+    processus (`n_jobs`, par défaut un par modèle dans la limite des cœurs) et
+    les graphiques sont rendus par un processus dédié. Le meilleur modèle
+    retenu et les fichiers produits sont les mêmes qu'en mode séquentiel.
+    `tuned_params` ({modèle: paramètres `classifier__*`}) provient de
+    tune_hyperparameters.
+    """
+    if X_train is None:
+        return None
+    
+    models = build_models(len(X_train), svm)
+    for name, params in (tuned_params or {}).items():
+        models[name].set_params(**{key.replace('classifier__', '', 1): value for key, value in params.items()})
+    
+    if parallel:
+        workers = n_jobs or default_workers(len(models))
+        threads = max(1, default_workers(os.cpu_count() or 1) // workers)
+        print(f"\nEntraînement de {len(models)} modèles sur {workers} processus...")
+        with ProcessPoolExecutor(max_workers=workers) as executor, plot_executor() as plotter:
+            futures = {
+                name: executor.submit(fit_and_score, name, model, preprocessor,
+                                      X_train, y_train, X_test, y_test, threads)
+                for name, model in models.items()
+            }
+            scored = {}
+            plots = []
+            for future in as_completed(futures.values()):
+                result = future.result()
+                scored[result['name']] = result
+                # Durées mesurées dans les processus fils, ajoutées au rapport d'exécution
+                record("fit", result['timings']['fit'], rows=len(X_train))
+                record("predict", result['timings']['predict'], rows=len(X_test))
+                plots.append(plotter.submit(timed_call, render_model_plots, result['name'], y_test,
+                                            result['y_pred'], result['y_prob'], RESULTS_DIR))
+            # Les résultats sont repris dans l'ordre de `models`, comme en séquentiel
+            scored = [scored[name] for name in models]
+            for plot in plots:
+                record("plot", plot.result()[1])
+    else:
+        scored = []
+        for name, model in models.items():
+            print(f"\nEntraînement du modèle: {name}")
+            result = fit_and_score(name, model, preprocessor, X_train, y_train, X_test, y_test)
+            with span("plot"):
+                render_model_plots(name, y_test, result['y_pred'], result['y_prob'], RESULTS_DIR)
+            scored.append(result)
     
     results = {}
     best_f1 = 0
     best_model_name = None
     
-    for name, model in models.items():
-        print(f"\nEntraînement du modèle: {name}")
-        
-        # Création du pipeline
-        pipeline = Pipeline([
-            ('preprocessor', preprocessor),
-            ('classifier', model)
-        ])
-        
-        # Entraînement
-        pipeline.fit(X_train, y_train)
-        
-        # Prédictions
-        y_pred = pipeline.predict(X_test)
-        y_prob = pipeline.predict_proba(X_test)[:, 1]
-        
-        # Métriques
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred)
-        recall = recall_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred)
-        
+    for result in scored:
+        name = result['name']
         results[name] = {
-            'accuracy': accuracy,
-            'precision': precision,
-            'recall': recall,
-            'f1_score': f1,
-            'model': pipeline
+            'accuracy': result['accuracy'],
+            'precision': result['precision'],
+            'recall': result['recall'],
+            'f1_score': result['f1_score'],
+            'model': result['model']
         }
         
         # Mise à jour du meilleur modèle
-        if f1 > best_f1:
-            best_f1 = f1
+        if result['f1_score'] > best_f1:
+            best_f1 = result['f1_score']
             best_model_name = name
         
         # Rapport de classification
         print(f"\nRapport de classification pour {name}:")
-        print(classification_report(y_test, y_pred))
-        
-        # Matrice de confusion
-        cm = confusion_matrix(y_test, y_pred)
-        plt.figure(figsize=(8, 6))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
-        plt.title(f'Matrice de confusion - {name}')
-        plt.ylabel('Valeur réelle')
-        plt.xlabel('Valeur prédite')
-        plt.savefig(f"{RESULTS_DIR}/confusion_matrix_{name.replace(' ', '_').lower()}.png")
-        
-        # Courbe ROC
-        fpr, tpr, _ = roc_curve(y_test, y_prob)
-        roc_auc = auc(fpr, tpr)
-        
-        plt.figure(figsize=(8, 6))
-        plt.plot(fpr, tpr, lw=2, label=f'ROC curve (area = {roc_auc:.2f})')
-        plt.plot([0, 1], [0, 1], 'k--', lw=2)
-        plt.xlim([0.0, 1.0])
-        plt.ylim([0.0, 1.05])
-        plt.xlabel('Taux de faux positifs')
-        plt.ylabel('Taux de vrais positifs')
-        plt.title(f'Courbe ROC - {name}')
-        plt.legend(loc="lower right")
-        plt.savefig(f"{RESULTS_DIR}/roc_curve_{name.replace(' ', '_').lower()}.png")
+        print(classification_report(y_test, result['y_pred']))
     
     # Sauvegarde du meilleur modèle
     if best_model_name:
@@ -158,36 +337,93 @@ def train_and_evaluate_models(X_train, X_test, y_train, y_test, preprocessor):
     
     return results
 
-def feature_importance(results, numeric_features):
-    """Analyse l'importance des caractéristiques."""
-    if 'Random Forest' in results:
-        model = results['Random Forest']['model']
-        # Extraction du classifieur depuis le pipeline
-        rf = model.named_steps['classifier']
-        
-        # Récupération de l'importance des caractéristiques
-        importances = rf.feature_importances_
-        
-        # Création d'un DataFrame pour une meilleure visualisation
-        feature_imp = pd.DataFrame({
-            'Caractéristique': numeric_features,
-            'Importance': importances
-        }).sort_values('Importance', ascending=False)
-        
-        plt.figure(figsize=(10, 6))
-        sns.barplot(x='Importance', y='Caractéristique', data=feature_imp)
-        plt.title('Importance des caractéristiques (Random Forest)')
-        plt.tight_layout()
-        plt.savefig(f"{RESULTS_DIR}/feature_importance.png")
-        
-        return feature_imp
-    return None
+def feature_importance(results, X_test, y_test, n_jobs=None, n_repeats=DEFAULT_REPEATS, max_rows=DEFAULT_MAX_ROWS):
+    """Importance par permutation des caractéristiques, pour chaque modèle, sur l'ensemble de test.
+
+    Table dans results/feature_importance.csv, graphique par modèle dans
+    results/feature_importance.png.
+    """
+    with span("importance", rows=min(len(X_test), max_rows)):
+        feature_imp = permutation_importances(results, X_test, y_test, n_repeats=n_repeats, max_rows=max_rows,
+                                              n_jobs=n_jobs or -1, random_state=RANDOM_STATE)
+    feature_imp.to_csv(f"{RESULTS_DIR}/feature_importance.csv", index=False)
+
+    with span("plot"):
+        render_importance_plot(feature_imp, f"{RESULTS_DIR}/feature_importance.png")
+
+    return feature_imp
+
+def train_streaming(data_file, update_file=None, max_memory_bytes=None, epochs=1):
+    """Entraînement hors mémoire : les données sont lues par blocs et les modèles
+    entraînés avec `partial_fit`.
+
+    Avec `update_file`, le modèle sauvegardé est repris et mis à jour avec les
+    nouvelles lignes seulement. La taille des blocs est calculée pour rester
+    sous `max_memory_bytes` ; le pic de mémoire est affiché.
+    """
+    source = update_file or data_file
+    kwargs = {"max_memory_bytes": max_memory_bytes} if max_memory_bytes else {}
+    rows = chunk_rows(source, **kwargs)
+
+    if update_file and os.path.exists(STREAMING_MODEL_PATH):
+        model = StreamingModel.load(STREAMING_MODEL_PATH)
+        first_row = model.rows_seen
+        print(f"Mise à jour du modèle ({model.rows_seen} lignes déjà vues) avec {update_file}...")
+        model.update(update_file, rows)
+    else:
+        if update_file:
+            print(f"Aucun modèle dans {STREAMING_MODEL_PATH}, entraînement initial sur {update_file}")
+        model = StreamingModel(random_state=RANDOM_STATE)
+        first_row = 0
+        print(f"Entraînement par blocs de {rows} lignes sur {source}...")
+        model.fit(source, rows, epochs=epochs)
+
+    for name, metrics in model.evaluate(source, rows, first_row=first_row).items():
+        print(f"{name}: " + ", ".join(f"{metric}={value:.4f}" for metric, value in metrics.items()))
 
-def main():
-    """Fonction principale pour l'analyse des données et la modélisation."""
-    # Chargement des données
-    data_file = f"{DATA_DIR}/airplane_crashes.csv"
-    data = load_data(data_file)
+    model.save(STREAMING_MODEL_PATH)
+    stats = model.stats
+    print(f"{stats['rows']} lignes vues, {stats['chunks']} blocs lus, bloc max {stats['max_chunk_bytes'] / 2**20:.1f} Mo, "
+          f"pic mémoire du processus {stats['peak_rss_bytes'] / 2**20:.1f} Mo")
+    print(f"Modèle incrémental sauvegardé à: {STREAMING_MODEL_PATH}")
+    return model
+
+def main(parallel=False, n_jobs=None, tune=False, profile=(), profiler="cprofile", report_path=None,
+         source=None, start_date=None, end_date=None, importance_repeats=DEFAULT_REPEATS,
+         importance_rows=DEFAULT_MAX_ROWS, svm="auto"):
+    """Fonction principale pour l'analyse des données et la modélisation.
+
+    Les durées et volumes des étapes (load, preprocess, tune, fit, predict,
+    importance, plot) sont enregistrés dans un rapport JSON (results/runs par défaut) ;
+    les étapes de `profile` sont en plus profilées avec `profiler`
+    (processus principal uniquement : en mode parallèle, fit et predict
+    sont mesurés mais pas profilés).
+    """
+    start_run("analysis", profile=profile, profiler=profiler)
+    try:
+        analyze(parallel=parallel, n_jobs=n_jobs, tune=tune, source=source, start_date=start_date,
+                end_date=end_date, importance_repeats=importance_repeats, importance_rows=importance_rows,
+                svm=svm)
+    finally:
+        report = end_run(report_path, options={"parallel": parallel, "n_jobs": n_jobs, "tune": tune,
+                                                "source": source, "start_date": start_date, "end_date": end_date,
+                                                "importance_repeats": importance_repeats,
+                                                "importance_rows": importance_rows, "svm": svm})
+        print(summary(load_report(report)))
+        print(f"Rapport d'exécution: {report}")
+
+def analyze(parallel=False, n_jobs=None, tune=False, source=None, start_date=None, end_date=None,
+            importance_repeats=DEFAULT_REPEATS, importance_rows=DEFAULT_MAX_ROWS, svm="auto"):
+    """Chargement, prétraitement, entraînement et évaluation des modèles.
+
+    `source` : fichier CSV / Parquet ou DB_SOURCE (par défaut, le jeu traité
+    de data/processed).
+    """
+    prepare_directories()
+    
+    # Chargement des données (Parquet si disponible, sinon CSV, ou la base)
+    data = load_data(source or default_data_file(), columns=ANALYSIS_COLUMNS, start_date=start_date,
+                     end_date=end_date)
     
     if data is None:
         print("Impossible de procéder sans données valides.")
@@ -196,17 +432,25 @@ def main():
     # Prétraitement des données
     X_train, X_test, y_train, y_test, preprocessor, numeric_features = preprocess_data(data)
     
+    # Optimisation des hyperparamètres (facultative)
+    tuned_params = tune_hyperparameters(X_train, y_train, preprocessor, n_jobs=n_jobs or -1, svm=svm) if tune else None
+    
     # Entraînement et évaluation des modèles
-    results = train_and_evaluate_models(X_train, X_test, y_train, y_test, preprocessor)
+    results = train_and_evaluate_models(X_train, X_test, y_train, y_test, preprocessor,
+                                        parallel=parallel, n_jobs=n_jobs, tuned_params=tuned_params, svm=svm)
     
     # Analyse de l'importance des caractéristiques
     if results:
-        feature_imp = feature_importance(results, numeric_features)
-        if feature_imp is not None:
-            print("\nImportance des caractéristiques:")
-            print(feature_imp)
+        feature_imp = feature_importance(results, X_test, y_test, n_jobs=n_jobs, n_repeats=importance_repeats,
+                                         max_rows=importance_rows)
+        print("\nImportance des caractéristiques (baisse du F1 après permutation):")
+        print(feature_imp.pivot(index='Caractéristique', columns='Modèle', values='Importance').round(4))
     
     print("\nAnalyse terminée. Les résultats sont disponibles dans le dossier 'results'.")
 
 if __name__ == "__main__":
-    main()
+    # Options de la sous-commande `train` de cli.py
+    import sys
+    from cli import main as cli_main
+    sys.modules.setdefault("improved_model_analysis", sys.modules[__name__])
+    sys.exit(cli_main(["train", *sys.argv[1:]]))
@@ -0,0 +1,325 @@
+import cProfile
+import json
+import os
+import platform
+import pstats
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Rapports d'exécution (JSON) et profils : results/runs/<nom>-<horodatage>.json
+RUNS_DIR = Path(os.environ.get("RUNS_DIR", "results/runs"))
+
+PROFILERS = ("cprofile", "sampling")
+
+# Intervalle du profileur par échantillonnage (secondes)
+SAMPLING_INTERVAL = 0.005
+
+_run = None
+_local = threading.local()
+
+
+class Span:
+    """Mesure en cours d'une étape ; `add` compte les lignes et octets traités.
+
+    `seconds` contient la durée de l'étape à la sortie du bloc.
+    """
+
+    __slots__ = ("rows", "bytes", "seconds")
+
+    def __init__(self, rows=0, bytes=0):
+        self.rows = rows
+        self.bytes = bytes
+        self.seconds = None
+
+    def add(self, rows=0, bytes=0):
+        self.rows += rows
+        self.bytes += bytes
+
+
+class SamplingProfiler:
+    """Profileur par échantillonnage d'un thread : piles relevées toutes les `interval` secondes.
+
+    Les piles sont écrites au format « pliées » (une ligne `f1;f2;f3 n`), lu par
+    flamegraph.pl ou speedscope. Le coût est constant quel que soit le nombre
+    d'appels, contrairement à cProfile.
+    """
+
+    def __init__(self, interval=SAMPLING_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def enable(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Run:
+    """Mesures d'une exécution : durée, appels, lignes et octets par étape.
+
+    Les étapes sont alimentées par `span` depuis n'importe quel thread ; les
+    étapes listées dans `profile` sont en plus profilées (cProfile ou
+    échantillonnage), dans le processus courant uniquement.
+    """
+
+    def __init__(self, name, profile=(), profiler="cprofile"):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Profileur inconnu: {profiler}")
+        self.name = name
+        self.profile = set(profile or ())
+        self.profiler = profiler
+        self.started_at = datetime.now(timezone.utc)
+        self.run_id = f"{name}-{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+        self.stages = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+    def record(self, stage, seconds, rows=0, bytes=0, calls=1):
+        """Ajoute une mesure à une étape (ex. durée mesurée dans un processus fils)."""
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                                   "rows": 0, "bytes": 0})
+            entry["calls"] += calls
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["rows"] += rows
+            entry["bytes"] += bytes
+
+    def _start_profiler(self, stage):
+        # Un seul profileur actif par thread (étapes imbriquées)
+        if stage not in self.profile or getattr(_local, "profiling", False):
+            return None
+        profiler = cProfile.Profile() if self.profiler == "cprofile" else SamplingProfiler()
+        try:
+            profiler.enable()
+        except ValueError:  # Un autre profileur est déjà actif dans l'interpréteur
+            return None
+        _local.profiling = True
+        return profiler
+
+    def _stop_profiler(self, stage, profiler):
+        profiler.disable()
+        _local.profiling = False
+        with self._lock:
+            self._profiles.setdefault(stage, []).append(profiler)
+
+    @contextmanager
+    def span(self, stage, rows=0, bytes=0):
+        current = Span(rows, bytes)
+        profiler = self._start_profiler(stage)
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            current.seconds = time.perf_counter() - start
+            if profiler is not None:
+                self._stop_profiler(stage, profiler)
+            self.record(stage, current.seconds, current.rows, current.bytes)
+
+    def _write_profiles(self, directory):
+        """Regroupe les profils de chaque étape dans un fichier par étape."""
+        paths = {}
+        for stage, profilers in self._profiles.items():
+            directory.mkdir(parents=True, exist_ok=True)
+            if self.profiler == "cprofile":
+                path = directory / f"{stage}.prof"
+                stats = pstats.Stats(profilers[0])
+                for profiler in profilers[1:]:
+                    stats.add(profiler)
+                stats.dump_stats(path)
+            else:
+                path = directory / f"{stage}.folded"
+                merged = SamplingProfiler()
+                for profiler in profilers:
+                    merged.stacks.update(profiler.stacks)
+                merged.dump(path)
+            paths[stage] = str(path)
+        return paths
+
+    def report(self, **extra):
+        """Rapport de l'exécution (dictionnaire sérialisable en JSON)."""
+        wall = time.perf_counter() - self._start
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self.stages.items()}
+        for entry in stages.values():
+            seconds = entry["seconds"]
+            entry["rows_per_second"] = entry["rows"] / seconds if seconds and entry["rows"] else None
+            entry["bytes_per_second"] = entry["bytes"] / seconds if seconds and entry["bytes"] else None
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": wall,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "environment": environment(),
+            "stages": stages,
+            **extra,
+        }
+
+
+def peak_rss_bytes():
+    """Pic de mémoire résidente du processus courant (octets)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    """Contexte d'une mesure : ligne de commande, Python, machine et commit."""
+    return {
+        "argv": sys.argv,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def start_run(name, profile=(), profiler="cprofile"):
+    """Démarre la mesure d'une exécution ; les `span` suivants y sont enregistrés."""
+    global _run
+    _run = Run(name, profile=profile, profiler=profiler)
+    return _run
+
+
+def current_run():
+    return _run
+
+
+@contextmanager
+def span(stage, rows=0, bytes=0):
+    """Mesure un bloc de code sous le nom d'étape `stage` (sans effet hors exécution).
+
+    Usage :
+        with span("db_write", rows=len(batch)) as s:
+            ...
+            s.add(bytes=written)
+    """
+    run = _run
+    if run is None:
+        # Hors exécution (ex. processus fils) : seule la durée est mesurée
+        current = Span(rows, bytes)
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            current.seconds = time.perf_counter() - start
+        return
+    with run.span(stage, rows, bytes) as current:
+        yield current
+
+
+def record(stage, seconds, rows=0, bytes=0, calls=1):
+    """Ajoute une mesure faite ailleurs (processus fils) à l'exécution en cours."""
+    if _run is not None:
+        _run.record(stage, seconds, rows=rows, bytes=bytes, calls=calls)
+
+
+def timed_call(function, *args, **kwargs):
+    """Appelle `function` et renvoie (résultat, durée) ; utilisable dans un processus fils."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def end_run(path=None, **extra):
+    """Termine l'exécution : écrit le rapport JSON (et les profils) et renvoie son chemin."""
+    global _run
+    run, _run = _run, None
+    if run is None:
+        return None
+    path = Path(path) if path else RUNS_DIR / f"{run.run_id}.json"
+    profiles = run._write_profiles(path.with_suffix(""))
+    report = run.report(profiles=profiles, **extra)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    return path
+
+
+def summary(report):
+    """Tableau texte des étapes d'un rapport, de la plus coûteuse à la moins coûteuse."""
+    lines = [f"{'étape':<16} {'appels':>8} {'secondes':>10} {'lignes':>10} {'Mo':>9}"]
+    for stage, entry in sorted(report["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        lines.append(f"{stage:<16} {entry['calls']:>8} {entry['seconds']:>10.3f} {entry['rows']:>10} "
+                     f"{entry['bytes'] / 1e6:>9.2f}")
+    lines.append(f"Durée totale {report['wall_seconds']:.2f} s, pic mémoire {report['peak_rss_bytes'] / 2**20:.0f} Mo")
+    return "\n".join(lines)
+
+
+def compare(baseline, current, threshold=0.2):
+    """Compare deux rapports étape par étape ; renvoie (lignes, étapes en régression).
+
+    Une étape régresse si sa durée par ligne (par appel si elle ne compte pas
+    de lignes) augmente de plus de `threshold`.
+    """
+    def unit_cost(entry):
+        return entry["seconds"] / (entry["rows"] or entry["calls"] or 1)
+
+    lines = [f"{'étape':<16} {'avant (s)':>10} {'après (s)':>10} {'coût unitaire':>14}"]
+    regressions = []
+    for stage in sorted(set(baseline["stages"]) | set(current["stages"])):
+        before = baseline["stages"].get(stage)
+        after = current["stages"].get(stage)
+        if before is None or after is None:
+            # Étape présente dans un seul des deux rapports
+            seconds = ["-" if entry is None else f"{entry['seconds']:.3f}" for entry in (before, after)]
+            lines.append(f"{stage:<16} {seconds[0]:>10} {seconds[1]:>10}")
+            continue
+        change = unit_cost(after) / unit_cost(before) - 1 if unit_cost(before) else 0.0
+        flag = "  RÉGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(stage)
+        lines.append(f"{stage:<16} {before['seconds']:>10.3f} {after['seconds']:>10.3f} {change:>+13.1%}{flag}")
+    return lines, regressions
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    # Options de la sous-commande `report` de cli.py
+    from cli import main as cli_main
+    sys.modules.setdefault("instrumentation", sys.modules[__name__])
+    sys.exit(cli_main(["report", *sys.argv[1:]]))
@@ -0,0 +1,268 @@
+"""Migration : clé de dédoublonnage, index et partitionnement par année.
+
+Convertit une table airplane_crashes créée avec l'ancien schema.sql (simple
+`id SERIAL PRIMARY KEY`) vers le schéma actuel, sans verrou long :
+
+1. ajout des colonnes source / source_event_id / dedup_key (nullable,
+   modification du catalogue uniquement, pas de réécriture) ;
+2. calcul des clés par tranches d'id, une transaction courte par tranche ;
+3. suppression des doublons par tranches (la ligne de plus petit id est gardée) ;
+4. création de la table partitionnée et copie année par année ;
+5. rattrapage des lignes arrivées pendant la copie puis échange des noms
+   dans une transaction courte. L'ancienne table est conservée sous le nom
+   airplane_crashes_legacy.
+
+Usage :
+    python migrations/001_dedup_key_and_partitions.py [--batch-size 10000]
+"""
+import argparse
+
+from common import connect, schema_section
+
+# Même calcul que db_load.dedup_key
+SOURCE_SQL = """
+    CASE
+        WHEN source_url LIKE '%%ntsb.gov%%' THEN 'NTSB'
+        WHEN source_url LIKE '%%aviation-safety.net%%' THEN 'ASN'
+        ELSE 'unknown'
+    END
+"""
+SOURCE_EVENT_ID_SQL = "NULLIF(substring(rtrim(source_url, '/') from '[^/=]+$'), 'None')"
+DEDUP_KEY_SQL = """
+    md5(lower(source) || '|' || coalesce(
+        source_event_id,
+        to_char(event_date, 'YYYY-MM-DD') || '|'
+            || upper(regexp_replace(coalesce(registration, ''), '[^A-Za-z0-9]', '', 'g'))
+    ))
+"""
+
+# Années couvertes par les partitions de schema.sql
+FIRST_YEAR, LAST_YEAR = 1908, 2030
+
+COLUMNS = """
+    id, source, source_event_id, dedup_key, event_date, location, operator,
+    aircraft_type, registration, flight_number, route, fatalities,
+    description, source_url
+"""
+
+PARTITIONED_TABLE_DDL = """
+CREATE TABLE airplane_crashes_new (
+    id INTEGER NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    source_event_id VARCHAR(100),
+    dedup_key CHAR(32) NOT NULL,
+    event_date DATE NOT NULL,
+    location VARCHAR(255),
+    operator VARCHAR(255),
+    aircraft_type VARCHAR(255),
+    registration VARCHAR(50),
+    flight_number VARCHAR(50),
+    route VARCHAR(255),
+    fatalities INTEGER,
+    description TEXT,
+    source_url VARCHAR(255),
+    CONSTRAINT airplane_crashes_new_pkey PRIMARY KEY (id, event_date),
+    CONSTRAINT airplane_crashes_new_dedup_key UNIQUE (dedup_key, event_date)
+) PARTITION BY RANGE (event_date);
+
+-- Noms de schema.sql suffixés par _new, retirés lors de l'échange (swap_tables)
+CREATE INDEX airplane_crashes_new_event_date_idx ON airplane_crashes_new (event_date);
+CREATE INDEX airplane_crashes_new_operator_idx ON airplane_crashes_new (operator);
+CREATE INDEX airplane_crashes_new_aircraft_type_idx ON airplane_crashes_new (aircraft_type);
+CREATE TABLE airplane_crashes_new_default PARTITION OF airplane_crashes_new DEFAULT;
+"""
+
+
+def id_ranges(cursor, table, batch_size, column="id"):
+    """Renvoie des intervalles [début, fin] couvrant les ids de `table`."""
+    cursor.execute(f"SELECT min({column}), max({column}) FROM {table};")
+    low, high = cursor.fetchone()
+    if low is None:
+        return []
+    return [(start, start + batch_size - 1) for start in range(low, high + 1, batch_size)]
+
+
+def add_columns(conn):
+    """Étape 1 : colonnes nullable sans valeur par défaut (pas de réécriture)."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET lock_timeout = '5s';")
+        cursor.execute("""
+            ALTER TABLE airplane_crashes
+                ADD COLUMN IF NOT EXISTS source VARCHAR(20),
+                ADD COLUMN IF NOT EXISTS source_event_id VARCHAR(100),
+                ADD COLUMN IF NOT EXISTS dedup_key CHAR(32);
+        """)
+    conn.commit()
+
+
+def backfill_keys(conn, batch_size):
+    """Étape 2 : calcule source, source_event_id et dedup_key par tranches."""
+    with conn.cursor() as cursor:
+        for start, end in id_ranges(cursor, "airplane_crashes", batch_size):
+            cursor.execute(f"""
+                UPDATE airplane_crashes
+                SET source = {SOURCE_SQL}, source_event_id = {SOURCE_EVENT_ID_SQL}
+                WHERE id BETWEEN %s AND %s AND source IS NULL;
+            """, (start, end))
+            cursor.execute(f"""
+                UPDATE airplane_crashes SET dedup_key = {DEDUP_KEY_SQL}
+                WHERE id BETWEEN %s AND %s AND dedup_key IS NULL;
+            """, (start, end))
+            conn.commit()
+
+
+def delete_duplicates(conn, batch_size):
+    """Étape 3 : supprime les doublons par tranches, en gardant le plus petit id."""
+    # Index temporaire construit sans bloquer les écritures
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS airplane_crashes_dedup_tmp
+            ON airplane_crashes (dedup_key, event_date, id);
+        """)
+    conn.autocommit = False
+
+    deleted = 0
+    with conn.cursor() as cursor:
+        for start, end in id_ranges(cursor, "airplane_crashes", batch_size):
+            cursor.execute("""
+                DELETE FROM airplane_crashes a
+                USING airplane_crashes b
+                WHERE a.id BETWEEN %s AND %s
+                  AND a.dedup_key = b.dedup_key
+                  AND a.event_date = b.event_date
+                  AND a.id > b.id;
+            """, (start, end))
+            deleted += cursor.rowcount
+            conn.commit()
+    print(f"{deleted} doublons supprimés.")
+
+
+def copy_to_partitioned_table(conn):
+    """Étape 4 : crée la table partitionnée et y copie les lignes année par année."""
+    with conn.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS airplane_crashes_new CASCADE;")
+        cursor.execute(PARTITIONED_TABLE_DDL)
+        cursor.execute("""
+            SELECT DISTINCT extract(year FROM event_date)::int
+            FROM airplane_crashes ORDER BY 1;
+        """)
+        # Toutes les années prévues par schema.sql, plus celles présentes en base
+        years = sorted(set(range(FIRST_YEAR, LAST_YEAR + 1)) | {row[0] for row in cursor.fetchall()})
+        cursor.execute("SELECT coalesce(max(id), 0) FROM airplane_crashes;")
+        copied_up_to = cursor.fetchone()[0]
+        conn.commit()
+
+        for year in years:
+            cursor.execute(
+                "SELECT format('CREATE TABLE IF NOT EXISTS %%I PARTITION OF airplane_crashes_new "
+                "FOR VALUES FROM (%%L) TO (%%L)', 'airplane_crashes_' || %s || '_new', "
+                "make_date(%s, 1, 1), make_date(%s + 1, 1, 1));",
+                (year, year, year)
+            )
+            cursor.execute(cursor.fetchone()[0])
+            cursor.execute(f"""
+                INSERT INTO airplane_crashes_new ({COLUMNS})
+                SELECT {COLUMNS} FROM airplane_crashes
+                WHERE event_date >= make_date(%s, 1, 1) AND event_date < make_date(%s + 1, 1, 1)
+                  AND id <= %s
+                ON CONFLICT DO NOTHING;
+            """, (year, year, copied_up_to))
+            conn.commit()
+    return copied_up_to
+
+
+def swap_tables(conn, copied_up_to):
+    """Étape 5 : rattrapage et échange des tables dans une transaction courte."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET lock_timeout = '5s';")
+        cursor.execute("LOCK TABLE airplane_crashes IN EXCLUSIVE MODE;")
+        # Lignes insérées pendant la copie (les dates hors partitions vont dans DEFAULT)
+        cursor.execute(f"""
+            UPDATE airplane_crashes
+            SET source = {SOURCE_SQL}, source_event_id = {SOURCE_EVENT_ID_SQL}
+            WHERE id > %s AND source IS NULL;
+        """, (copied_up_to,))
+        cursor.execute(f"""
+            UPDATE airplane_crashes SET dedup_key = {DEDUP_KEY_SQL}
+            WHERE id > %s AND dedup_key IS NULL;
+        """, (copied_up_to,))
+        cursor.execute(f"""
+            INSERT INTO airplane_crashes_new ({COLUMNS})
+            SELECT {COLUMNS} FROM airplane_crashes WHERE id > %s
+            ON CONFLICT DO NOTHING;
+        """, (copied_up_to,))
+
+        # La séquence de l'ancienne table est réutilisée par la nouvelle
+        cursor.execute("SELECT pg_get_serial_sequence('airplane_crashes', 'id');")
+        sequence = cursor.fetchone()[0]
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE;")
+        cursor.execute(f"ALTER TABLE airplane_crashes_new ALTER COLUMN id SET DEFAULT nextval('{sequence}');")
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY airplane_crashes_new.id;")
+        cursor.execute("DROP INDEX IF EXISTS airplane_crashes_dedup_tmp;")
+        cursor.execute("ALTER TABLE airplane_crashes RENAME TO airplane_crashes_legacy;")
+        cursor.execute("ALTER TABLE airplane_crashes_new RENAME TO airplane_crashes;")
+        # Index de l'ancienne table (dont airplane_crashes_pkey) renommés en *_legacy_*
+        # pour libérer les noms de schema.sql
+        cursor.execute("""
+            SELECT format('ALTER INDEX %I RENAME TO %I', c.relname,
+                          replace(c.relname, 'airplane_crashes', 'airplane_crashes_legacy'))
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = 'airplane_crashes_legacy'::regclass
+              AND c.relname NOT LIKE 'airplane\\_crashes\\_legacy%';
+        """)
+        for (statement,) in cursor.fetchall():
+            cursor.execute(statement)
+        # Partitions, puis index et contraintes (clé primaire, dedup_key) de la table
+        # et de ses partitions : le suffixe _new est retiré, comme après schema.sql
+        cursor.execute("""
+            SELECT format('ALTER TABLE %I RENAME TO %I', c.relname, replace(c.relname, '_new', ''))
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'airplane_crashes'::regclass;
+        """)
+        for (statement,) in cursor.fetchall():
+            cursor.execute(statement)
+        cursor.execute("""
+            SELECT format('ALTER INDEX %I RENAME TO %I', c.relname, replace(c.relname, '_new', ''))
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE (i.indrelid = 'airplane_crashes'::regclass
+                   OR i.indrelid IN (SELECT inhrelid FROM pg_inherits
+                                     WHERE inhparent = 'airplane_crashes'::regclass))
+              AND c.relname LIKE '%\\_new%';
+        """)
+        for (statement,) in cursor.fetchall():
+            cursor.execute(statement)
+        # Fonction create_crash_partitions de schema.sql, pour les années à venir
+        cursor.execute(partition_function_ddl())
+    conn.commit()
+
+
+def partition_function_ddl():
+    """Extrait la définition de create_crash_partitions de schema.sql."""
+    return schema_section("CREATE OR REPLACE FUNCTION create_crash_partitions", "LANGUAGE plpgsql;")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration dedup_key + partitionnement")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        print("1/5 Ajout des colonnes...")
+        add_columns(conn)
+        print("2/5 Calcul des clés de dédoublonnage...")
+        backfill_keys(conn, args.batch_size)
+        print("3/5 Suppression des doublons...")
+        delete_duplicates(conn, args.batch_size)
+        print("4/5 Copie vers la table partitionnée...")
+        copied_up_to = copy_to_partitioned_table(conn)
+        print("5/5 Échange des tables...")
+        swap_tables(conn, copied_up_to)
+        print("Migration terminée. L'ancienne table est conservée sous le nom airplane_crashes_legacy.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
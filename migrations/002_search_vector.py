@@ -0,0 +1,103 @@
+"""Migration : index plein texte sur les crashs (colonne search_vector).
+
+Ajoute la recherche plein texte de schema.sql à une base existante, sans
+verrou long :
+
+1. ajout de la colonne search_vector (nullable, pas de réécriture) et du
+   trigger qui la calcule pour toute ligne insérée ou modifiée ;
+2. calcul du vecteur des lignes existantes par tranches d'id, une
+   transaction courte par tranche ;
+3. index GIN construit partition par partition (CONCURRENTLY) puis rattaché
+   à l'index de la table partitionnée.
+
+Usage :
+    python migrations/002_search_vector.py [--batch-size 10000]
+"""
+import argparse
+
+from common import connect, schema_section
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce(operator, '') || ' ' || coalesce(aircraft_type, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(location, '') || ' ' || coalesce(route, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+"""
+
+
+def add_column_and_trigger(conn):
+    """Étape 1 : colonne nullable et trigger de schema.sql (les nouvelles lignes sont indexées)."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET lock_timeout = '5s';")
+        cursor.execute("ALTER TABLE airplane_crashes ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;")
+        cursor.execute(schema_section("CREATE OR REPLACE FUNCTION airplane_crashes_search_vector",
+                                    "LANGUAGE plpgsql;"))
+        cursor.execute("DROP TRIGGER IF EXISTS airplane_crashes_search_vector_trigger ON airplane_crashes;")
+        cursor.execute(schema_section("CREATE TRIGGER airplane_crashes_search_vector_trigger",
+                                    "airplane_crashes_search_vector();"))
+    conn.commit()
+
+
+def backfill_vectors(conn, batch_size):
+    """Étape 2 : calcule search_vector des lignes existantes par tranches d'id."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT min(id), max(id) FROM airplane_crashes;")
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+        for start in range(low, high + 1, batch_size):
+            cursor.execute(f"""
+                UPDATE airplane_crashes SET search_vector = {SEARCH_VECTOR_SQL}
+                WHERE id BETWEEN %s AND %s AND search_vector IS NULL;
+            """, (start, start + batch_size - 1))
+            conn.commit()
+
+
+def create_index(conn):
+    """Étape 3 : index GIN par partition, sans bloquer les écritures, puis index parent."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS airplane_crashes_search_idx
+            ON ONLY airplane_crashes USING GIN (search_vector);
+        """)
+        cursor.execute("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'airplane_crashes'::regclass ORDER BY 1;
+        """)
+        partitions = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        for partition in partitions:
+            index = f"{partition}_search_vector_idx"
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} "
+                           f"ON {partition} USING GIN (search_vector);")
+            cursor.execute("""
+                SELECT 1 FROM pg_inherits
+                WHERE inhparent = 'airplane_crashes_search_idx'::regclass AND inhrelid = %s::regclass;
+            """, (index,))
+            if cursor.fetchone() is None:
+                cursor.execute(f"ALTER INDEX airplane_crashes_search_idx ATTACH PARTITION {index};")
+    conn.autocommit = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration index plein texte")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        print("1/3 Ajout de la colonne et du trigger...")
+        add_column_and_trigger(conn)
+        print("2/3 Calcul des vecteurs de recherche...")
+        backfill_vectors(conn, args.batch_size)
+        print("3/3 Création de l'index GIN...")
+        create_index(conn)
+        print("Migration terminée.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Migration : tables d'agrégats analytiques et triggers de suivi des années modifiées.
+
+Crée les tables crash_rollup_*, les triggers et la fonction
+refresh_crash_rollups de schema.sql (section « Agrégats analytiques »,
+en fin de fichier), puis calcule les agrégats année par année, une
+transaction courte par année.
+
+Usage :
+    python migrations/003_rollups.py
+"""
+from common import connect, schema_section
+
+
+def rollup_ddl():
+    """Extrait de schema.sql la section des agrégats (jusqu'à la fin du fichier)."""
+    return schema_section("-- Agrégats analytiques")
+
+
+def main():
+    conn = connect()
+    try:
+        print("1/2 Création des tables d'agrégats et des triggers...")
+        with conn.cursor() as cursor:
+            cursor.execute("SET lock_timeout = '5s';")
+            cursor.execute(rollup_ddl())
+            # Toutes les années existantes sont à calculer
+            cursor.execute("""
+                INSERT INTO crash_rollup_dirty (year)
+                SELECT DISTINCT extract(year FROM event_date)::int FROM airplane_crashes
+                ON CONFLICT DO NOTHING;
+            """)
+            cursor.execute("SELECT year FROM crash_rollup_dirty ORDER BY year;")
+            years = [row[0] for row in cursor.fetchall()]
+            cursor.execute("DELETE FROM crash_rollup_dirty;")
+        conn.commit()
+
+        print(f"2/2 Calcul des agrégats ({len(years)} années)...")
+        with conn.cursor() as cursor:
+            for year in years:
+                # Une année à la fois : refresh_crash_rollups ne traite que les années notées
+                cursor.execute("INSERT INTO crash_rollup_dirty (year) VALUES (%s) ON CONFLICT DO NOTHING;", (year,))
+                cursor.execute("SELECT refresh_crash_rollups();")
+                conn.commit()
+        print("Migration terminée.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Migration : coordonnées (latitude, longitude) des lieux de crash.
+
+Ajoute les colonnes nullables de schema.sql puis les renseigne à partir du
+gazetier local (geocode.py) :
+
+1. ajout des colonnes latitude et longitude (pas de réécriture de la table) ;
+2. géocodage des lieux distincts encore sans coordonnées, en un seul passage
+   (les lieux déjà en cache ne sont pas recherchés) ;
+3. copie des coordonnées dans une table temporaire puis mise à jour partition
+   par partition, une transaction courte par partition.
+
+Usage :
+    python migrations/004_coordinates.py [--gazetteer data/reference/gazetteer.csv]
+"""
+import argparse
+import io
+
+import pandas as pd
+
+# common ajoute la racine du dépôt au chemin d'import (geocode.py)
+from common import connect
+from geocode import GAZETTEER_FILE, Geocoder
+
+
+def add_columns(conn):
+    """Étape 1 : colonnes nullables, sans valeur par défaut."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET lock_timeout = '5s';")
+        cursor.execute("ALTER TABLE airplane_crashes ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;")
+        cursor.execute("ALTER TABLE airplane_crashes ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;")
+    conn.commit()
+
+
+def geocode_locations(conn, geocoder):
+    """Étape 2 : coordonnées des lieux distincts sans coordonnées (lieux inconnus exclus)."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT DISTINCT location FROM airplane_crashes
+            WHERE latitude IS NULL AND location IS NOT NULL;
+        """)
+        locations = pd.Series([row[0] for row in cursor.fetchall()], dtype=object)
+    conn.rollback()
+    coordinates = geocoder.geocode(locations)
+    coordinates.insert(0, "location", locations)
+    geocoder.save()
+    return coordinates.dropna(subset=["latitude", "longitude"])
+
+
+def update_partitions(conn, coordinates):
+    """Étape 3 : mise à jour des crashs, partition par partition."""
+    buffer = io.StringIO()
+    coordinates.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TEMP TABLE crash_coordinates (
+                location VARCHAR(255) PRIMARY KEY, latitude DOUBLE PRECISION, longitude DOUBLE PRECISION
+            );
+        """)
+        cursor.copy_expert("COPY crash_coordinates FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute("ANALYZE crash_coordinates;")
+        cursor.execute("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'airplane_crashes'::regclass ORDER BY 1;
+        """)
+        partitions = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+
+        updated = 0
+        for partition in partitions:
+            cursor.execute(f"""
+                UPDATE {partition} AS c SET latitude = g.latitude, longitude = g.longitude
+                FROM crash_coordinates g
+                WHERE c.location = g.location AND c.latitude IS NULL;
+            """)
+            updated += cursor.rowcount
+            conn.commit()
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration coordonnées des lieux")
+    parser.add_argument("--gazetteer", default=str(GAZETTEER_FILE))
+    args = parser.parse_args()
+
+    geocoder = Geocoder(gazetteer_path=args.gazetteer)
+    conn = connect()
+    try:
+        print("1/3 Ajout des colonnes latitude et longitude...")
+        add_columns(conn)
+        if not geocoder.available:
+            print(f"Gazetier introuvable ({args.gazetteer}) : colonnes ajoutées, coordonnées non calculées.")
+            return
+        print("2/3 Géocodage des lieux distincts...")
+        coordinates = geocode_locations(conn, geocoder)
+        stats = geocoder.stats
+        print(f"    {stats['distinct']} lieux : {stats['hits']} en cache, {stats['resolved']} résolus, "
+              f"{stats['unresolved']} inconnus")
+        print("3/3 Mise à jour des crashs...")
+        print(f"    {update_partitions(conn, coordinates)} crashs géocodés")
+        print("Migration terminée.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
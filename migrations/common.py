@@ -0,0 +1,33 @@
+"""Fonctions partagées par les migrations : connexion et extraits de schema.sql.
+
+Les migrations sont lancées comme scripts (`python migrations/00x_....py`) :
+la racine du dépôt est ajoutée au chemin d'import pour réutiliser
+db_pool.db_config (variables DB_* et fichier .env).
+"""
+import os
+import sys
+
+import psycopg2
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO_ROOT)
+
+from db_pool import db_config  # noqa: E402
+
+SCHEMA_PATH = os.path.join(REPO_ROOT, "schema.sql")
+
+
+def connect():
+    """Connexion dédiée à la migration (hors pool), avec les paramètres de db_pool.db_config()."""
+    return psycopg2.connect(**db_config())
+
+
+def schema_section(start_marker, end_marker=None):
+    """Extrait de schema.sql le texte compris entre deux marqueurs (inclus),
+    ou de `start_marker` à la fin du fichier si `end_marker` est None."""
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        schema = f.read()
+    start = schema.index(start_marker)
+    if end_marker is None:
+        return schema[start:]
+    return schema[start:schema.index(end_marker, start) + len(end_marker)]
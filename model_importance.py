@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, hash as joblib_hash
+from scipy import sparse
+from sklearn.metrics import get_scorer
+from threadpoolctl import threadpool_limits
+
+# Lignes de test conservées pour les permutations (au-delà, tirage aléatoire)
+DEFAULT_MAX_ROWS = 10_000
+DEFAULT_REPEATS = 5
+
+
+def _output_counts(transformer, columns):
+    """Nombre de colonnes transformées produites par chaque colonne d'entrée de `transformer`."""
+    if not hasattr(transformer, "categories_"):
+        return [1] * len(columns)
+    # Encodage one-hot : un bloc contigu par colonne, une colonne par modalité conservée
+    # (les modalités rares regroupées en une seule, moins la modalité supprimée le cas échéant)
+    counts = []
+    for index, categories in enumerate(transformer.categories_):
+        count = len(categories)
+        infrequent = getattr(transformer, "infrequent_categories_", [None] * len(columns))[index]
+        if infrequent is not None:
+            count -= len(infrequent) - 1
+        if transformer.drop_idx_ is not None and transformer.drop_idx_[index] is not None:
+            count -= 1
+        counts.append(count)
+    return counts
+
+
+def feature_blocks(preprocessor, columns):
+    """Colonnes transformées produites par chaque caractéristique d'entrée.
+
+    Les transformations du préprocesseur (normalisation, encodage one-hot)
+    travaillent ligne à ligne : permuter une caractéristique d'entrée revient
+    à permuter ensemble les colonnes transformées qui en proviennent.
+    """
+    blocks = {column: [] for column in columns}
+    for name, transformer, transformer_columns in preprocessor.transformers_:
+        if name == 'remainder' or transformer == 'drop':
+            continue
+        start = preprocessor.output_indices_[name].start
+        for column, count in zip(transformer_columns, _output_counts(transformer, transformer_columns)):
+            blocks[column].extend(range(start, start + count))
+            start += count
+        if start != preprocessor.output_indices_[name].stop:
+            raise ValueError(f"Colonnes produites par le transformateur {name!r} non rattachables aux entrées")
+    return {column: np.array(block) for column, block in blocks.items() if block}
+
+
+def _permute_block(X, block, order):
+    """Copie de X dont les colonnes `block` suivent l'ordre de lignes `order` (matrice dense ou creuse)."""
+    if sparse.issparse(X):
+        mask = np.zeros(X.shape[1])
+        mask[block] = 1.0
+        selected = sparse.diags(mask)
+        return (X - X @ selected + X[order] @ selected).tocsr()
+    X = X.copy()
+    X[:, block] = X[np.ix_(order, block)]
+    return X
+
+
+def _score(classifier, X, y, scorer, block=None, seed=None):
+    """Score de `classifier` sur X, après permutation des lignes des colonnes `block` si fourni."""
+    with threadpool_limits(limits=1):
+        if block is not None:
+            X = _permute_block(X, block, np.random.default_rng(seed).permutation(X.shape[0]))
+        return scorer(classifier, X, y)
+
+
+def permutation_importances(results, X_test, y_test, n_repeats=DEFAULT_REPEATS, max_rows=DEFAULT_MAX_ROWS,
+                            scoring='f1', n_jobs=-1, random_state=42):
+    """Importance par permutation de chaque caractéristique d'entrée, pour chaque pipeline de `results`.
+
+    L'ensemble de test (sous-échantillonné à `max_rows` lignes) est transformé
+    une seule fois par préprocesseur distinct ; seuls les classifieurs sont
+    évalués sur les copies permutées. Les (modèle, caractéristique,
+    répétition) sont répartis sur `n_jobs` processus. Renvoie un DataFrame
+    (modèle, caractéristique, importance moyenne et écart-type de la baisse
+    du score `scoring`).
+    """
+    rng = np.random.default_rng(random_state)
+    if len(X_test) > max_rows:
+        rows = np.sort(rng.choice(len(X_test), max_rows, replace=False))
+        X_test, y_test = X_test.iloc[rows], y_test.iloc[rows]
+    y = np.asarray(y_test)
+    scorer = get_scorer(scoring)
+
+    # Une matrice transformée par préprocesseur ajusté distinct (en pratique une seule), gardée
+    # au format produit par le préprocesseur (creux après un encodage one-hot) : celui des classifieurs
+    matrices, blocks, tasks = {}, {}, []
+    for name, result in results.items():
+        preprocessor = result['model'].named_steps['preprocessor']
+        key = joblib_hash(preprocessor)
+        if key not in matrices:
+            matrices[key] = preprocessor.transform(X_test)
+            blocks[key] = feature_blocks(preprocessor, list(X_test.columns))
+        classifier = result['model'].named_steps['classifier']
+        # Score de référence, puis une tâche par (caractéristique, répétition)
+        tasks.append((name, None, classifier, key, None, None))
+        seeds = iter(np.random.SeedSequence(random_state).spawn(len(blocks[key]) * n_repeats))
+        for feature, block in blocks[key].items():
+            for _ in range(n_repeats):
+                tasks.append((name, feature, classifier, key, block, next(seeds)))
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score)(classifier, matrices[key], y, scorer, block, seed)
+        for _, _, classifier, key, block, seed in tasks)
+
+    baselines = {task[0]: score for task, score in zip(tasks, scores) if task[1] is None}
+    drops = pd.DataFrame([(task[0], task[1], baselines[task[0]] - score)
+                          for task, score in zip(tasks, scores) if task[1] is not None],
+                         columns=['Modèle', 'Caractéristique', 'Baisse'])
+    table = drops.groupby(['Modèle', 'Caractéristique'], sort=False)['Baisse'].agg(['mean', 'std']).reset_index()
+    table.columns = ['Modèle', 'Caractéristique', 'Importance', 'Écart-type']
+    return table.sort_values(['Modèle', 'Importance'], ascending=[True, False], ignore_index=True)
+
+
+def render_importance_plot(table, path):
+    """Un graphique en barres par modèle (importance moyenne et écart-type)."""
+    import matplotlib
+    matplotlib.use("Agg")  # Rendu non interactif
+    import matplotlib.pyplot as plt
+
+    models = list(dict.fromkeys(table['Modèle']))
+    fig, axes = plt.subplots(len(models), 1, figsize=(10, 2.5 * len(models)), squeeze=False)
+    for axis, model in zip(axes[:, 0], models):
+        rows = table[table['Modèle'] == model].iloc[::-1]
+        axis.barh(rows['Caractéristique'], rows['Importance'], xerr=rows['Écart-type'].fillna(0))
+        axis.axvline(0, color='k', lw=0.8)
+        axis.set_title(model)
+    axes[-1, 0].set_xlabel('Baisse du score après permutation')
+    fig.suptitle('Importance des caractéristiques par permutation')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVC, LinearSVC
+from sklearn.utils.validation import check_is_fitted
+
+# Au-delà de ce nombre de lignes d'entraînement, le modèle 'SVM' utilise l'approximation du noyau
+SVM_EXACT_MAX_ROWS = int(os.environ.get("SVM_EXACT_MAX_ROWS", 10_000))
+
+SVM_MODES = ["auto", "exact", "approx"]
+
+KERNEL_APPROXIMATIONS = {"nystroem": Nystroem, "fourier": RBFSampler}
+
+
+class ApproximateKernelSVC(ClassifierMixin, BaseEstimator):
+    """SVM à noyau RBF approché : caractéristiques de Nyström (ou de Fourier
+    aléatoires) suivies d'un SVM linéaire, calibré une seule fois (Platt) sur
+    une part de l'entraînement.
+
+    Remplace SVC(probability=True), dont l'entraînement croît au moins
+    quadratiquement avec les lignes (et la calibration interne refait cinq
+    entraînements) et dont la prédiction dépend du nombre de vecteurs de
+    support. Ici, coût d'entraînement linéaire et prédiction en
+    O(n_components) par ligne. `C` et `gamma` ont le sens de ceux de SVC.
+    """
+
+    def __init__(self, C=1.0, gamma='scale', n_components=300, approximation='nystroem',
+                 calibration_size=0.2, random_state=None):
+        self.C = C
+        self.gamma = gamma
+        self.n_components = n_components
+        self.approximation = approximation
+        self.calibration_size = calibration_size
+        self.random_state = random_state
+
+    def _gamma(self, X):
+        """`gamma='scale'` comme SVC : 1 / (nombre de colonnes * variance de X)."""
+        if self.gamma != 'scale':
+            return self.gamma
+        if sparse.issparse(X):
+            variance = X.multiply(X).mean() - X.mean() ** 2
+        else:
+            variance = np.asarray(X, dtype=np.float64).var()
+        return 1.0 / (X.shape[1] * variance) if variance > 0 else 1.0
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        if len(self.classes_) != 2:
+            raise ValueError(f"ApproximateKernelSVC ne traite que deux classes ({len(self.classes_)} trouvées)")
+        X_fit, X_calibration, y_fit, y_calibration = train_test_split(
+            X, y, test_size=self.calibration_size, stratify=y, random_state=self.random_state)
+
+        approximation = KERNEL_APPROXIMATIONS[self.approximation]
+        self.features_ = approximation(gamma=self._gamma(X_fit), n_components=min(self.n_components, X_fit.shape[0]),
+                                       random_state=self.random_state)
+        self.svm_ = LinearSVC(C=self.C, random_state=self.random_state)
+        self.svm_.fit(self.features_.fit_transform(X_fit), y_fit)
+
+        # Calibration de Platt : régression logistique sur les scores de la part réservée
+        self.calibrator_ = LogisticRegression(C=1e6)
+        self.calibrator_.fit(self._scores(X_calibration).reshape(-1, 1), y_calibration)
+        return self
+
+    def _scores(self, X):
+        return self.svm_.decision_function(self.features_.transform(X))
+
+    def decision_function(self, X):
+        check_is_fitted(self, "calibrator_")
+        return self._scores(X)
+
+    def predict_proba(self, X):
+        return self.calibrator_.predict_proba(self.decision_function(X).reshape(-1, 1))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def svm_classifier(n_rows, mode="auto", random_state=None):
+    """Modèle 'SVM' : SVC exact avec probabilités, ou approximation du noyau
+    (`mode='auto'` : approximation au-delà de SVM_EXACT_MAX_ROWS lignes)."""
+    if mode == "exact" or (mode == "auto" and n_rows <= SVM_EXACT_MAX_ROWS):
+        return SVC(probability=True, random_state=random_state)
+    return ApproximateKernelSVC(random_state=random_state)
@@ -0,0 +1,167 @@
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from instrumentation import peak_rss_bytes
+from normalize import parse_dates, parse_fatalities
+from pipeline import DEFAULT_MAX_MEMORY_BYTES
+
+# Caractéristiques identiques à preprocess_data (improved-model-analysis.py) ; sur le
+# stockage partitionné, Fatalities et target sont calculées (parquet_store.DERIVED_COLUMNS)
+STREAM_COLUMNS = ['event_date', 'Fatalities', 'target']
+STREAM_FEATURES = ['Fatalities', 'year', 'month', 'day']
+CLASSES = np.array([0, 1])
+
+# Copies de travail d'un bloc (DataFrame, dates, matrice, matrice normalisée)
+CHUNK_OVERHEAD = 4
+
+
+def chunk_rows(file_path, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES, sample_rows=1000):
+    """Taille de bloc (en lignes) tenant dans `max_memory_bytes`, estimée sur un échantillon."""
+    sample = next(iter_chunks(file_path, sample_rows))
+    row_bytes = max(1, sample.memory_usage(deep=True).sum() // max(1, len(sample)))
+    return max(sample_rows, int(max_memory_bytes // (row_bytes * CHUNK_OVERHEAD)))
+
+
+def iter_chunks(file_path, rows):
+    """Lit les données traitées (CSV ou Parquet) par blocs de `rows` lignes."""
+    if os.path.isdir(file_path) or str(file_path).endswith(".parquet"):
+        from parquet_store import open_dataset, projection
+        dataset = open_dataset(file_path)
+        columns = projection(STREAM_COLUMNS, dataset.schema.names)
+        for batch in dataset.to_batches(columns=columns, batch_size=rows):
+            yield batch.to_pandas(date_as_object=False)
+    else:
+        yield from pd.read_csv(file_path, usecols=STREAM_COLUMNS, chunksize=rows)
+
+
+def chunk_features(chunk):
+    """Matrice de caractéristiques et cible d'un bloc (lignes sans date ignorées)."""
+    dates = parse_dates(chunk['event_date'])
+    valid = dates.notna().to_numpy() & chunk['target'].notna().to_numpy()
+    dates = dates[valid]
+    X = np.column_stack([
+        parse_fatalities(chunk['Fatalities'][valid]).to_numpy(dtype=np.float64),
+        dates.dt.year.to_numpy(dtype=np.float64),
+        dates.dt.month.to_numpy(dtype=np.float64),
+        dates.dt.day.to_numpy(dtype=np.float64),
+    ])
+    return X, chunk['target'][valid].to_numpy(dtype=np.int64)
+
+
+def holdout_mask(start, n, test_size=0.2):
+    """Lignes réservées au test, choisies par hachage de leur position (stable d'une exécution à l'autre)."""
+    positions = np.arange(start, start + n, dtype=np.uint64)
+    return (positions * np.uint64(2654435761) % np.uint64(2 ** 32)) < np.uint64(test_size * 2 ** 32)
+
+
+class StreamingModel:
+    """Scaler et classifieurs entraînés bloc par bloc (`partial_fit`).
+
+    L'état (statistiques du scaler, coefficients, nombre de lignes vues) est
+    sauvegardé avec joblib ; `update` reprend l'entraînement à partir de cet
+    état avec de nouvelles lignes, sans repasser sur l'historique. Le scaler
+    est figé après `fit` : le faire évoluer changerait le sens des
+    coefficients déjà appris.
+    """
+
+    def __init__(self, random_state=42):
+        self.scaler = StandardScaler()
+        # SGD moyenné : une mise à jour sur quelques lignes ne fait pas sauter les coefficients
+        self.models = {
+            'SGD Logistic Regression': SGDClassifier(loss='log_loss', average=True, random_state=random_state),
+            'Naive Bayes': GaussianNB(),
+        }
+        self.rows_seen = 0
+        self.stats = {"chunks": 0, "rows": 0, "max_chunk_bytes": 0, "peak_rss_bytes": 0}
+
+    def _chunks(self, file_path, rows):
+        for chunk in iter_chunks(file_path, rows):
+            self.stats["chunks"] += 1
+            self.stats["max_chunk_bytes"] = max(self.stats["max_chunk_bytes"],
+                                                int(chunk.memory_usage(deep=True).sum()))
+            X, y = chunk_features(chunk)
+            yield X, y
+
+    def _partial_fit(self, X, y):
+        X = self.scaler.transform(X)
+        for model in self.models.values():
+            model.partial_fit(X, y, classes=CLASSES)
+
+    def fit(self, file_path, rows, epochs=1, test_size=0.2):
+        """Entraînement initial : une passe pour le scaler, puis `epochs` passes pour les classifieurs."""
+        start = 0
+        for X, y in self._chunks(file_path, rows):
+            train = ~holdout_mask(start, len(y), test_size)
+            start += len(y)
+            self.scaler.partial_fit(X[train])
+
+        for _ in range(epochs):
+            start = 0
+            for X, y in self._chunks(file_path, rows):
+                train = ~holdout_mask(start, len(y), test_size)
+                start += len(y)
+                self._partial_fit(X[train], y[train])
+        self.rows_seen = start
+        self.stats["rows"] = start
+        self.stats["peak_rss_bytes"] = peak_rss_bytes()
+        return self
+
+    def update(self, file_path, rows, test_size=0.2):
+        """Mise à jour à chaud avec de nouvelles lignes (ex. les crashs du mois).
+
+        Les lignes sont normalisées avec le scaler de l'entraînement initial,
+        qui n'est pas modifié.
+        """
+        start = self.rows_seen
+        for X, y in self._chunks(file_path, rows):
+            train = ~holdout_mask(start, len(y), test_size)
+            start += len(y)
+            self._partial_fit(X[train], y[train])
+        self.stats["rows"] += start - self.rows_seen
+        self.rows_seen = start
+        self.stats["peak_rss_bytes"] = peak_rss_bytes()
+        return self
+
+    def evaluate(self, file_path, rows, test_size=0.2, first_row=0):
+        """Métriques de chaque classifieur sur les lignes réservées au test."""
+        y_true, y_pred = [], {name: [] for name in self.models}
+        start = first_row
+        for X, y in self._chunks(file_path, rows):
+            test = holdout_mask(start, len(y), test_size)
+            start += len(y)
+            if not test.any():
+                continue
+            X_test = self.scaler.transform(X[test])
+            y_true.append(y[test])
+            for name, model in self.models.items():
+                y_pred[name].append(model.predict(X_test))
+
+        if not y_true:
+            return {}
+        y_true = np.concatenate(y_true)
+        results = {}
+        for name in self.models:
+            predicted = np.concatenate(y_pred[name])
+            results[name] = {
+                'accuracy': accuracy_score(y_true, predicted),
+                'precision': precision_score(y_true, predicted, zero_division=0),
+                'recall': recall_score(y_true, predicted, zero_division=0),
+                'f1_score': f1_score(y_true, predicted, zero_division=0),
+            }
+        return results
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_curve, auc, confusion_matrix
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+from instrumentation import span
+
+
+def fit_and_score(name, model, preprocessor, X_train, y_train, X_test, y_test, max_threads=None):
+    """Entraîne le pipeline préprocesseur + modèle et calcule ses métriques.
+
+    Renvoie un dictionnaire avec les métriques, le pipeline entraîné, les
+    prédictions sur l'ensemble de test et les durées d'entraînement et de
+    prédiction. `max_threads` limite les threads BLAS/OpenMP (utile quand
+    plusieurs modèles tournent en parallèle).
+    """
+    pipeline = Pipeline([
+        ('preprocessor', clone(preprocessor)),
+        ('classifier', model)
+    ])
+
+    with threadpool_limits(limits=max_threads):
+        # Entraînement
+        with span("fit", rows=len(X_train)) as fit:
+            pipeline.fit(X_train, y_train)
+
+        # Prédictions
+        with span("predict", rows=len(X_test)) as predict:
+            y_pred = pipeline.predict(X_test)
+            y_prob = pipeline.predict_proba(X_test)[:, 1]
+
+    return {
+        'name': name,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred),
+        'recall': recall_score(y_test, y_pred),
+        'f1_score': f1_score(y_test, y_pred),
+        'model': pipeline,
+        'y_pred': y_pred,
+        'y_prob': y_prob,
+        # Durées mesurées dans le processus d'entraînement (reportées par le parent en mode parallèle)
+        'timings': {'fit': fit.seconds, 'predict': predict.seconds}
+    }
+
+
+def render_model_plots(name, y_test, y_pred, y_prob, results_dir):
+    """Enregistre la matrice de confusion et la courbe ROC d'un modèle."""
+    import matplotlib
+    matplotlib.use("Agg")  # Rendu non interactif
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    slug = name.replace(' ', '_').lower()
+
+    # Matrice de confusion
+    cm = confusion_matrix(y_test, y_pred)
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
+    plt.title(f'Matrice de confusion - {name}')
+    plt.ylabel('Valeur réelle')
+    plt.xlabel('Valeur prédite')
+    plt.savefig(f"{results_dir}/confusion_matrix_{slug}.png")
+    plt.close()
+
+    # Courbe ROC
+    fpr, tpr, _ = roc_curve(y_test, y_prob)
+    roc_auc = auc(fpr, tpr)
+
+    plt.figure(figsize=(8, 6))
+    plt.plot(fpr, tpr, lw=2, label=f'ROC curve (area = {roc_auc:.2f})')
+    plt.plot([0, 1], [0, 1], 'k--', lw=2)
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('Taux de faux positifs')
+    plt.ylabel('Taux de vrais positifs')
+    plt.title(f'Courbe ROC - {name}')
+    plt.legend(loc="lower right")
+    plt.savefig(f"{results_dir}/roc_curve_{slug}.png")
+    plt.close()
+    return slug
+
+
+def default_workers(n_tasks):
+    """Nombre de processus : un par tâche, dans la limite des cœurs disponibles."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(1, min(n_tasks, cores))
+
+
+def plot_executor():
+    """Processus unique dédié au rendu des graphiques (hors du chemin critique)."""
+    return ProcessPoolExecutor(max_workers=1)
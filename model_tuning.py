@@ -0,0 +1,170 @@
+import hashlib
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+from joblib import Memory, Parallel, delayed, hash as joblib_hash
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+# Grilles d'hyperparamètres par modèle (clés du dictionnaire `models`)
+PARAM_GRIDS = {
+    'Logistic Regression': {
+        'classifier__C': [0.01, 0.1, 1.0, 10.0],
+        'classifier__class_weight': [None, 'balanced'],
+    },
+    'Random Forest': {
+        'classifier__n_estimators': [100, 300],
+        'classifier__max_depth': [None, 5, 10],
+        'classifier__min_samples_leaf': [1, 5],
+    },
+    'Gradient Boosting': {
+        'classifier__n_estimators': [100, 300],
+        'classifier__learning_rate': [0.03, 0.1],
+        'classifier__max_depth': [2, 3],
+    },
+    'SVM': {
+        'classifier__C': [0.1, 1.0, 10.0],
+        'classifier__gamma': ['scale', 0.1],
+    },
+}
+
+
+class TuningStore:
+    """Journal (JSON Lines) des évaluations de candidats, pour reprendre une recherche.
+
+    Chaque ligne contient la clé du candidat (modèle, paramètres, nombre de
+    lignes, empreinte des données et de la configuration du pipeline), son
+    score moyen et son temps d'entraînement.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.records = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.records[record["key"]] = record
+
+    @staticmethod
+    def key(model_name, params, n_resources, fingerprint, cv, scoring, config=None):
+        payload = json.dumps([model_name, sorted(params.items(), key=str), n_resources,
+                              fingerprint, cv, scoring] + ([config] if config else []), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def add(self, record):
+        self.records[record["key"]] = record
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def _fit_fold(pipeline, params, X, y, train_index, test_index, scorer):
+    """Entraîne un candidat sur un pli et renvoie (score, temps d'entraînement)."""
+    estimator = clone(pipeline).set_params(**params)
+    start = time.perf_counter()
+    estimator.fit(X.iloc[train_index], y.iloc[train_index])
+    fit_time = time.perf_counter() - start
+    return scorer(estimator, X.iloc[test_index], y.iloc[test_index]), fit_time
+
+
+def successive_halving_search(model_name, pipeline, param_grid, X, y, store, cv=3, factor=3,
+                              scoring='f1', n_jobs=-1, random_state=42):
+    """Recherche par divisions successives (successive halving) avec reprise.
+
+    Tous les candidats sont évalués sur un petit échantillon ; seul le meilleur
+    tiers (`factor`) passe à l'itération suivante, sur un échantillon `factor`
+    fois plus grand, jusqu'à utiliser toutes les lignes. Les plis de tous les
+    candidats d'une itération sont répartis sur `n_jobs` cœurs. Les évaluations
+    déjà présentes dans `store` ne sont pas refaites.
+    Renvoie (évaluation du meilleur candidat, historique des évaluations).
+    """
+    candidates = list(ParameterGrid(param_grid))
+    n_samples = len(X)
+    n_classes = len(np.unique(y))
+    # Nombre d'itérations : jusqu'à ce qu'il ne reste qu'un candidat, évalué sur toutes les lignes
+    n_iterations = 1
+    remaining = len(candidates)
+    while remaining > 1:
+        remaining = math.ceil(remaining / factor)
+        n_iterations += 1
+    min_resources = max(2 * cv * n_classes, n_samples // factor ** (n_iterations - 1))
+
+    # Ordre des lignes fixe : chaque échantillon contient le précédent
+    order = np.random.RandomState(random_state).permutation(n_samples)
+    fingerprint = joblib_hash((X, y))
+    # Préprocesseur et estimateur (classe et paramètres hors grille) : un changement
+    # de caractéristiques ou de modèle (ex. SVM exact ou approché) invalide le journal
+    config = joblib_hash(pipeline.steps)
+    scorer = get_scorer(scoring)
+    splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    history = []
+
+    n_resources = min_resources
+    for iteration in range(n_iterations):
+        n_resources = n_samples if iteration == n_iterations - 1 else min(n_resources, n_samples)
+        X_sub, y_sub = X.iloc[order[:n_resources]], y.iloc[order[:n_resources]]
+        folds = list(splitter.split(X_sub, y_sub))
+
+        keys = [store.key(model_name, params, n_resources, fingerprint, cv, scoring, config) for params in candidates]
+        todo = [(params, key) for params, key in zip(candidates, keys) if store.get(key) is None]
+        print(f"  {model_name} - itération {iteration + 1}/{n_iterations}: {len(candidates)} candidats, "
+              f"{n_resources} lignes ({len(candidates) - len(todo)} repris du journal)")
+
+        outputs = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_fold)(pipeline, params, X_sub, y_sub, train_index, test_index, scorer)
+            for params, _ in todo for train_index, test_index in folds
+        )
+        for i, (params, key) in enumerate(todo):
+            scores, fit_times = zip(*outputs[i * cv:(i + 1) * cv])
+            store.add({
+                "key": key, "model": model_name, "params": params, "n_resources": n_resources,
+                "iteration": iteration, "mean_score": float(np.mean(scores)),
+                "std_score": float(np.std(scores)), "mean_fit_time": float(np.mean(fit_times)),
+            })
+
+        ranked = sorted(zip(candidates, keys), key=lambda item: -store.get(item[1])["mean_score"])
+        history.extend(store.get(key) for _, key in ranked)
+        if iteration == n_iterations - 1:
+            break
+        candidates = [params for params, _ in ranked[:math.ceil(len(ranked) / factor)]]
+        n_resources *= factor
+
+    return store.get(ranked[0][1]), history
+
+
+def tune_models(models, preprocessor, X_train, y_train, tuning_dir, param_grids=None, n_jobs=-1, **kwargs):
+    """Optimise les hyperparamètres de chaque modèle de `models`.
+
+    Le préprocesseur ajusté est mis en cache sur disque (joblib.Memory) : il
+    n'est réentraîné qu'une fois par échantillon et par pli, quel que soit le
+    nombre de candidats. Renvoie {nom du modèle: meilleurs paramètres}.
+    """
+    param_grids = param_grids or PARAM_GRIDS
+    tuning_dir = Path(tuning_dir)
+    store = TuningStore(tuning_dir / "tuning_results.jsonl")
+    memory = Memory(tuning_dir / "cache", verbose=0)
+
+    best_params = {}
+    for name, model in models.items():
+        if name not in param_grids:
+            continue
+        pipeline = Pipeline([
+            ('preprocessor', preprocessor),
+            ('classifier', model)
+        ], memory=memory)
+        best, _ = successive_halving_search(name, pipeline, param_grids[name], X_train, y_train,
+                                            store, n_jobs=n_jobs, **kwargs)
+        best_params[name] = best["params"]
+        print(f"Meilleurs paramètres pour {name}: {best['params']} "
+              f"(score {best['mean_score']:.3f} sur {best['n_resources']} lignes)")
+    return best_params
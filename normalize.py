@@ -0,0 +1,113 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Formats de date des sources, essayés dans l'ordre (jamais d'inférence ligne par ligne) :
+# ISO (NTSB, éventuellement horodaté : seuls les 10 premiers caractères sont lus),
+# liste ASN (01-Jan-2023) et format américain.
+DATE_FORMATS = ['%Y-%m-%d', '%d-%b-%Y', '%m/%d/%Y']
+
+LOCATION_COLUMNS = ['city', 'state', 'country']
+CATEGORY_COLUMNS = ['operator', 'aircraft_type']
+
+
+def _text(series):
+    """Colonne texte Arrow (espaces de début et de fin supprimés)."""
+    return pc.utf8_trim_whitespace(pa.array(series.astype('string').array, type=pa.string()))
+
+
+def _string_series(array, index):
+    """Série pandas `string` ; les chaînes vides deviennent manquantes."""
+    array = pc.if_else(pc.equal(array, ''), pa.scalar(None, pa.string()), array)
+    return pd.Series(array.to_numpy(zero_copy_only=False), index=index, dtype='string')
+
+
+def _clean_text(series):
+    """Supprime les espaces superflus ; les chaînes vides deviennent manquantes."""
+    series = series.astype('string').str.strip().str.replace(r'\s+', ' ', regex=True)
+    return series.mask(series == '')
+
+
+def parse_dates(series):
+    """Convertit une colonne de dates avec les formats explicites de DATE_FORMATS (NaT sinon)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    text = _text(series)
+    parsed = pc.strptime(pc.utf8_slice_codeunits(text, 0, 10), format=DATE_FORMATS[0], unit='s',
+                         error_is_null=True)
+    for date_format in DATE_FORMATS[1:]:
+        # Un format n'est essayé que s'il reste des dates non reconnues
+        if parsed.null_count == text.null_count:
+            break
+        parsed = pc.coalesce(parsed, pc.strptime(text, format=date_format, unit='s', error_is_null=True))
+    return pd.Series(parsed.to_numpy(zero_copy_only=False), index=series.index)
+
+
+def parse_fatalities(series):
+    """Nombre de victimes en entier (0 si absent ou non numérique).
+
+    Accepte les entiers, les chaînes numériques et le format ASN "victimes/occupants".
+    """
+    if pd.api.types.is_integer_dtype(series):
+        return series.fillna(0).astype('int32')
+    leading = pc.struct_field(pc.extract_regex(_text(series), r'^(?P<n>\d+)'), [0])
+    counts = pc.fill_null(pc.cast(leading, pa.int32(), safe=False), 0)
+    return pd.Series(counts.to_numpy(zero_copy_only=False), index=series.index, dtype='int32')
+
+
+def split_location(series):
+    """Découpe « ville, état, pays » en trois colonnes.
+
+    Avec deux éléments, le second est le pays ; avec un seul, c'est la ville.
+    """
+    parts = pc.list_slice(pc.split_pattern(_text(series), ',', max_splits=2, reverse=True), 0, 3,
+                          return_fixed_size_list=True)
+    first, second, third = (pc.utf8_trim_whitespace(pc.list_element(parts, i)) for i in range(3))
+    three = pc.is_valid(third)
+    return pd.DataFrame({
+        'city': _string_series(first, series.index),
+        'state': _string_series(pc.if_else(three, second, pa.scalar(None, pa.string())), series.index),
+        'country': _string_series(pc.if_else(three, third, second), series.index),
+    }, index=series.index)
+
+
+def encode_categories(frame, columns=CATEGORY_COLUMNS):
+    """Convertit les colonnes `columns` présentes en type `category` (libellés nettoyés)."""
+    for column in columns:
+        if column in frame.columns:
+            frame[column] = _clean_text(frame[column]).astype('category')
+    return frame
+
+
+def normalize_crashes(frame, categories=True):
+    """Normalise un DataFrame de crashs (colonnes de CSV_FIELDNAMES) de façon vectorisée.
+
+    `event_date` devient datetime64, `fatalities` int32, `location` est
+    découpée en city/state/country et, avec `categories`, operator et
+    aircraft_type sont encodés en `category`.
+    """
+    frame = frame.copy()
+    if 'event_date' in frame.columns:
+        frame['event_date'] = parse_dates(frame['event_date'])
+    if 'fatalities' in frame.columns:
+        frame['fatalities'] = parse_fatalities(frame['fatalities'])
+    if 'location' in frame.columns:
+        frame[LOCATION_COLUMNS] = split_location(frame['location'])
+    if categories:
+        encode_categories(frame)
+    return frame
+
+
+def normalize_records(records):
+    """Normalise un lot de crashs (dictionnaires) pour les destinations du pipeline.
+
+    Les dates sont renvoyées au format ISO (None si illisibles), les valeurs
+    manquantes valent None.
+    """
+    if not records:
+        return records
+    frame = normalize_crashes(pd.DataFrame(records, dtype=object), categories=False)
+    if 'event_date' in frame.columns:
+        frame['event_date'] = frame['event_date'].dt.strftime('%Y-%m-%d')
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
@@ -0,0 +1,194 @@
+import shutil
+import uuid
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from instrumentation import span
+from normalize import normalize_crashes
+
+# Stockage colonnaire des données traitées : data/processed/parquet/source=.../year=.../*.parquet
+PARQUET_DIR = Path("data/processed/parquet")
+
+# Schéma explicite, aligné sur la table airplane_crashes de schema.sql
+CRASH_SCHEMA = pa.schema([
+    ("source_event_id", pa.string()),
+    ("event_date", pa.date32()),
+    ("location", pa.string()),
+    ("city", pa.string()),
+    ("state", pa.string()),
+    ("country", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("operator", pa.string()),
+    ("aircraft_type", pa.string()),
+    ("registration", pa.string()),
+    ("flight_number", pa.string()),
+    ("route", pa.string()),
+    ("fatalities", pa.int32()),
+    ("description", pa.string()),
+    ("source_url", pa.string()),
+])
+
+# Colonnes de partitionnement (répertoires Hive)
+PARTITION_SCHEMA = pa.schema([("source", pa.string()), ("year", pa.int16())])
+
+ROW_GROUP_SIZE = 100_000
+
+# Colonnes de l'analyse (improved-model-analysis.py, model_streaming.py) absentes du
+# stockage, calculées à la lecture comme DB_COLUMNS pour la base : nombre de victimes
+# et cible (accident mortel, définition par défaut de DB_TARGET_SQL)
+_FATALITIES = pc.coalesce(ds.field("fatalities"), pa.scalar(0, pa.int32()))
+DERIVED_COLUMNS = {
+    "Fatalities": _FATALITIES,
+    "target": pc.greater(_FATALITIES, 0).cast(pa.int8()),
+}
+
+
+def _parse_date(value):
+    """Convertit une date ISO (éventuellement horodatée) en date, None sinon."""
+    try:
+        return date.fromisoformat(str(value)[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def _require_date(value, name):
+    """Date de filtre convertie par _parse_date ; ValueError si elle est illisible."""
+    parsed = _parse_date(value)
+    if parsed is None:
+        raise ValueError(f"{name} illisible: {value!r} (format attendu AAAA-MM-JJ)")
+    return parsed
+
+
+def crashes_to_table(crashes, source, normalized=False):
+    """Convertit une liste de crashs en table Arrow typée selon CRASH_SCHEMA.
+
+    Avec `normalized`, les crashs sortent déjà de normalize.normalize_records
+    (dates ISO, victimes entières, lieu découpé) : ils sont seulement typés.
+    """
+    frame = pd.DataFrame(crashes, dtype=object).reindex(columns=CRASH_SCHEMA.names)
+    if normalized:
+        frame["event_date"] = pd.to_datetime(frame["event_date"], format="%Y-%m-%d")
+    else:
+        frame = normalize_crashes(frame, categories=False)
+    columns = {}
+    for field in CRASH_SCHEMA:
+        if field.name == "event_date":
+            columns[field.name] = pa.array(frame["event_date"]).cast(pa.date32())
+        elif field.name == "fatalities":
+            columns[field.name] = pa.array(frame["fatalities"], type=pa.int32())
+        elif field.type == pa.float64():
+            columns[field.name] = pa.array(pd.to_numeric(frame[field.name]), type=pa.float64(), from_pandas=True)
+        else:
+            columns[field.name] = pa.array(frame[field.name].astype("string"), type=pa.string())
+    table = pa.table(columns, schema=CRASH_SCHEMA)
+    years = pa.array(frame["event_date"].dt.year, type=pa.int16(), from_pandas=True)
+    return (table.append_column("source", pa.array([source] * len(table), type=pa.string()))
+                 .append_column("year", years))
+
+
+class ParquetSink:
+    """Destination Parquet partitionnée par source et année, écrite lot par lot.
+
+    Par défaut, la partition de la source est remplacée au premier lot (comme
+    le fichier CSV) ; avec `append=True` les lots s'ajoutent aux fichiers existants.
+    `normalized=True` indique des lots déjà normalisés (voir crashes_to_table).
+    """
+
+    def __init__(self, source, root=PARQUET_DIR, append=False, normalized=False):
+        self.source = source
+        self.root = Path(root)
+        self.append = append
+        self.normalized = normalized
+        self.rows = 0
+        self._run_id = uuid.uuid4().hex[:12]
+        self._batches = 0
+
+    def __call__(self, batch):
+        if self._batches == 0 and not self.append:
+            shutil.rmtree(self.root / f"source={self.source}", ignore_errors=True)
+        with span("parquet_write", rows=len(batch)) as measure:
+            table = crashes_to_table(batch, self.source, normalized=self.normalized)
+            pq.write_to_dataset(
+                table, self.root,
+                partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+                basename_template=f"{self._run_id}-{self._batches:06d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                row_group_size=ROW_GROUP_SIZE,
+            )
+            measure.add(bytes=table.nbytes)
+        self._batches += 1
+        self.rows += len(batch)
+
+
+def crash_dataset(root=PARQUET_DIR):
+    """Ouvre le jeu de données Parquet (partitions source/année découvertes).
+
+    Le schéma est imposé : les colonnes absentes des fichiers plus anciens
+    (ex. latitude/longitude) sont lues comme nulles.
+    """
+    schema = pa.schema(list(CRASH_SCHEMA) + list(PARTITION_SCHEMA))
+    return ds.dataset(root, format="parquet", schema=schema,
+                      partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+
+
+def open_dataset(path):
+    """Répertoire partitionné (voir crash_dataset) ou fichier Parquet seul."""
+    path = Path(path)
+    if path.is_dir():
+        return crash_dataset(path)
+    return ds.dataset(path, format="parquet")
+
+
+def parquet_columns(path=PARQUET_DIR):
+    """Noms des colonnes du jeu Parquet `path` (sans lire les données)."""
+    return open_dataset(path).schema.names
+
+
+def projection(columns, names):
+    """Projection Arrow de `columns` : colonnes de `names` telles quelles, sinon
+    expression de DERIVED_COLUMNS (None : toutes les colonnes)."""
+    if columns is None:
+        return None
+    return {column: ds.field(column) if column in names or column not in DERIVED_COLUMNS
+            else DERIVED_COLUMNS[column] for column in columns}
+
+
+def load_parquet(path=PARQUET_DIR, columns=None, sources=None, start_date=None, end_date=None):
+    """Charge le jeu Parquet dans un DataFrame en ne lisant que le nécessaire.
+
+    `columns` limite les colonnes lues (les colonnes de DERIVED_COLUMNS
+    absentes du fichier sont calculées) ; `sources` et l'intervalle de dates
+    sont transmis comme filtres : les partitions (source, année) hors filtre
+    ne sont pas ouvertes et les groupes de lignes hors intervalle sont sautés
+    grâce aux statistiques min/max. Une date illisible lève ValueError.
+    """
+    dataset = open_dataset(path)
+    names = set(dataset.schema.names)
+    condition = None
+
+    def add(expression):
+        nonlocal condition
+        condition = expression if condition is None else condition & expression
+
+    if sources and "source" in names:
+        add(ds.field("source").isin(list(sources)))
+    if start_date is not None:
+        start = _require_date(start_date, "start_date")
+        if "year" in names:
+            add(ds.field("year") >= start.year)
+        add(ds.field("event_date") >= pa.scalar(start, type=pa.date32()))
+    if end_date is not None:
+        end = _require_date(end_date, "end_date")
+        if "year" in names:
+            add(ds.field("year") <= end.year)
+        add(ds.field("event_date") <= pa.scalar(end, type=pa.date32()))
+
+    table = dataset.to_table(columns=projection(columns, names), filter=condition)
+    return table.to_pandas(date_as_object=False)
@@ -0,0 +1,181 @@
+import csv
+import os
+import queue
+import sys
+import threading
+
+from db_load import DEFAULT_BATCH_SIZE
+from instrumentation import span
+
+# Plafond mémoire des lots en attente (PIPELINE_MAX_MEMORY_MB dans .env)
+DEFAULT_MAX_MEMORY_BYTES = int(os.environ.get("PIPELINE_MAX_MEMORY_MB", 256)) * 1024 * 1024
+
+
+class PipelineError(Exception):
+    """Une ou plusieurs destinations du pipeline ont échoué ; les lots déjà validés sont conservés.
+
+    `errors` : {nom de la destination: exception}.
+    """
+
+    def __init__(self, errors):
+        self.errors = dict(errors)
+        super().__init__("; ".join(f"échec de la destination {name}: {error}" for name, error in self.errors.items()))
+
+
+def record_size(record):
+    """Estimation de la mémoire occupée par un enregistrement (dictionnaire)."""
+    return sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+
+
+class CsvSink:
+    """Destination CSV écrite lot par lot (le fichier est créé au premier lot)."""
+
+    def __init__(self, filename, fieldnames):
+        self.filename = filename
+        self.fieldnames = fieldnames
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def __call__(self, batch):
+        with span("csv_write", rows=len(batch)) as measure:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+                self._file = open(self.filename, 'w', newline='', encoding='utf-8')
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+                self._writer.writeheader()
+            start = self._file.tell()
+            for record in batch:
+                self._writer.writerow({k: record.get(k, '') for k in self.fieldnames})
+            # Chaque lot est écrit sur disque avant de passer au suivant
+            self._file.flush()
+            measure.add(bytes=self._file.tell() - start)
+        self.rows += len(batch)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Pipeline:
+    """Distribue des enregistrements par lots vers plusieurs destinations.
+
+    Chaque destination (`sinks`, dictionnaire nom -> appelable recevant un lot)
+    tourne dans son propre thread derrière une file bornée. Le producteur est
+    ralenti dès que les lots en attente dépassent `max_memory_bytes` ou que la
+    file d'une destination est pleine. Une destination qui échoue ne reçoit
+    plus de lots, mais les autres continuent jusqu'au bout (les fichiers sont
+    écrits même si la base est indisponible) ; les échecs sont levés ensemble
+    (PipelineError) à la fermeture, ou dès que toutes les destinations ont
+    échoué. Les lots déjà traités restent en place.
+    `transform`, s'il est fourni, est appliqué une fois à chaque lot avant sa
+    distribution (ex. normalize.normalize_records).
+
+    Usage :
+        with Pipeline({"db": db_sink, "csv": csv_sink}) as pipeline:
+            pipeline.run(records)
+    """
+
+    def __init__(self, sinks, batch_size=DEFAULT_BATCH_SIZE, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES,
+                 queue_size=4, transform=None):
+        self.sinks = sinks
+        self.transform = transform
+        self.batch_size = batch_size
+        self.max_memory_bytes = max_memory_bytes
+        self._queues = {name: queue.Queue(maxsize=queue_size) for name in sinks}
+        self._threads = []
+        self._batch = []
+        self._batch_bytes = 0
+        self._in_flight_bytes = 0
+        self._memory = threading.Condition()
+        self.errors = {}
+        self.stats = {"records": 0, "batches": 0, "peak_memory_bytes": 0}
+
+    def __enter__(self):
+        for name, sink in self.sinks.items():
+            thread = threading.Thread(target=self._worker, args=(name, sink), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Les enregistrements déjà extraits sont écrits même si le producteur a échoué
+        self.close(raise_errors=exc_type is None)
+        return False
+
+    def _worker(self, name, sink):
+        work = self._queues[name]
+        while True:
+            item = work.get()
+            if item is None:
+                break
+            batch, size, pending = item
+            try:
+                if name not in self.errors:
+                    sink(batch)
+            except Exception as e:
+                self.errors[name] = e
+            finally:
+                with self._memory:
+                    pending[0] -= 1
+                    if pending[0] == 0:
+                        self._in_flight_bytes -= size
+                        self._memory.notify_all()
+
+    def put(self, record):
+        """Ajoute un enregistrement ; le lot est envoyé dès qu'il est plein."""
+        self._batch.append(record)
+        self._batch_bytes += record_size(record)
+        self.stats["records"] += 1
+        if len(self._batch) >= self.batch_size or self._batch_bytes >= self.max_memory_bytes // 2:
+            self.flush()
+
+    def put_many(self, records):
+        for record in records:
+            self.put(record)
+
+    def run(self, records):
+        """Consomme un itérable d'enregistrements."""
+        self.put_many(records)
+
+    def _failed(self):
+        """Toutes les destinations ont échoué : inutile de continuer à produire."""
+        return len(self.errors) == len(self.sinks)
+
+    def flush(self):
+        """Envoie le lot courant à toutes les destinations (bloque si le plafond est atteint)."""
+        if self._failed():
+            raise PipelineError(self.errors)
+        if not self._batch:
+            return
+        batch, size = self._batch, self._batch_bytes
+        self._batch, self._batch_bytes = [], 0
+        if self.transform is not None:
+            batch = self.transform(batch)
+        with self._memory:
+            # Un lot seul plus gros que le plafond passe quand plus rien n'est en attente
+            self._memory.wait_for(lambda: self._failed() or self._in_flight_bytes == 0
+                                  or self._in_flight_bytes + size <= self.max_memory_bytes)
+            self._in_flight_bytes += size
+            self.stats["peak_memory_bytes"] = max(self.stats["peak_memory_bytes"], self._in_flight_bytes)
+        pending = [len(self._queues)]
+        for work in self._queues.values():
+            work.put((batch, size, pending))
+        self.stats["batches"] += 1
+
+    def close(self, raise_errors=True):
+        """Vide le dernier lot, attend les destinations et les ferme."""
+        try:
+            if not self._failed():
+                self.flush()
+        finally:
+            for work in self._queues.values():
+                work.put(None)
+            for thread in self._threads:
+                thread.join()
+            for sink in self.sinks.values():
+                if hasattr(sink, "close"):
+                    sink.close()
+        if raise_errors and self.errors:
+            raise PipelineError(self.errors)
@@ -0,0 +1,317 @@
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from normalize import CATEGORY_COLUMNS, parse_dates, parse_fatalities
+
+# Configuration
+MODELS_DIR = "models"
+MODEL_PATTERN = "best_model_*.pkl"
+
+# Caractéristiques attendues par les pipelines de improved-model-analysis.py
+FEATURES = ['Fatalities', 'year', 'month', 'day']
+
+# Nombre de latences conservées pour les percentiles
+LATENCY_WINDOW = 10_000
+
+# Connexions en attente d'acceptation (5 par défaut dans socketserver)
+REQUEST_QUEUE_SIZE = 1024
+
+
+def latest_model_path(models_dir=MODELS_DIR):
+    """Chemin du dernier modèle sauvegardé par train_and_evaluate_models, None s'il n'y en a pas."""
+    paths = glob.glob(os.path.join(models_dir, MODEL_PATTERN))
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def load_model(path):
+    """Charge un pipeline ; les tableaux numpy sont projetés en mémoire (mmap) plutôt que copiés."""
+    return joblib.load(path, mmap_mode='r')
+
+
+def strict_fatalities(series):
+    """Nombre de victimes d'une requête : nombre, ou format ASN "victimes/occupants" ;
+    toute autre valeur (absente, texte) donne NaN au lieu de 0 (voir validate_features)."""
+    numeric = pd.to_numeric(series, errors='coerce')
+    asn = series.astype('string').str.fullmatch(r'\s*\d+\s*/\s*\d+\s*').fillna(False).astype(bool)
+    return numeric.fillna(parse_fatalities(series).where(asn))
+
+
+def features_frame(records, strict=False):
+    """Construit les caractéristiques du modèle à partir d'enregistrements
+    (dictionnaires ou DataFrame avec `event_date` et `Fatalities`, et
+    éventuellement `operator` / `aircraft_type` ; absents, ils valent None et
+    l'encodeur du modèle les ignore).
+
+    Avec `strict` (entrées du service), un nombre de victimes illisible donne
+    NaN au lieu de 0 ; une colonne obligatoire absente lève ValueError.
+    """
+    data = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+    missing = [column for column in ('event_date', 'Fatalities') if column not in data.columns]
+    if missing:
+        raise ValueError(f"champ manquant: {', '.join(missing)}")
+    dates = parse_dates(data['event_date'])
+    fatalities = strict_fatalities if strict else parse_fatalities
+    features = pd.DataFrame({
+        'Fatalities': fatalities(data['Fatalities']),
+        'year': dates.dt.year,
+        'month': dates.dt.month,
+        'day': dates.dt.day,
+    }, columns=FEATURES)
+    for column in CATEGORY_COLUMNS:
+        features[column] = data[column].astype(object) if column in data.columns else None
+    return features
+
+
+def validate_features(features):
+    """Lève ValueError si des lignes n'ont pas de date ou de nombre de victimes lisible."""
+    invalid = features[FEATURES].isna().any(axis=1)
+    if invalid.any():
+        rows = ", ".join(str(row) for row in np.flatnonzero(invalid)[:10])
+        raise ValueError(f"date ou nombre de victimes illisible (lignes {rows})")
+    return features
+
+
+class ModelHolder:
+    """Référence vers le modèle courant, remplaçable sans bloquer les prédictions.
+
+    Le nouveau modèle est chargé hors verrou ; seule l'affectation de la
+    référence est protégée. Un lot en cours garde le modèle qu'il a lu.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._current = (load_model(path), path)
+        self.swaps = 0
+
+    def current(self):
+        return self._current
+
+    def swap(self, path):
+        model = load_model(path)
+        with self._lock:
+            self._current = (model, path)
+            self.swaps += 1
+        print(f"Modèle remplacé par {path}")
+
+    def swap_async(self, path):
+        threading.Thread(target=self.swap, args=(path,), daemon=True).start()
+
+    def watch(self, models_dir=MODELS_DIR, interval=30.0):
+        """Surveille `models_dir` et charge tout modèle plus récent que le modèle courant."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                path = latest_model_path(models_dir)
+                if path and path != self._current[1]:
+                    try:
+                        self.swap(path)
+                    except Exception as e:
+                        print(f"Erreur lors du chargement de {path}: {e}")
+        threading.Thread(target=loop, daemon=True).start()
+
+
+class MicroBatcher:
+    """Regroupe les requêtes concurrentes en un seul appel vectorisé à `predict_proba`.
+
+    Un thread attend la première requête, puis collecte celles qui arrivent
+    pendant `max_wait` secondes (au plus `max_batch_size` lignes) et les prédit
+    ensemble. Chaque appel à `predict` renvoie les probabilités de ses lignes.
+    Les requêtes sont validées avant d'entrer dans un lot ; si la prédiction
+    du lot échoue malgré tout, ses requêtes sont reprises une à une et seule
+    la requête fautive reçoit l'erreur.
+    """
+
+    def __init__(self, holder, max_batch_size=512, max_wait=0.005):
+        self.holder = holder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._started = time.perf_counter()
+        self.stats = {"requests": 0, "rows": 0, "batches": 0}
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def predict(self, records):
+        """Probabilités de la classe positive pour `records` (bloque jusqu'au résultat)."""
+        future = Future()
+        features = validate_features(features_frame(records, strict=True))
+        self._requests.put((features, future, time.perf_counter()))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._requests.get()]
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            model, _ = self.holder.current()
+            try:
+                frames = [frame for frame, _, _ in batch]
+                probabilities = model.predict_proba(pd.concat(frames, ignore_index=True))[:, 1]
+            except Exception:
+                self._predict_one_by_one(model, batch)
+                continue
+
+            now = time.perf_counter()
+            offset = 0
+            for frame, future, submitted in batch:
+                future.set_result(probabilities[offset:offset + len(frame)].tolist())
+                offset += len(frame)
+                self._latencies.append(now - submitted)
+            self.stats["requests"] += len(batch)
+            self.stats["rows"] += offset
+            self.stats["batches"] += 1
+
+    def _predict_one_by_one(self, model, batch):
+        """Reprise d'un lot en échec requête par requête : seules les requêtes fautives échouent."""
+        for frame, future, submitted in batch:
+            try:
+                probabilities = model.predict_proba(frame)[:, 1]
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            future.set_result(probabilities.tolist())
+            self._latencies.append(time.perf_counter() - submitted)
+            self.stats["requests"] += 1
+            self.stats["rows"] += len(frame)
+            self.stats["batches"] += 1
+
+    def latency_report(self):
+        """Latences p50/p99 (ms) sur les dernières requêtes et débit depuis le démarrage."""
+        latencies = np.array(self._latencies) * 1000
+        elapsed = time.perf_counter() - self._started
+        return {
+            **self.stats,
+            "model": self.holder.current()[1],
+            "swaps": self.holder.swaps,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "rows_per_second": self.stats["rows"] / elapsed if elapsed else 0.0,
+        }
+
+
+def make_handler(batcher, models_dir=MODELS_DIR):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        """POST /predict, POST /reload, GET /stats."""
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, batcher.latency_report())
+            else:
+                self._send(404, {"error": "route inconnue"})
+
+        def do_POST(self):
+            if self.path == "/reload":
+                path = latest_model_path(models_dir)
+                if path is None:
+                    self._send(404, {"error": "aucun modèle disponible"})
+                else:
+                    # Chargement en arrière-plan : les requêtes continuent avec l'ancien modèle
+                    batcher.holder.swap_async(path)
+                    self._send(202, {"model": path})
+                return
+            if self.path != "/predict":
+                self._send(404, {"error": "route inconnue"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                records = payload["records"] if isinstance(payload, dict) else payload
+                self._send(200, {"probabilities": batcher.predict(records)})
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass  # Pas de journal par requête (coûteux à fort débit)
+
+    return PredictionHandler
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread avec une file de connexions en attente assez longue
+    pour de nombreux clients simultanés."""
+
+    request_queue_size = REQUEST_QUEUE_SIZE
+    daemon_threads = True
+
+
+def serve(host="127.0.0.1", port=8000, models_dir=MODELS_DIR, watch_interval=None, **batch_options):
+    """Démarre le service HTTP de prédiction sur le dernier modèle sauvegardé."""
+    path = latest_model_path(models_dir)
+    if path is None:
+        print(f"Aucun modèle trouvé dans {models_dir}. Lancez d'abord improved-model-analysis.py.")
+        return
+    holder = ModelHolder(path)
+    if watch_interval:
+        holder.watch(models_dir, watch_interval)
+    batcher = MicroBatcher(holder, **batch_options)
+    server = PredictionServer((host, port), make_handler(batcher, models_dir))
+    print(f"Service de prédiction sur http://{host}:{port} (modèle: {path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(batcher.latency_report(), indent=2))
+
+
+def predict_file(input_file, output_file, models_dir=MODELS_DIR, chunksize=100_000):
+    """Prédiction par lots d'un fichier CSV (colonnes event_date et Fatalities)."""
+    path = latest_model_path(models_dir)
+    if path is None:
+        print(f"Aucun modèle trouvé dans {models_dir}.")
+        return
+    model = load_model(path)
+    start = time.perf_counter()
+    rows = 0
+    header = True
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        chunk['probability'] = model.predict_proba(features_frame(chunk))[:, 1]
+        chunk.to_csv(output_file, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        rows += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{rows} prédictions écrites dans {output_file} en {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed else 0:.0f} lignes/s, modèle: {path})")
+
+
+if __name__ == "__main__":
+    # Options de la sous-commande `predict` de cli.py
+    import sys
+    from cli import main as cli_main
+    sys.modules.setdefault("predict_model", sys.modules[__name__])
+    sys.exit(cli_main(["predict", *sys.argv[1:]]))
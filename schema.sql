@@ -1,7 +1,15 @@
+-- Table des crashs, partitionnée par année de event_date
 CREATE TABLE airplane_crashes (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
+    source VARCHAR(20) NOT NULL,
+    source_event_id VARCHAR(100),
+    -- md5(source | source_event_id) ou md5(source | date | immatriculation normalisée)
+    dedup_key CHAR(32) NOT NULL,
     event_date DATE NOT NULL,
     location VARCHAR(255),
+    -- Coordonnées du lieu (geocode.py, gazetier local), NULL si inconnu
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
     operator VARCHAR(255),
     aircraft_type VARCHAR(255),
     registration VARCHAR(50),
@@ -9,5 +17,211 @@ CREATE TABLE airplane_crashes (
     route VARCHAR(255),
     fatalities INTEGER,
     description TEXT,
-    source_url VARCHAR(255)
+    source_url VARCHAR(255),
+    -- Index plein texte (opérateur, appareil, lieu, route, récit), tenu à jour par trigger
+    search_vector TSVECTOR,
+    -- La clé de partitionnement doit faire partie des contraintes d'unicité
+    PRIMARY KEY (id, event_date),
+    CONSTRAINT airplane_crashes_dedup_key UNIQUE (dedup_key, event_date)
+) PARTITION BY RANGE (event_date);
+
+CREATE INDEX airplane_crashes_event_date_idx ON airplane_crashes (event_date);
+CREATE INDEX airplane_crashes_operator_idx ON airplane_crashes (operator);
+CREATE INDEX airplane_crashes_aircraft_type_idx ON airplane_crashes (aircraft_type);
+CREATE INDEX airplane_crashes_search_idx ON airplane_crashes USING GIN (search_vector);
+
+-- Calcul du vecteur de recherche à l'insertion et à la modification des champs texte
+-- (seules les lignes écrites sont indexées, jamais toute la table)
+CREATE OR REPLACE FUNCTION airplane_crashes_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.operator, '') || ' ' || coalesce(NEW.aircraft_type, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(NEW.location, '') || ' ' || coalesce(NEW.route, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER airplane_crashes_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF operator, aircraft_type, location, route, description
+    ON airplane_crashes
+    FOR EACH ROW EXECUTE FUNCTION airplane_crashes_search_vector();
+
+-- Crée une partition par année (les index du parent sont hérités)
+CREATE OR REPLACE FUNCTION create_crash_partitions(first_year INTEGER, last_year INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    FOR year IN first_year..last_year LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF airplane_crashes FOR VALUES FROM (%L) TO (%L)',
+            'airplane_crashes_' || year,
+            make_date(year, 1, 1),
+            make_date(year + 1, 1, 1)
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_crash_partitions(1908, 2030);
+
+-- Dates hors des partitions annuelles
+CREATE TABLE airplane_crashes_default PARTITION OF airplane_crashes DEFAULT;
+
+-- Événements canoniques : un accident rapproché entre sources (entity_resolution.py)
+CREATE TABLE crash_events (
+    -- dedup_key du crash de la source prioritaire
+    event_id CHAR(32) PRIMARY KEY,
+    source_count SMALLINT NOT NULL,
+    event_date DATE NOT NULL,
+    location VARCHAR(255),
+    operator VARCHAR(255),
+    aircraft_type VARCHAR(255),
+    registration VARCHAR(50),
+    fatalities INTEGER
+);
+
+CREATE INDEX crash_events_event_date_idx ON crash_events (event_date);
+
+-- Lien de chaque crash (source, dedup_key) vers son événement canonique
+CREATE TABLE crash_event_links (
+    event_id CHAR(32) NOT NULL REFERENCES crash_events (event_id) ON DELETE CASCADE,
+    source VARCHAR(20) NOT NULL,
+    dedup_key CHAR(32) NOT NULL,
+    event_date DATE NOT NULL,
+    match_score REAL,
+    PRIMARY KEY (source, dedup_key)
+);
+
+CREATE INDEX crash_event_links_event_id_idx ON crash_event_links (event_id);
+
+-- Agrégats analytiques (crash_stats.py) : une ligne par année et par dimension.
+-- Les années modifiées sont notées par des triggers d'instruction ; seules ces
+-- années (donc ces partitions) sont recalculées par refresh_crash_rollups().
+CREATE TABLE crash_rollup_dirty (
+    year INTEGER PRIMARY KEY
+);
+
+CREATE TABLE crash_rollup_year (
+    year INTEGER NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    crashes INTEGER NOT NULL,
+    fatal_crashes INTEGER NOT NULL,
+    fatalities BIGINT NOT NULL,
+    PRIMARY KEY (year, source)
+);
+
+CREATE TABLE crash_rollup_operator (
+    year INTEGER NOT NULL,
+    operator VARCHAR(255) NOT NULL,
+    crashes INTEGER NOT NULL,
+    fatal_crashes INTEGER NOT NULL,
+    fatalities BIGINT NOT NULL,
+    PRIMARY KEY (year, operator)
+);
+
+CREATE TABLE crash_rollup_aircraft_type (
+    year INTEGER NOT NULL,
+    aircraft_type VARCHAR(255) NOT NULL,
+    crashes INTEGER NOT NULL,
+    fatal_crashes INTEGER NOT NULL,
+    fatalities BIGINT NOT NULL,
+    PRIMARY KEY (year, aircraft_type)
+);
+
+CREATE TABLE crash_rollup_country (
+    year INTEGER NOT NULL,
+    country VARCHAR(255) NOT NULL,
+    crashes INTEGER NOT NULL,
+    fatal_crashes INTEGER NOT NULL,
+    fatalities BIGINT NOT NULL,
+    PRIMARY KEY (year, country)
 );
+
+CREATE OR REPLACE FUNCTION mark_crash_years_dirty()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO crash_rollup_dirty (year)
+        SELECT DISTINCT extract(year FROM event_date)::int FROM new_rows
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO crash_rollup_dirty (year)
+        SELECT DISTINCT extract(year FROM event_date)::int FROM old_rows
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER airplane_crashes_rollup_insert
+    AFTER INSERT ON airplane_crashes REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_crash_years_dirty();
+CREATE TRIGGER airplane_crashes_rollup_update
+    AFTER UPDATE ON airplane_crashes REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_crash_years_dirty();
+CREATE TRIGGER airplane_crashes_rollup_delete
+    AFTER DELETE ON airplane_crashes REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_crash_years_dirty();
+
+-- Recalcule les agrégats des années modifiées (toutes avec full_refresh) ;
+-- renvoie le nombre d'années recalculées.
+CREATE OR REPLACE FUNCTION refresh_crash_rollups(full_refresh BOOLEAN DEFAULT FALSE)
+RETURNS INTEGER AS $$
+DECLARE
+    years INTEGER[];
+    y INTEGER;
+BEGIN
+    IF full_refresh THEN
+        DELETE FROM crash_rollup_dirty;
+        SELECT array_agg(DISTINCT extract(year FROM event_date)::int) INTO years FROM airplane_crashes;
+        TRUNCATE crash_rollup_year, crash_rollup_operator, crash_rollup_aircraft_type, crash_rollup_country;
+    ELSE
+        WITH done AS (DELETE FROM crash_rollup_dirty RETURNING year)
+        SELECT array_agg(year) INTO years FROM done;
+    END IF;
+    IF years IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS rollup_year_rows (
+        source VARCHAR(20), operator VARCHAR(255), aircraft_type VARCHAR(255),
+        country VARCHAR(255), fatalities INTEGER
+    ) ON COMMIT DROP;
+
+    FOREACH y IN ARRAY years LOOP
+        DELETE FROM crash_rollup_year WHERE year = y;
+        DELETE FROM crash_rollup_operator WHERE year = y;
+        DELETE FROM crash_rollup_aircraft_type WHERE year = y;
+        DELETE FROM crash_rollup_country WHERE year = y;
+
+        -- Une seule lecture de la partition de l'année
+        TRUNCATE rollup_year_rows;
+        INSERT INTO rollup_year_rows
+        SELECT source,
+               coalesce(nullif(trim(operator), ''), 'Unknown'),
+               coalesce(nullif(trim(aircraft_type), ''), 'Unknown'),
+               -- Dernier élément de « ville, état, pays » (comme normalize.split_location)
+               coalesce(nullif(trim(CASE WHEN location LIKE '%,%' THEN regexp_replace(location, '^.*,', '') END), ''),
+                        'Unknown'),
+               coalesce(fatalities, 0)
+        FROM airplane_crashes
+        WHERE event_date >= make_date(y, 1, 1) AND event_date < make_date(y + 1, 1, 1);
+
+        INSERT INTO crash_rollup_year
+        SELECT y, source, count(*), count(*) FILTER (WHERE fatalities > 0), sum(fatalities)
+        FROM rollup_year_rows GROUP BY source;
+        INSERT INTO crash_rollup_operator
+        SELECT y, operator, count(*), count(*) FILTER (WHERE fatalities > 0), sum(fatalities)
+        FROM rollup_year_rows GROUP BY operator;
+        INSERT INTO crash_rollup_aircraft_type
+        SELECT y, aircraft_type, count(*), count(*) FILTER (WHERE fatalities > 0), sum(fatalities)
+        FROM rollup_year_rows GROUP BY aircraft_type;
+        INSERT INTO crash_rollup_country
+        SELECT y, country, count(*), count(*) FILTER (WHERE fatalities > 0), sum(fatalities)
+        FROM rollup_year_rows GROUP BY country;
+    END LOOP;
+    RETURN array_length(years, 1);
+END;
+$$ LANGUAGE plpgsql;
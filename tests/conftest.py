@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from cli import import_command  # noqa: E402
+
+
+@pytest.fixture
+def extraction():
+    """Module improved-data-extraction.py (chargé via cli.import_command)."""
+    return import_command("extract")
+
+
+@pytest.fixture
+def analysis():
+    """Module improved-model-analysis.py (chargé via cli.import_command)."""
+    return import_command("train")
@@ -0,0 +1,50 @@
+from datetime import datetime
+from functools import partial
+
+import checkpoints
+
+
+def asn_page(year, page, count):
+    return [{"source_event_id": f"{year}-{page}-{i}"} for i in range(count)]
+
+
+def run_incremental(extraction, monkeypatch, tmp_path, fetch):
+    """Un passage de main_incremental (ASN seulement) ; renvoie les identifiants chargés et le point de reprise."""
+    path = tmp_path / "checkpoints.json"
+    loaded = []
+
+    def load_crashes(crashes, source, csv_name, **options):
+        loaded.extend(crash["source_event_id"] for crash in crashes)
+        return True
+
+    monkeypatch.setattr(extraction, "load_checkpoint", partial(checkpoints.load_checkpoint, path=path))
+    monkeypatch.setattr(extraction, "save_checkpoint", partial(checkpoints.save_checkpoint, path=path))
+    monkeypatch.setattr(extraction, "iter_ntsb_data_incremental", lambda checkpoint, progress: iter(()))
+    monkeypatch.setattr(extraction, "load_crashes", load_crashes)
+    monkeypatch.setattr(extraction, "fetch_asn_page", fetch)
+    extraction.main_incremental()
+    return loaded, checkpoints.load_checkpoint("ASN", path=path)
+
+
+def test_failed_page_is_fetched_again_on_next_run(extraction, monkeypatch, tmp_path):
+    last_year = datetime.now().year
+    first, failing = last_year - 2, last_year - 1
+    pages = {(first, 1): asn_page(first, 1, extraction.ASN_PAGE_SIZE), (first, 2): asn_page(first, 2, 3),
+             (failing, 1): asn_page(failing, 1, 5), (last_year, 1): asn_page(last_year, 1, 2)}
+
+    def fetch(year, page):
+        return pages.get((year, page), [])
+
+    def failing_fetch(year, page):
+        if year == failing:
+            raise ConnectionError("connexion interrompue")
+        return fetch(year, page)
+
+    loaded, checkpoint = run_incremental(extraction, monkeypatch, tmp_path, failing_fetch)
+    assert loaded == [crash["source_event_id"] for crash in pages[(first, 1)] + pages[(first, 2)]]
+    # Le point de reprise n'a pas dépassé l'année en échec
+    assert checkpoint == {"year": first, "page": 2, "last_event_id": f"{first}-2-2"}
+
+    loaded, checkpoint = run_incremental(extraction, monkeypatch, tmp_path, fetch)
+    assert loaded == [crash["source_event_id"] for crash in pages[(failing, 1)] + pages[(last_year, 1)]]
+    assert checkpoint == {"year": last_year, "page": 1, "last_event_id": f"{last_year}-1-1"}
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "migrations"))
+
+from common import schema_section  # noqa: E402
+
+
+def test_schema_sections_used_by_migrations():
+    function = schema_section("CREATE OR REPLACE FUNCTION create_crash_partitions", "LANGUAGE plpgsql;")
+    assert function.startswith("CREATE OR REPLACE FUNCTION create_crash_partitions")
+    assert function.endswith("LANGUAGE plpgsql;")
+    assert function.count("LANGUAGE plpgsql;") == 1
+
+    trigger = schema_section("CREATE TRIGGER airplane_crashes_search_vector_trigger",
+                             "airplane_crashes_search_vector();")
+    assert "BEFORE INSERT OR UPDATE" in trigger.upper()
+
+    rollups = schema_section("-- Agrégats analytiques")
+    assert "refresh_crash_rollups" in rollups
+    assert rollups.endswith(REPO_ROOT.joinpath("schema.sql").read_text(encoding="utf-8")[-50:])
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import cli
+from model_streaming import StreamingModel, iter_chunks
+from normalize import normalize_records
+from parquet_store import ParquetSink
+
+
+def crash_file(path, rows, first_year, seed, fatal_scale=20):
+    """CSV au format traité ; cible : accident mortel (10 % d'étiquettes bruitées)."""
+    rng = np.random.default_rng(seed)
+    fatalities = np.where(rng.random(rows) < 0.6, 0, rng.integers(1, fatal_scale, rows))
+    target = (fatalities > 0) ^ (rng.random(rows) < 0.1)
+    days = pd.to_datetime(f"{first_year}-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")
+    pd.DataFrame({"event_date": days.strftime("%Y-%m-%d"), "Fatalities": fatalities,
+                  "target": target.astype(int)}).to_csv(path, index=False)
+    return path
+
+
+def test_streaming_reads_the_partitioned_parquet_store(tmp_path):
+    crashes = [{"source_event_id": str(i), "event_date": f"20{10 + i % 10}-01-01", "fatalities": str(i % 4)}
+               for i in range(200)]
+    ParquetSink("NTSB", root=tmp_path, normalized=True)(normalize_records(crashes))
+
+    chunk = next(iter_chunks(tmp_path, 1000))
+    assert list(chunk.columns) == ["event_date", "Fatalities", "target"]
+    assert (chunk["target"] == (chunk["Fatalities"] > 0)).all()
+    assert StreamingModel().fit(tmp_path, 50).rows_seen == 200
+
+
+def test_update_keeps_the_scaler_and_the_original_holdout_accuracy(tmp_path):
+    original = crash_file(tmp_path / "original.csv", 5000, 1990, seed=0)
+    model = StreamingModel().fit(original, 1000, epochs=3)
+    before = model.evaluate(original, 1000)
+    mean, scale = model.scaler.mean_.copy(), model.scaler.scale_.copy()
+
+    # Un mois de crashs plus récents (années hors de l'entraînement initial)
+    model.update(crash_file(tmp_path / "month.csv", 200, 2024, seed=1), 1000)
+
+    assert np.array_equal(model.scaler.mean_, mean) and np.array_equal(model.scaler.scale_, scale)
+    after = model.evaluate(original, 1000)
+    for name, metrics in before.items():
+        assert after[name]["accuracy"] >= metrics["accuracy"] - 0.02
+
+
+def test_streaming_training_uses_the_source_option(analysis, monkeypatch):
+    calls = []
+    monkeypatch.setattr(analysis, "train_streaming", lambda data_file, **options: calls.append(data_file))
+    cli.main(["train", "--streaming", "--source", "crashes.csv"])
+    assert calls == ["crashes.csv"]
+    assert cli.main(["train", "--streaming", "--source", analysis.DB_SOURCE]) == 2
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+from model_tuning import TuningStore, successive_halving_search
+
+GRID = {'classifier__C': [0.1, 1.0]}
+
+
+def training_data(rows=120, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({'Fatalities': rng.integers(0, 50, rows), 'year': rng.integers(1990, 2024, rows)})
+    y = pd.Series((X['Fatalities'] + rng.integers(0, 20, rows) > 30).astype(int))
+    return X, y
+
+
+def search(store, X, y, scaler=StandardScaler, max_iter=100):
+    pipeline = Pipeline([
+        ('preprocessor', ColumnTransformer([('num', scaler(), list(X.columns))])),
+        ('classifier', LogisticRegression(max_iter=max_iter)),
+    ])
+    successive_halving_search('Logistic Regression', pipeline, GRID, X, y, store, n_jobs=1)
+    return len(store.records)
+
+
+def test_journal_is_reused_only_for_the_same_data_and_pipeline(tmp_path):
+    store = TuningStore(tmp_path / "tuning_results.jsonl")
+    X, y = training_data()
+    evaluations = search(store, X, y)
+
+    # Même données, même pipeline : tout est repris du journal (y compris après rechargement)
+    assert search(TuningStore(store.path), X, y) == evaluations
+    assert search(store, X, y) == evaluations
+    # Autre préprocesseur, autre paramètre hors grille ou autres données : nouvelles évaluations
+    assert search(store, X, y, scaler=MinMaxScaler) == 2 * evaluations
+    assert search(store, X, y, max_iter=200) == 3 * evaluations
+    assert search(store, *training_data(seed=1)) == 4 * evaluations
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+PAGES = 5  # Pages non vides servies par le bouchon ; la page 6 est vide
+PAGE_SIZE = 3
+
+
+class StubNtsbApi(ThreadingHTTPServer):
+    """Bouchon de l'API NTSB : `PAGES` pages de `PAGE_SIZE` résultats, puis des pages vides.
+
+    `failures` : {page: [statuts HTTP renvoyés avant la réponse normale]}.
+    Chaque requête est horodatée dans `requests` ({page: [instants]}).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, failures=None):
+        super().__init__(("127.0.0.1", 0), StubNtsbHandler)
+        self.failures = {page: list(statuses) for page, statuses in (failures or {}).items()}
+        self.requests = defaultdict(list)
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/Query/GetResultsByPage"
+
+
+class StubNtsbHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query)["page"][0])
+        with self.server.lock:
+            self.server.requests[page].append(time.monotonic())
+            pending = self.server.failures.get(page)
+            status = pending.pop(0) if pending else 200
+        if status == 200:
+            count = PAGE_SIZE if page <= PAGES else 0
+            results = [{"eventId": f"{page}-{i}", "eventDate": "2020-01-01"} for i in range(count)]
+            body = json.dumps({"results": results}).encode("utf-8")
+        else:
+            body = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api(extraction, monkeypatch):
+    """Démarre un bouchon (voir StubNtsbApi) ; le cache des réponses est désactivé."""
+    monkeypatch.setattr(extraction, "response_cache", None)
+    servers = []
+
+    def start(failures=None):
+        server = StubNtsbApi(failures)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def event_ids(crashes):
+    return [crash["source_event_id"] for crash in crashes]
+
+
+def test_pages_are_yielded_in_order_until_the_empty_page(extraction, stub_api):
+    server = stub_api()
+    pages = list(extraction.iter_ntsb_pages(url=server.url, page_size=PAGE_SIZE, concurrency=1,
+                                            requests_per_second=0))
+
+    assert [page for page, _ in pages] == list(range(1, PAGES + 1))
+    for page, crashes in pages:
+        assert event_ids(crashes) == [f"{page}-{i}" for i in range(PAGE_SIZE)]
+    # Séquentiellement, rien n'est demandé après la première page vide
+    assert sorted(server.requests) == list(range(1, PAGES + 2))
+
+
+def test_concurrent_pagination_stops_on_the_empty_page(extraction, stub_api):
+    server = stub_api()
+    pages = dict(extraction.iter_ntsb_pages(url=server.url, page_size=PAGE_SIZE, concurrency=4,
+                                            requests_per_second=0))
+
+    assert sorted(pages) == list(range(1, PAGES + 1))
+    assert all(event_ids(crashes)[0] == f"{page}-0" for page, crashes in pages.items())
+    # Au plus `concurrency` - 1 pages demandées d'avance au-delà de la page vide
+    assert max(server.requests) <= PAGES + 4
+
+
+def test_5xx_and_429_are_retried_with_backoff(extraction, stub_api):
+    server = stub_api(failures={2: [503, 429], 4: [500]})
+    pages = list(extraction.iter_ntsb_pages(url=server.url, page_size=PAGE_SIZE, concurrency=1,
+                                            requests_per_second=0))
+
+    assert [page for page, _ in pages] == list(range(1, PAGES + 1))
+    assert len(server.requests[2]) == 3
+    assert len(server.requests[4]) == 2
+    # Attente exponentielle (0,5 s puis 1 s) entre les tentatives
+    first, second, third = server.requests[2]
+    assert second - first >= 0.45
+    assert third - second >= 0.95
+
+
+def test_retries_are_bounded(extraction, stub_api):
+    server = stub_api(failures={1: [503, 503]})
+    with pytest.raises(requests.HTTPError):
+        list(extraction.iter_ntsb_pages(url=server.url, page_size=PAGE_SIZE, concurrency=1,
+                                        requests_per_second=0, retries=1))
+    assert len(server.requests[1]) == 2
+
+
+def test_rate_limit_spaces_requests_to_the_host(extraction, stub_api):
+    server = stub_api()
+    requests_per_second = 20
+    list(extraction.iter_ntsb_pages(url=server.url, page_size=PAGE_SIZE, concurrency=4,
+                                    requests_per_second=requests_per_second))
+
+    arrivals = sorted(instant for instants in server.requests.values() for instant in instants)
+    # Au moins 1 / requests_per_second entre la première et la dernière requête, par intervalle
+    assert arrivals[-1] - arrivals[0] >= (len(arrivals) - 1) / requests_per_second * 0.9
@@ -0,0 +1,36 @@
+import pytest
+
+from normalize import normalize_records
+from parquet_store import ParquetSink, crashes_to_table, load_parquet
+
+RAW_CRASHES = [
+    {"source_event_id": "A1", "event_date": "2020-03-01T00:00:00Z", "fatalities": "12/15",
+     "location": "Paris, France", "operator": "Air Test", "aircraft_type": "A320"},
+    {"source_event_id": "A2", "event_date": "05-Jan-2019", "fatalities": None,
+     "location": "Denver, CO, United States", "operator": "Sky Test", "aircraft_type": "B737"},
+    {"source_event_id": "A3", "event_date": "12/24/2021", "fatalities": "3", "location": "Lyon, France"},
+]
+
+
+def test_normalized_batches_are_typed_without_normalizing_again():
+    assert crashes_to_table(normalize_records(RAW_CRASHES), "ASN", normalized=True).equals(
+        crashes_to_table(RAW_CRASHES, "ASN"))
+
+
+def test_analysis_loads_the_store_written_by_parquet_sink(analysis, tmp_path):
+    ParquetSink("ASN", root=tmp_path, normalized=True)(normalize_records(RAW_CRASHES))
+
+    data = analysis.load_data(tmp_path, columns=analysis.ANALYSIS_COLUMNS)
+    assert data is not None
+    data = data.sort_values("event_date")
+    assert data["Fatalities"].tolist() == [0, 12, 3]
+    assert data["target"].tolist() == [0, 1, 1]
+    assert data["operator"].astype(object).tolist()[:2] == ["Sky Test", "Air Test"]
+    assert analysis.preprocess_data(data)[4] is not None
+
+
+def test_unreadable_filter_date_is_rejected(tmp_path):
+    ParquetSink("ASN", root=tmp_path)(RAW_CRASHES)
+    assert len(load_parquet(tmp_path, start_date="2020-01-01")) == 2
+    with pytest.raises(ValueError, match="start_date"):
+        load_parquet(tmp_path, start_date="hier")
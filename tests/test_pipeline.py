@@ -0,0 +1,77 @@
+import csv
+
+import pytest
+
+from db_load import CRASH_COLUMNS, crash_rows, insert_rows
+from pipeline import CsvSink, Pipeline, PipelineError
+
+
+def crash(i, event_date="2020-01-01"):
+    return {"source_event_id": f"E{i}", "event_date": event_date, "location": "Paris, France",
+            "operator": "Air Test", "fatalities": str(i % 3)}
+
+
+def failing_sink(batch):
+    raise ConnectionError("base indisponible")
+
+
+def test_failed_sink_does_not_stop_the_others(tmp_path):
+    csv_sink = CsvSink(str(tmp_path / "crashes.csv"), ["source_event_id"])
+    received = []
+    with pytest.raises(PipelineError) as error:
+        with Pipeline({"database": failing_sink, "csv": csv_sink, "list": received.extend}, batch_size=10) as pipeline:
+            pipeline.run(crash(i) for i in range(95))
+
+    assert list(error.value.errors) == ["database"]
+    assert len(received) == 95
+    with open(tmp_path / "crashes.csv", newline="", encoding="utf-8") as f:
+        assert [row["source_event_id"] for row in csv.DictReader(f)] == [f"E{i}" for i in range(95)]
+
+
+def test_pipeline_stops_when_every_sink_failed():
+    produced = []
+
+    def records():
+        for i in range(1000):
+            produced.append(i)
+            yield crash(i)
+
+    with pytest.raises(PipelineError):
+        with Pipeline({"database": failing_sink}, batch_size=10, queue_size=1) as pipeline:
+            pipeline.run(records())
+    assert len(produced) < 1000
+
+
+def test_load_crashes_writes_files_when_database_fails(extraction, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(extraction, "save_to_database", lambda batch, source, **options: False)
+
+    assert extraction.load_crashes([crash(i) for i in range(12)], "NTSB", "ntsb", batch_size=5) is False
+    with open(tmp_path / "data/processed/ntsb_crashes.csv", newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 12
+    assert list((tmp_path / "data/processed/parquet/source=NTSB").rglob("*.parquet"))
+
+
+class RecordingCursor:
+    """Curseur factice : chaque identifiant n'est inséré qu'une fois (ON CONFLICT DO NOTHING)."""
+
+    def __init__(self):
+        self.keys = set()
+        self.rowcount = 0
+
+    def execute(self, query, values):
+        key = values[2]  # dedup_key
+        self.rowcount = 0 if key in self.keys else 1
+        self.keys.add(key)
+
+
+def test_insert_rows_rejects_rows_without_date_like_copy_rows():
+    crashes = [crash(1), crash(2, event_date=None), crash(1), crash(3, event_date="")]
+    cursor = RecordingCursor()
+    assert insert_rows(cursor, crashes, "NTSB") == {"inserted": 1, "duplicates": 1, "rejected": 2}
+
+
+def test_crash_rows_parse_fatalities_like_normalize():
+    values = ["12/15", 7, None, "", "inconnu", " 3 "]
+    rows = crash_rows([{"event_date": "2020-01-01", "fatalities": value} for value in values], "ASN")
+    assert [row[CRASH_COLUMNS.index("fatalities")] for row in rows] == [12, 7, 0, 0, 0, 3]
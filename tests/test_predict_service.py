@@ -0,0 +1,92 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from predict_model import MicroBatcher, PredictionServer, make_handler
+
+
+class StubModel:
+    """predict_proba : probabilité = victimes / 100 ; échoue (RuntimeError) sur 666 victimes."""
+
+    def predict_proba(self, features):
+        fatalities = features['Fatalities'].to_numpy(dtype=float)
+        if (fatalities == 666).any():
+            raise RuntimeError("valeur refusée par le modèle")
+        return np.column_stack([1 - fatalities / 100, fatalities / 100])
+
+
+class StubHolder:
+    swaps = 0
+
+    def current(self):
+        return StubModel(), "stub.pkl"
+
+
+@pytest.fixture
+def service():
+    """URL de /predict d'un service démarré sur un port libre, avec des lots de 20 ms."""
+    batcher = MicroBatcher(StubHolder(), max_wait=0.02)
+    server = PredictionServer(("127.0.0.1", 0), make_handler(batcher))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/predict"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, records):
+    """(statut HTTP, réponse JSON) d'un POST /predict."""
+    request = urllib.request.Request(url, data=json.dumps({"records": records}).encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_invalid_request_does_not_fail_its_batch(service):
+    good = [{"event_date": "2010-05-01", "Fatalities": 30}]
+    unparseable = [{"event_date": "pas une date", "Fatalities": "beaucoup"}]
+    requests = [unparseable if i % 4 == 0 else good for i in range(20)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(lambda records: post(service, records), requests))
+
+    assert [status for status, _ in responses] == [400 if i % 4 == 0 else 200 for i in range(20)]
+    assert all(body == {"probabilities": [0.3]} for status, body in responses if status == 200)
+
+
+def test_model_failure_only_fails_the_offending_request(service):
+    requests = [[{"event_date": "2010-05-01", "Fatalities": 666 if i == 3 else i}] for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda records: post(service, records), requests))
+
+    assert [status for status, _ in responses] == [500 if i == 3 else 200 for i in range(8)]
+    assert "RuntimeError" in responses[3][1]["error"]
+    assert [body["probabilities"] for i, (_, body) in enumerate(responses) if i != 3] == \
+        [[i / 100] for i in range(8) if i != 3]
+
+
+def test_many_concurrent_clients_are_accepted(service):
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        statuses = list(executor.map(lambda i: post(service, [{"event_date": "2010-05-01", "Fatalities": 1}])[0],
+                                     range(256)))
+    assert statuses == [200] * 256
+
+
+@pytest.mark.parametrize("record", [
+    {"event_date": "2010-05-01", "Fatalities": "beaucoup"},
+    {"event_date": "2010-05-01", "Fatalities": None},
+    {"event_date": "2010-05-01"},
+])
+def test_unreadable_fatalities_are_rejected_not_scored_as_zero(service, record):
+    status, body = post(service, [record])
+    assert status == 400
+    assert "victimes" in body["error"] or "Fatalities" in body["error"]
+
+
+def test_asn_fatalities_format_is_accepted(service):
+    assert post(service, [{"event_date": "2010-05-01", "Fatalities": "12/15"}]) == (200, {"probabilities": [0.12]})